@@ -0,0 +1,372 @@
+# Standard library imports
+import multiprocessing
+import sqlite3
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+
+# Local/application-specific imports
+import database
+from data_structures import AgendaIndex, TaskNode
+from recurrence import RecurrenceRule
+
+# Days of due load forecast, starting today.
+FORECAST_DAYS = 14
+
+# Months of completion totals kept in a trends report, newest last.
+TREND_MONTHS = 12
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def open_read_only(db_path):
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+
+def daily_counts(cursor) -> dict:
+    """
+    Completions per day ordinal, from the archived tasks that haven't been compacted yet.
+    """
+
+    return dict(
+        cursor.execute(
+            "SELECT completed_date, COUNT(*) FROM task_archive GROUP BY completed_date"
+        )
+    )
+
+
+def streaks(days, today: int) -> tuple:
+    """
+    Returns the current and longest runs of consecutive days with a completion. The current run may end
+    yesterday, since today isn't over yet.
+    """
+
+    longest = run = 0
+    previous = None
+    for day in sorted(days):
+        run = run + 1 if previous == day - 1 else 1
+        longest = max(longest, run)
+        previous = day
+
+    current = 0
+    day = today if today in days else today - 1
+    while day in days:
+        current += 1
+        day -= 1
+
+    return current, longest
+
+
+def weekday_averages(counts: dict, today: int) -> list:
+    """
+    Average completions on each weekday, Monday first, counted over every week since the first retained completion.
+    Days without completions count as zero.
+    """
+
+    if not counts:
+        return [0.0] * 7
+
+    totals = [0] * 7
+    occurrences = [0] * 7
+    for day in range(min(counts), today + 1):
+        weekday = date.fromordinal(day).weekday()
+        totals[weekday] += counts.get(day, 0)
+        occurrences[weekday] += 1
+
+    return [
+        total / occurrence if occurrence else 0.0
+        for total, occurrence in zip(totals, occurrences)
+    ]
+
+
+def rolling_average(counts: dict, last_day: int, days: int) -> float:
+    return (
+        sum(counts.get(day, 0) for day in range(last_day - days + 1, last_day + 1))
+        / days
+    )
+
+
+def monthly_totals(counts: dict, summary_rows, today: int, months: int) -> list:
+    """
+    (YYYY-MM, completions) for the last 'months' months, combining retained completions with compacted counts.
+    """
+
+    totals = Counter(dict(summary_rows))
+    for day, count in counts.items():
+        totals[date.fromordinal(day).strftime("%Y-%m")] += count
+
+    current = date.fromordinal(today)
+    index = current.year * 12 + current.month - 1
+    labels = []
+    for month_index in range(index - months + 1, index + 1):
+        year, month = divmod(month_index, 12)
+        labels.append(f"{year:04d}-{month + 1:02d}")
+
+    return [(label, totals.get(label, 0)) for label in labels]
+
+
+def completion_trends(db_path, today: int) -> dict:
+    """
+    Streaks, weekday averages, rolling averages and monthly totals over the completion history. Runs in a worker
+    process, so it opens its own read-only connection and returns plain values.
+    """
+
+    connection = open_read_only(db_path)
+    try:
+        cursor = connection.cursor()
+        counts = daily_counts(cursor)
+        summary_rows = cursor.execute(
+            "SELECT month, SUM(count) FROM archive_summary GROUP BY month"
+        ).fetchall()
+    finally:
+        connection.close()
+
+    current_streak, longest_streak = streaks(counts.keys(), today)
+    weekdays = weekday_averages(counts, today)
+
+    return {
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "weekday_averages": weekdays,
+        "best_weekdays": sorted(
+            (day for day in range(7) if weekdays[day]), key=lambda day: -weekdays[day]
+        )[:2],
+        "average_7": rolling_average(counts, today, 7),
+        "average_30": rolling_average(counts, today, 30),
+        "previous_average_30": rolling_average(counts, today - 30, 30),
+        "monthly_totals": monthly_totals(counts, summary_rows, today, TREND_MONTHS),
+    }
+
+
+def load_tasks(cursor, list_name) -> list:
+    """
+    Builds TaskNodes for the rows of a task list, without linking them into a LinkedList.
+    """
+
+    nodes = []
+    for row in database.get_task_list(cursor, list_name):
+        fields = (
+            row[1],
+            row[2] or "",
+            row[3] or "",
+            row[4] or "",
+            date.fromordinal(row[5]),
+            bool(row[6]),
+            row[7],
+            RecurrenceRule.from_string(row[8]) if row[8] else None,
+        )
+        nodes.append(TaskNode.from_fields(row[0], fields))
+
+    return nodes
+
+
+def due_forecast(db_path, today: int, days: int = FORECAST_DAYS) -> list:
+    """
+    Number of tasks due on each of the next 'days' days, today first, including projected occurrences of repeating
+    tasks. Tasks are expanded by the same index as the Agenda screen, so both agree.
+    """
+
+    connection = open_read_only(db_path)
+    try:
+        cursor = connection.cursor()
+        agenda = AgendaIndex()
+        for list_key, list_name in (
+            ("Current", "current_task_list"),
+            ("Repeat", "repeat_task_list"),
+        ):
+            for node in load_tasks(cursor, list_name):
+                agenda.update(list_key, node)
+    finally:
+        connection.close()
+
+    first_day = date.fromordinal(today)
+    loads = {
+        day.toordinal(): len(entries)
+        for day, entries in agenda.window(first_day, days, first_day)
+    }
+
+    return [(day, loads.get(day, 0)) for day in range(today, today + days)]
+
+
+def compute_report(db_path, today: int, executor=None) -> dict:
+    """
+    Runs the trend and forecast computations, in parallel when given an executor, and merges their results.
+    """
+
+    if executor is None:
+        report = completion_trends(db_path, today)
+        report["forecast"] = due_forecast(db_path, today)
+        return report
+
+    trends = executor.submit(completion_trends, db_path, today)
+    forecast = executor.submit(due_forecast, db_path, today)
+    report = trends.result()
+    report["forecast"] = forecast.result()
+
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Streak: {report['current_streak']} days (best {report['longest_streak']})",
+        f"Per day: {report['average_7']:.1f} over 7 days, {report['average_30']:.1f} over 30 "
+        f"({report['previous_average_30']:.1f} the 30 before)",
+    ]
+    if report["best_weekdays"]:
+        best = ", ".join(WEEKDAY_NAMES[day] for day in report["best_weekdays"])
+        lines.append(f"Best days: {best}")
+
+    forecast = report["forecast"]
+    week = forecast[:7]
+    peak_day, peak_load = max(week, key=lambda entry: entry[1])
+    lines.append(f"Due this week: {sum(load for _, load in week)}")
+    if peak_load:
+        peak_name = WEEKDAY_NAMES[date.fromordinal(peak_day).weekday()]
+        lines.append(f"Busiest: {peak_name} ({peak_load})")
+
+    return "\n".join(lines)
+
+
+def pool_context():
+    """
+    Workers come from a fork server where available, otherwise they are spawned. Forking the app itself would copy
+    its window and threads into every worker. Both methods re-import the main module, which is why 'main.py' only
+    imports the app when run as a script.
+    """
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+
+    return multiprocessing.get_context("spawn")
+
+
+def start_pool(max_workers):
+    """
+    A process pool, or a thread pool where workers can't be started: frozen builds have no interpreter to run them
+    and some platforms lack process support. A thread still keeps the work off the UI thread.
+    """
+
+    if sys.executable and not getattr(sys, "frozen", False):
+        try:
+            return ProcessPoolExecutor(max_workers, mp_context=pool_context())
+        except (ImportError, NotImplementedError, OSError):
+            pass
+
+    return ThreadPoolExecutor(max_workers)
+
+
+class TrendAnalytics:
+    """
+    Computes completion trends and the due load forecast on a process pool, so a long history never blocks the UI.
+    The last report is kept until 'invalidate' is called for a new completion, or the day changes. Requests made
+    while a report is being computed for the same history wait for it rather than starting another.
+    """
+
+    def __init__(self, db_path="main.db", max_workers=2) -> None:
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.executor = None
+        self.generation = 0
+        self.report = None
+        self.report_key = None
+        self.pending_key = None
+        self.callbacks = []
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.generation += 1
+
+    def cached(self, today: date = None):
+        """
+        The last report if it still describes the current history, otherwise None.
+        """
+
+        key = (self.generation, (today or date.today()).toordinal())
+        with self.lock:
+            return self.report if self.report_key == key else None
+
+    def request(self, callback, today: date = None, before=None) -> None:
+        """
+        Calls 'callback' with a report describing the current history. A cached report is passed straight away;
+        otherwise it is computed on the pool and 'callback' is called from a background thread. 'before' runs
+        first on that thread, e.g. to wait for pending writes to reach the database.
+        """
+
+        today = (today or date.today()).toordinal()
+        with self.lock:
+            key = (self.generation, today)
+            if self.report_key == key:
+                report = self.report
+            else:
+                report = None
+                self.callbacks.append(callback)
+                if self.pending_key == key:
+                    return
+                self.pending_key = key
+
+        if report is not None:
+            callback(report)
+            return
+
+        threading.Thread(
+            target=self._compute,
+            args=(key, before),
+            name="trend-analytics",
+            daemon=True,
+        ).start()
+
+    def _compute(self, key, before) -> None:
+        """
+        Helper for 'request' running on a background thread. Callers still waiting when a newer request has started
+        are left for that request to answer.
+        """
+
+        try:
+            if before is not None:
+                before()
+            report = compute_report(self.db_path, key[1], self._executor())
+        except (OSError, sqlite3.Error, ValueError, RuntimeError, CancelledError) as e:
+            # A pool shut down while the app closes isn't worth reporting.
+            if not self.closed:
+                from kivy.logger import Logger
+
+                Logger.error(f"Analytics: {e}")
+            with self.lock:
+                if self.pending_key == key:
+                    self.pending_key = None
+                    self.callbacks = []
+            return
+
+        with self.lock:
+            if self.pending_key != key:
+                return
+            self.report = report
+            self.report_key = key
+            self.pending_key = None
+            callbacks, self.callbacks = self.callbacks, []
+
+        for callback in callbacks:
+            callback(report)
+
+    def _executor(self):
+        """
+        Starts the pool on first use.
+        """
+
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("The analytics pool has been shut down")
+            if self.executor is None:
+                self.executor = start_pool(self.max_workers)
+            return self.executor
+
+    def shutdown(self) -> None:
+        with self.lock:
+            self.closed = True
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,1244 @@
+# Standard library imports
+import os
+from datetime import date, timedelta
+
+# Third-party imports
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.logger import Logger
+from kivy.properties import BooleanProperty, NumericProperty
+from kivy.uix.screenmanager import SlideTransition
+from kivy.utils import platform
+from kivymd.app import MDApp
+
+# Local/application-specific imports
+from custom_widgets import (
+    AgendaHeader,
+    AgendaWidget,
+    ButtonPool,
+    DiagnosticsOverlay,
+    ItemButton,
+    LocationHeader,
+    SearchResultWidget,
+    TaskButton,
+)
+from data_structures import (
+    AgendaIndex,
+    LinkedList,
+    OperationJournal,
+    SearchIndex,
+    StatsScreen,
+    Trie,
+    combine_quantities,
+)
+import database
+import diagnostics
+from recurrence import RecurrenceRule
+
+# Set TODOAPP_BINARY_SNAPSHOT to 1 to start from 'main.db.bin' when it matches the database, and to write it when
+# the app closes. Read here so 'binary_snapshot' is only imported when it is used.
+BINARY_SNAPSHOT = os.environ.get("TODOAPP_BINARY_SNAPSHOT") == "1"
+
+# Seconds between backup copies of the database.
+AUTOSAVE_INTERVAL = 30
+
+# Days shown on the agenda screen, starting today.
+AGENDA_DAYS = 30
+
+# Search starts once the query has this many characters, and shows at most SEARCH_LIMIT results.
+SEARCH_MIN_LENGTH = 2
+SEARCH_LIMIT = 50
+
+# Seconds of quiet after a change before hidden screens are prepared, so a burst of edits rebuilds them once and
+# never during a screen transition.
+PREFETCH_DELAY = 0.5
+
+# Seconds between refreshes of the memory overlay. Sizing every structure walks every node, so it isn't per frame.
+MEMORY_OVERLAY_INTERVAL = 5
+
+# Seconds between refreshes of the handler latency overlay.
+TRACE_OVERLAY_INTERVAL = 1
+
+TABLE_NAMES = {
+    "Current": "current_task_list",
+    "Repeat": "repeat_task_list",
+    "List": "item_list",
+}
+
+
+class MainApp(MDApp):
+    """
+    Main application class for managing task-related UI and data.
+    """
+
+    # While selecting, pressing a task or item toggles it instead of opening its dialog.
+    selection_mode = BooleanProperty(False)
+    selected_count = NumericProperty(0)
+
+    def __init__(self, **kwargs):
+        """
+        - Initialize the application, setting up internal data structures.
+        - Stores a reference so only a single unedited new widget can exist at a time. Allows for quick dismissal of widget's dialog box if no changes are made.
+        """
+
+        super().__init__(**kwargs)
+
+        self.screen_position_lookup = {
+            "Current": 0,
+            "Repeat": 1,
+            "Agenda": 2,
+            "List": 3,
+            "Stats": 4,
+            "Search": 5,
+        }
+        self.current_task_list = LinkedList("Current Tasks", "Task")
+        self.repeat_task_list = LinkedList("Repeat Tasks", "Task")
+        self.item_list = LinkedList("Item List", "Item")
+        self.stats_screen = StatsScreen()
+        self.agenda = AgendaIndex()
+        self.search_index = SearchIndex()
+        self.search_return_screen = "Current"
+        self.collapsed_locations = set()
+        self.location_filter = None
+        self.autocomplete = Trie()
+        self.task_button_pool = ButtonPool(TaskButton)
+        self.item_button_pool = ButtonPool(ItemButton)
+        self.journal = OperationJournal(max_bytes=256 * 1024)
+        self.save_report = database.SaveReport()
+        self.palette_cache = None
+        self.unedited_new_widget = None
+        self.selected_buttons = []
+        self.next_archive_id = 1
+        self.trend_analytics = None
+        self.stale_screens = {"Current", "Repeat", "Agenda", "List", "Stats"}
+        self.prepared_day = date.today()
+        self.prefetch_trigger = Clock.create_trigger(
+            self.prefetch_screens, PREFETCH_DELAY
+        )
+
+    def build(self):
+        """
+        Configure initial window size and app theme.
+        """
+
+        if platform in ("android", "ios"):
+            Window.fullscreen = "auto"
+        else:
+            Window.size = (360, 740)
+
+        self.theme_cls.theme_style_switch_animation = True
+        self.theme_cls.theme_style = "Dark"
+        self.theme_cls.primary_palette = "Aliceblue"
+        self.color_index = 0
+
+    def on_start(self):
+        """
+        If a previous database exists, the application is rebuilt to its previous state. Changes made while loading
+        are queued and written once the database writer starts.
+        """
+
+        super().on_start()
+
+        self.database_writer = database.DatabaseWriter("main.db")
+
+        recovered = database.recover_snapshot("main.db")
+        snapshot = None
+        if recovered and BINARY_SNAPSHOT:
+            import binary_snapshot
+
+            snapshot = binary_snapshot.open_snapshot("main.db", "main.db.bin")
+
+        if snapshot:
+            self.rebuild_from_binary_snapshot(snapshot)
+        elif recovered:
+            import asynckivy
+
+            async def set_app():
+                connection, cursor = database.initialize_db()
+                self.rebuild_current_task_list(cursor)
+                self.rebuild_repeat_task_list(cursor)
+                self.rebuild_item_list(cursor)
+                self.rebuild_stats_screen(cursor)
+                self.rebuild_completed_tasks(cursor)
+                self.rebuild_purchased_items(cursor)
+                self.rebuild_item_locations(cursor)
+                self.next_archive_id = database.next_archive_id(cursor)
+                database.close_db(connection, cursor)
+
+            asynckivy.start(set_app())
+
+        for title in self.stats_screen.completed_tasks.keys():
+            self.autocomplete.insert(title)
+        for title in self.stats_screen.purchased_items.keys():
+            self.autocomplete.insert(title)
+        for location in self.stats_screen.locations:
+            self.autocomplete.insert(location)
+
+        self.database_writer.start()
+        Clock.schedule_interval(self.autosave, AUTOSAVE_INTERVAL)
+        self.prefetch_trigger()
+
+        from palettes import PaletteCache
+
+        self.palette_cache = PaletteCache("palettes.json")
+        self.palette_cache.load()
+        self.palette_cache.generate(self.theme_cls, self.color_index + 1)
+
+        if diagnostics.memory_enabled() or diagnostics.tracer.enabled:
+            self.diagnostics_overlay = DiagnosticsOverlay(size=Window.size)
+            Window.bind(size=self.diagnostics_overlay.setter("size"))
+            Window.add_widget(self.diagnostics_overlay)
+        if diagnostics.memory_enabled():
+            diagnostics.memory_probe.start()
+            Clock.schedule_interval(self.update_memory_overlay, MEMORY_OVERLAY_INTERVAL)
+        if diagnostics.tracer.enabled:
+            Clock.schedule_interval(self.record_frame, 0)
+            Clock.schedule_interval(self.update_trace_overlay, TRACE_OVERLAY_INTERVAL)
+
+    def rebuild_from_binary_snapshot(self, snapshot):
+        """
+        Rebuilds the lists and stats from a binary snapshot of the database, then indexes and shows them the same
+        way as the rebuild from the database.
+        """
+
+        snapshot.load_task_list(self.current_task_list, "current")
+        snapshot.load_task_list(self.repeat_task_list, "repeat")
+        snapshot.load_item_list(self.item_list)
+        snapshot.load_stats(self.stats_screen)
+        self.next_archive_id = snapshot.next_archive_id
+        snapshot.close()
+
+        for list_key, linked_list, container in (
+            ("Current", self.current_task_list, self.root.ids.current_screen_container),
+            ("Repeat", self.repeat_task_list, self.root.ids.repeat_screen_container),
+        ):
+            for node in linked_list.iter_nodes():
+                self.agenda.update(list_key, node)
+                self.search_index.update(list_key, node)
+                container.add_widget(self.task_button_pool.acquire(node))
+        self.update_current_screen()
+
+        for node in self.item_list.iter_nodes():
+            self.search_index.update("List", node)
+        self.render_item_groups()
+
+    def rebuild_current_task_list(self, cursor):
+        """
+        Rebuild the current task list from the database.
+        """
+
+        current_rows = database.get_task_list(cursor, "current_task_list")
+        current_container = self.root.ids.current_screen_container
+
+        for row in current_rows:
+            node = self.current_task_list.add_node_handler(row[0])
+            node.title = row[1]
+            node.first_step = row[2]
+            node.second_step = row[3]
+            node.third_step = row[4]
+            node.start_date = date.fromordinal(row[5])
+            node.repeat_toggle = bool(row[6])
+            node.interval_index = row[7]
+            if row[8]:
+                node.recurrence = RecurrenceRule.from_string(row[8])
+            node.mark_clean()
+            self.agenda.update("Current", node)
+            self.search_index.update("Current", node)
+            widget = self.task_button_pool.acquire(node)
+            current_container.add_widget(widget)
+
+    def rebuild_repeat_task_list(self, cursor):
+        """
+        Rebuild the current task list from the database.
+        """
+
+        repeat_rows = database.get_task_list(cursor, "repeat_task_list")
+        repeat_container = self.root.ids.repeat_screen_container
+
+        for row in repeat_rows:
+            node = self.repeat_task_list.add_node_handler(row[0])
+            node.title = row[1]
+            node.first_step = row[2]
+            node.second_step = row[3]
+            node.third_step = row[4]
+            node.start_date = date.fromordinal(row[5])
+            node.repeat_toggle = bool(row[6])
+            node.interval_index = row[7]
+            if row[8]:
+                node.recurrence = RecurrenceRule.from_string(row[8])
+            node.mark_clean()
+            self.agenda.update("Repeat", node)
+            self.search_index.update("Repeat", node)
+            widget = self.task_button_pool.acquire(node)
+            repeat_container.add_widget(widget)
+
+        self.update_current_screen()
+
+    def rebuild_item_list(self, cursor):
+        """
+        Rebuild the item list from the database.
+        """
+
+        item_rows = database.get_item_list(cursor)
+
+        for row in item_rows:
+            node = self.item_list.add_node_handler(row[0])
+            node.title = row[1]
+            node.quantity = row[2]
+            node.item_location = row[3]
+            node.interval_index = row[4]
+            node.mark_clean()
+            self.item_list.reindex_item(node)
+            self.search_index.update("List", node)
+
+        self.render_item_groups()
+
+    def rebuild_stats_screen(self, cursor):
+        """
+        Rebuild the stats screen with updated data from the database.
+        """
+
+        stats_row = database.get_stats_data(cursor)
+        if not stats_row:
+            return
+        self.stats_screen.current_level = stats_row[0][0]
+        self.stats_screen.current_xp = stats_row[0][1]
+        self.stats_screen.start_level = stats_row[0][2]
+        self.stats_screen.next_level = stats_row[0][3]
+
+    def rebuild_completed_tasks(self, cursor):
+        """
+        Rebuild the list of completed tasks from the database.
+        """
+
+        completed_task_rows = database.get_stats_maps(cursor, "completed_tasks")
+        for title, count in completed_task_rows:
+            self.stats_screen.completed_tasks[title] = count
+
+    def rebuild_purchased_items(self, cursor):
+        """
+        Rebuild the list of purchased items from the database.
+        """
+
+        purchased_item_rows = database.get_stats_maps(cursor, "purchased_items")
+        for title, count in purchased_item_rows:
+            self.stats_screen.purchased_items[title] = count
+
+    def rebuild_item_locations(self, cursor):
+        """
+        Rebuild the list of item locations from the database.
+        """
+
+        item_locations_rows = database.get_item_locations(cursor)
+        for location in item_locations_rows:
+            self.stats_screen.locations.add(location)
+
+    def persist_node(self, node):
+        """
+        Queues a write of the node's dirty columns, unless the node is unchanged or has already been deleted from its
+        list. The node is also reindexed for search, and tasks for the agenda.
+        """
+
+        for list_key, linked_list in (
+            ("Current", self.current_task_list),
+            ("Repeat", self.repeat_task_list),
+            ("List", self.item_list),
+        ):
+            if linked_list.node_lookup.get(node.id_num) is node:
+                table_name = TABLE_NAMES[list_key]
+                values = database.dirty_values(table_name, node)
+                self.save_report.record(
+                    len(values), len(database.TABLE_COLUMNS[table_name])
+                )
+                if not values:
+                    return
+                if list_key == "List":
+                    self.item_list.reindex_item(node)
+                else:
+                    self.agenda.update(list_key, node)
+                self.search_index.update(list_key, node)
+                self.database_writer.upsert(table_name, node.id_num, values)
+                node.mark_clean()
+                self.mark_stale(list_key)
+                return
+
+    def persist_delete(self, list_key, id_num):
+        """
+        Queues the removal of a deleted node's row.
+        """
+
+        self.database_writer.delete(TABLE_NAMES[list_key], id_num)
+        self.search_index.remove(list_key, id_num)
+        if list_key != "List":
+            self.agenda.remove(list_key, id_num)
+        self.mark_stale(list_key)
+
+    def persist_stats(self, map_name=None, title=None, location=None):
+        """
+        Queues a write of the level and xp, plus the count of a completed task or purchased item if given.
+        """
+
+        columns = database.TABLE_COLUMNS["stats_screen"]
+        values = dict(zip(columns, self.stats_screen.get_state()))
+        self.database_writer.upsert("stats_screen", 1, values)
+
+        if map_name:
+            count = getattr(self.stats_screen, map_name).get(title)
+            if count:
+                self.database_writer.upsert(map_name, title, {"count": count})
+            else:
+                self.database_writer.delete(map_name, title)
+        if location is not None:
+            self.database_writer.upsert("item_locations", location, {})
+        self.mark_stale("Stats")
+
+    def autosave(self, *args):
+        """
+        Asks the database writer for a backup copy. Never waits on disk.
+        """
+
+        self.database_writer.request_backup()
+
+    def on_pause(self):
+        """
+        Flushes and backs up when the app is sent to the background, since mobile platforms may kill it without
+        calling on_stop.
+        """
+
+        self.autosave()
+        return True
+
+    def on_stop(self):
+        """
+        Waits for the database writer to commit all queued changes.
+        """
+
+        Clock.unschedule(self.autosave)
+        if self.trend_analytics:
+            self.trend_analytics.shutdown()
+        self.database_writer.close()
+        if BINARY_SNAPSHOT:
+            import binary_snapshot
+
+            binary_snapshot.write_snapshot("main.db", "main.db.bin")
+        if self.palette_cache.dirty:
+            self.palette_cache.save()
+        Logger.info(f"Database: {self.save_report}")
+        if diagnostics.tracer.enabled:
+            for line in diagnostics.tracer.format_report().splitlines():
+                Logger.info(f"Trace: {line}")
+
+        return super().on_stop()
+
+    @diagnostics.trace_handler
+    def on_switch_tabs(self, nav_bar, nav_item, item_icon, item_text):
+        """
+        Handle switching between different tabs in the UI. Default function of MDNavigationBar.
+        """
+
+        current_screen = self.root.ids.main_screen_manager.current
+        current_pos = self.screen_position_lookup[current_screen]
+        target_pos = self.screen_position_lookup[item_text]
+
+        if target_pos > current_pos:
+            slide_direction = "left"
+        elif target_pos < current_pos:
+            slide_direction = "right"
+        else:
+            return
+
+        self.end_selection()
+        self.root.ids.main_screen_manager.transition = SlideTransition(
+            direction=slide_direction
+        )
+
+        # Screens are normally prepared while hidden. Only a change made moments ago is rebuilt here.
+        self.check_day_rollover()
+        if item_text in self.stale_screens:
+            self.prepare_screen(item_text)
+
+        self.set_current_screen(item_text)
+        # The screen just left may have changed while it was visible.
+        if current_screen in self.stale_screens:
+            self.prefetch_trigger()
+
+    def mark_stale(self, list_key):
+        """
+        Marks the screens showing a list as needing a rebuild and schedules them to be prepared while hidden.
+        Task changes also affect the agenda.
+        """
+
+        self.stale_screens.add(list_key)
+        if list_key in ("Current", "Repeat"):
+            self.stale_screens.add("Agenda")
+        self.prefetch_trigger()
+
+    def check_day_rollover(self):
+        """
+        Tasks become due at midnight, so a new day makes the task screens stale without any change to the data.
+        """
+
+        today = date.today()
+        if today != self.prepared_day:
+            self.prepared_day = today
+            self.stale_screens.update(("Current", "Repeat", "Agenda"))
+
+    def prefetch_screens(self, *args):
+        """
+        Prepares one stale hidden screen per frame, so switching to it later only starts the transition. The visible
+        screen is left alone rather than reordered under the user.
+        """
+
+        self.check_day_rollover()
+        visible = self.root.ids.main_screen_manager.current
+        for screen_name in self.screen_position_lookup:
+            if screen_name in self.stale_screens and screen_name != visible:
+                self.prepare_screen(screen_name)
+                Clock.schedule_once(self.prefetch_screens)
+                return
+
+    def prepare_screen(self, screen_name):
+        """
+        Rebuilds a screen from its data structures.
+        """
+
+        self.stale_screens.discard(screen_name)
+
+        if screen_name == "Repeat" or screen_name == "List":
+            self.sort_and_update_screen(screen_name)
+        elif screen_name == "Current":
+            self.update_current_screen()
+            self.sort_and_update_screen(screen_name)
+        elif screen_name == "Agenda":
+            self.update_agenda_screen()
+        elif screen_name == "Stats":
+            self.update_stats_screen()
+
+    @diagnostics.trace_handler
+    @diagnostics.track_memory
+    def sort_and_update_screen(self, screen_name):
+        """
+        Sort tasks or items and update the corresponding screen.
+        """
+
+        if screen_name == "Current":
+            self.current_task_list.sort_linked_list()
+            container = self.root.ids.current_screen_container
+            self.task_button_pool.release_all(container)
+            current = self.current_task_list.head.next
+            while current != self.current_task_list.tail:
+                task_widget = self.task_button_pool.acquire(current)
+                container.add_widget(task_widget)
+                current = current.next
+        elif screen_name == "Repeat":
+            self.repeat_task_list.sort_linked_list()
+            container = self.root.ids.repeat_screen_container
+            self.task_button_pool.release_all(container)
+            current = self.repeat_task_list.head.next
+            while current != self.repeat_task_list.tail:
+                task_widget = self.task_button_pool.acquire(current)
+                container.add_widget(task_widget)
+                current = current.next
+        elif screen_name == "List":
+            self.render_item_groups()
+
+    @diagnostics.trace_handler
+    def render_item_groups(self):
+        """
+        Shows the items grouped under a header per location, straight from the item list's location index.
+        Collapsed groups show only their header, and a location filter shows only that group.
+        """
+
+        container = self.root.ids.list_screen_container
+        self.item_button_pool.release_all(container)
+
+        if self.location_filter is not None:
+            locations = [self.location_filter]
+        else:
+            locations = self.item_list.locations()
+
+        for location_key in locations:
+            collapsed = location_key in self.collapsed_locations
+            filtered = location_key == self.location_filter
+            container.add_widget(LocationHeader(location_key, collapsed, filtered))
+            if collapsed:
+                continue
+            for node in self.item_list.location_index.get(location_key, {}).values():
+                container.add_widget(self.item_button_pool.acquire(node))
+
+    def toggle_location_group(self, location_key):
+        self.collapsed_locations ^= {location_key}
+        self.render_item_groups()
+
+    def filter_location(self, location_key):
+        """
+        Shows only the items at a location, or every location again if it was already the filter.
+        """
+
+        if self.location_filter == location_key:
+            self.location_filter = None
+        else:
+            self.location_filter = location_key
+            self.collapsed_locations.discard(location_key)
+        self.render_item_groups()
+
+    def set_current_screen(self, screen_name):
+        """
+        Set the current screen based on navigation.
+        """
+
+        self.root.ids.main_screen_manager.current = screen_name
+
+    @diagnostics.trace_handler
+    def add_to_active_screen(self, screen_name):
+        """
+        Add a new task or item to the currently active screen.
+        """
+
+        self.end_selection()
+
+        if screen_name == "Current":
+            scroll_view = self.root.ids.current_screen_scroll_view
+            container = self.root.ids.current_screen_container
+            new_task_node = self.current_task_list.add_node_handler()
+            pool = self.task_button_pool
+        elif screen_name == "Repeat":
+            scroll_view = self.root.ids.repeat_screen_scroll_view
+            container = self.root.ids.repeat_screen_container
+            new_task_node = self.repeat_task_list.add_node_handler()
+            new_task_node.start_date += timedelta(days=1)
+            pool = self.task_button_pool
+        elif screen_name == "List":
+            scroll_view = self.root.ids.list_screen_scroll_view
+            container = self.root.ids.list_screen_container
+            new_task_node = self.item_list.add_node_handler()
+            pool = self.item_button_pool
+
+        new_task_widget = pool.acquire(new_task_node)
+
+        def add_new_widget(dialog):
+            # Added once the dialog has finished opening and covers the screen, so the relayout isn't seen.
+            dialog.unbind(on_open=add_new_widget)
+            # An unedited new widget may already have been discarded and returned to the pool.
+            if new_task_widget not in pool.free_buttons:
+                container.add_widget(new_task_widget)
+                if container.height > scroll_view.height * 0.9:
+                    scroll_view.scroll_to(new_task_widget)
+
+        self.unedited_new_widget = new_task_widget
+        if screen_name == "Current" or screen_name == "Repeat":
+            dialog = self.display_task_details(new_task_widget)
+        elif screen_name == "List":
+            dialog = self.display_item_details(new_task_widget)
+        dialog.bind(on_open=add_new_widget)
+
+    def get_new_widget(self, screen_name):
+        """
+        Get a new widget based on the current screen context.
+        """
+
+        if screen_name == "Current":
+            new_node = self.current_task_list.add_node_handler()
+            new_widget = self.task_button_pool.acquire(new_node)
+        elif screen_name == "Repeat":
+            new_node = self.repeat_task_list.add_node_handler()
+            new_widget = self.task_button_pool.acquire(new_node)
+        elif screen_name == "List":
+            new_node = self.item_list.add_node_handler()
+            new_widget = self.item_button_pool.acquire(new_node)
+
+        return (new_widget, new_node)
+
+    def display_task_details(self, selected_task):
+        """
+        Display details of a selected task in a dialog.
+        """
+
+        # Deferred so dialogs and their kv rules load on first use instead of at startup.
+        from dialog_widgets import TaskDialog, dialog_pool
+
+        dialog = dialog_pool.get(TaskDialog, selected_task, selected_task.task_node)
+        dialog.open()
+
+        return dialog
+
+    def display_item_details(self, selected_item):
+        """
+        Display details of a selected item in a dialog.
+        """
+
+        from dialog_widgets import ItemDialog, dialog_pool
+
+        dialog = dialog_pool.get(ItemDialog, selected_item, selected_item.item_node)
+        dialog.open()
+
+        return dialog
+
+    def on_list_button_press(self, button):
+        """
+        Opens the dialog of a pressed task or item, or toggles its selection in selection mode.
+        """
+
+        if self.selection_mode:
+            self.toggle_selected(button)
+        elif isinstance(button, ItemButton):
+            self.display_item_details(button)
+        else:
+            self.display_task_details(button)
+
+    def toggle_selection_mode(self):
+        if self.selection_mode:
+            self.end_selection()
+        else:
+            self.selection_mode = True
+
+    def toggle_selected(self, button):
+        button.selected = not button.selected
+        if button.selected:
+            self.selected_buttons.append(button)
+        else:
+            self.selected_buttons.remove(button)
+        self.selected_count = len(self.selected_buttons)
+
+    def end_selection(self):
+        for button in self.selected_buttons:
+            button.selected = False
+        self.selected_buttons = []
+        self.selected_count = 0
+        self.selection_mode = False
+
+    def take_selection(self):
+        """
+        Ends selection mode and returns the selected nodes in the order they were selected.
+        """
+
+        nodes = [
+            button.item_node if isinstance(button, ItemButton) else button.task_node
+            for button in self.selected_buttons
+        ]
+        self.end_selection()
+
+        return nodes
+
+    def open_batch_date_picker(self):
+        """
+        Opens a date picker that moves every selected task to the chosen date.
+        """
+
+        if not self.selected_buttons:
+            return
+
+        from dialog_widgets import BatchDatePicker
+
+        today = date.today()
+        date_dialog = BatchDatePicker(
+            min_date=today,
+            max_date=date(year=today.year + 1, month=today.month, day=today.day),
+        )
+        date_dialog.open()
+
+    @diagnostics.trace_handler
+    def batch_complete(self):
+        """
+        Completes the selected tasks on the Current screen, or purchases the selected items on the List screen.
+        The stats are updated in one call, the rows are written in one transaction and the screen is rebuilt once.
+        Undo reverts the whole batch.
+        """
+
+        screen_name = self.root.ids.main_screen_manager.current
+        if screen_name not in ("Current", "List"):
+            return
+        nodes = self.take_selection()
+        if not nodes:
+            return
+
+        self.journal.begin()
+        with self.database_writer.batch():
+            if screen_name == "List":
+                self._purchase_items(nodes)
+            else:
+                self._complete_tasks(nodes)
+        self.journal.end()
+
+        self.prepare_screen(screen_name)
+
+    def _complete_tasks(self, nodes):
+        """
+        Helper for 'batch_complete'. Repeating tasks are rescheduled on the Repeat screen, as with a single completion.
+        """
+
+        titles = [node.title for node in nodes if node.title]
+        # Every stats operation holds the level and xp from before the batch, which undo restores.
+        for title in titles:
+            self.journal.record(self.stats_op("completed_tasks", title))
+        self.stats_screen.record_batch("completed_tasks", titles)
+        for title in dict.fromkeys(titles):
+            self.persist_stats("completed_tasks", title)
+            self.autocomplete.insert(title)
+
+        for node in nodes:
+            self.archive_task(node)
+            if node.repeat_toggle:
+                new_node = self.repeat_task_list.add_node_handler()
+                node.clone_self(new_node)
+                new_node.advance_start_date()
+                self.persist_node(new_node)
+                self.journal.record(("delete", "Repeat", new_node.id_num))
+            self.journal.record(self.restore_op("Current", node))
+            self.current_task_list.delete_node_handler(node.id_num)
+            self.persist_delete("Current", node.id_num)
+
+    def _purchase_items(self, nodes):
+        """
+        Helper for 'batch_complete' purchasing items.
+        """
+
+        purchased = [node for node in nodes if node.title]
+        titles = [node.title for node in purchased]
+        locations = [node.item_location for node in purchased]
+        for title in titles:
+            self.journal.record(self.stats_op("purchased_items", title))
+        self.stats_screen.record_batch("purchased_items", titles, locations)
+        for title in dict.fromkeys(titles):
+            self.persist_stats("purchased_items", title)
+            self.autocomplete.insert(title)
+        for location in dict.fromkeys(locations):
+            self.persist_stats(location=location)
+            self.autocomplete.insert(location)
+
+        for node in nodes:
+            self.journal.record(self.restore_op("List", node))
+            self.item_list.delete_node_handler(node.id_num)
+            self.persist_delete("List", node.id_num)
+
+    @diagnostics.trace_handler
+    def batch_delete(self):
+        """
+        Deletes the selected tasks or items as one undo step. Repeating tasks are deleted without asking whether to
+        keep their next occurrence.
+        """
+
+        screen_name = self.root.ids.main_screen_manager.current
+        nodes = self.take_selection()
+        if not nodes:
+            return
+        linked_list = self._journal_target(screen_name)[0]
+
+        self.journal.begin()
+        with self.database_writer.batch():
+            for node in nodes:
+                self.journal.record(self.restore_op(screen_name, node))
+                linked_list.delete_node_handler(node.id_num)
+                self.persist_delete(screen_name, node.id_num)
+        self.journal.end()
+
+        self.prepare_screen(screen_name)
+
+    @diagnostics.trace_handler
+    def batch_reschedule(self, start_date):
+        """
+        Moves the selected tasks to a new date as one undo step. Current tasks moved past today wait on the Repeat
+        screen until they are due.
+        """
+
+        screen_name = self.root.ids.main_screen_manager.current
+        if screen_name not in ("Current", "Repeat"):
+            return
+        nodes = self.take_selection()
+        if not nodes:
+            return
+
+        self.journal.begin()
+        with self.database_writer.batch():
+            for node in nodes:
+                if screen_name == "Current" and start_date > date.today():
+                    new_node = self.repeat_task_list.add_node_handler()
+                    node.clone_self(new_node)
+                    new_node.reschedule(start_date)
+                    self.persist_node(new_node)
+                    self.journal.record(("delete", "Repeat", new_node.id_num))
+                    self.journal.record(self.restore_op("Current", node))
+                    self.current_task_list.delete_node_handler(node.id_num)
+                    self.persist_delete("Current", node.id_num)
+                else:
+                    self.journal.record(
+                        ("update", screen_name, node.id_num, node.get_fields())
+                    )
+                    node.reschedule(start_date)
+                    self.persist_node(node)
+        self.journal.end()
+
+        self.prepare_screen(screen_name)
+
+    @diagnostics.trace_handler
+    @diagnostics.track_memory
+    def update_stats_screen(self):
+        """
+        Update the stats screen with current statistics.
+        """
+        self.root.ids.start_level.text = str(self.stats_screen.current_level)
+        self.root.ids.next_level.text = str(self.stats_screen.current_level + 1)
+        xp_needed = self.stats_screen.next_level - self.stats_screen.current_xp
+        self.root.ids.xp_to_next_level.text = f"{xp_needed} xp to next level"
+
+        self.root.ids.completed_tasks_layout.set_counts(
+            self.stats_screen.completed_tasks
+        )
+        self.root.ids.purchased_items_layout.set_counts(
+            self.stats_screen.purchased_items
+        )
+        self.root.ids.progress_bar.fill_progress_bar()
+        self.request_trends()
+
+    def request_trends(self):
+        """
+        Shows the completion trends, computing them on the analytics pool if there have been completions since the
+        last report. The pool waits for queued writes to be committed before reading the database.
+        """
+
+        if self.trend_analytics is None:
+            import analytics
+
+            self.trend_analytics = analytics.TrendAnalytics("main.db")
+
+        report = self.trend_analytics.cached()
+        if report is not None:
+            self.show_trends(report)
+            return
+
+        self.trend_analytics.request(
+            lambda report: Clock.schedule_once(lambda dt: self.show_trends(report)),
+            before=lambda: self.database_writer.flush(timeout=5),
+        )
+
+    def show_trends(self, report):
+        import analytics
+
+        self.root.ids.trends_label.text = analytics.format_report(report)
+
+    @diagnostics.trace_handler
+    def update_agenda_screen(self):
+        """
+        Lists the tasks due over the next 'AGENDA_DAYS' days, grouped by date. Only the shown window is expanded.
+        """
+
+        container = self.root.ids.agenda_screen_container
+        container.clear_widgets()
+        today = date.today()
+
+        for day, entries in self.agenda.window(today, AGENDA_DAYS, today):
+            heading = "Today" if day == today else day.strftime("%a %b %d")
+            container.add_widget(AgendaHeader(text=heading))
+            for node, projected in entries:
+                note = "repeat" if projected else ""
+                container.add_widget(AgendaWidget(node.title, note))
+
+    def open_search_screen(self):
+        """
+        Slides in the search screen, remembering the screen to return to.
+        """
+
+        self.end_selection()
+        self.search_return_screen = self.root.ids.main_screen_manager.current
+        self.root.ids.main_screen_manager.transition = SlideTransition(direction="left")
+        self.set_current_screen("Search")
+        self.update_search_results(self.root.ids.search_field.text)
+
+    def close_search_screen(self):
+        self.on_switch_tabs(None, None, None, self.search_return_screen)
+
+    @diagnostics.trace_handler
+    def update_search_results(self, text):
+        """
+        Lists the tasks and items matching the query. Each keystroke is answered from the search index.
+        """
+
+        container = self.root.ids.search_screen_container
+        container.clear_widgets()
+
+        if len(text.strip()) < SEARCH_MIN_LENGTH:
+            return
+
+        for list_key, node in self.search_index.search(text, SEARCH_LIMIT):
+            container.add_widget(SearchResultWidget(list_key, node))
+
+    def open_search_result(self, list_key, node):
+        """
+        Switches to the screen holding a search result and opens its dialog.
+        """
+
+        linked_list, container, pool, node_attr = self._journal_target(list_key)
+        if linked_list.node_lookup.get(node.id_num) is not node:
+            self.update_search_results(self.root.ids.search_field.text)
+            return
+
+        navigation_item = self.root.ids[f"{list_key.lower()}_navigation_container"]
+        self.root.ids.nav_bar_container.set_active_item(navigation_item)
+        # The target screen is current once this returns, which the dialogs depend on.
+        self.on_switch_tabs(None, None, None, list_key)
+
+        for button in container.children:
+            if getattr(button, node_attr, None) is node:
+                if list_key == "List":
+                    self.display_item_details(button)
+                else:
+                    self.display_task_details(button)
+                return
+
+    @diagnostics.trace_handler
+    def update_current_screen(self):
+        """
+        Update the current screen for tasks due today.
+        """
+
+        repeat_container = self.root.ids.repeat_screen_container
+        current_container = self.root.ids.current_screen_container
+
+        for old_button in list(repeat_container.children):
+            if old_button.task_node.start_date <= date.today():
+                new_button = self._copy_old_button(old_button)
+                self._delete_old_button(old_button, old_button.task_node)
+                current_container.add_widget(new_button)
+
+    def _copy_old_button(self, old_button):
+        """
+        Helper function for 'update_current_screen' to create a new button for a task due today.
+        """
+
+        old_task_node = old_button.task_node
+        new_task_node = self.current_task_list.add_node_handler()
+        new_task_node.title = old_task_node.title
+        new_task_node.first_step = old_task_node.first_step
+        new_task_node.second_step = old_task_node.second_step
+        new_task_node.third_step = old_task_node.third_step
+        # The scheduled date stays as the anchor for the next occurrence, rather than the day the task was moved.
+        new_task_node.start_date = old_task_node.start_date
+        new_task_node.repeat_toggle = old_task_node.repeat_toggle
+        new_task_node.interval_index = old_task_node.interval_index
+        new_task_node.recurrence = old_task_node.recurrence
+        self.persist_node(new_task_node)
+        new_task_widget = self.task_button_pool.acquire(new_task_node)
+
+        return new_task_widget
+
+    def _delete_old_button(self, old_button, old_node):
+        """
+        Helper function for 'update_current_screen' to remove an old task button from the repeat screen.
+        """
+
+        linked_list = self.repeat_task_list
+        linked_list.delete_node_handler(old_node.id_num)
+        self.persist_delete("Repeat", old_node.id_num)
+        self.task_button_pool.release(old_button)
+
+    def undo(self):
+        """
+        Reverts the most recent delete or completion.
+        """
+
+        self.end_selection()
+        self.journal.undo(self.apply_journal_op)
+
+    def redo(self):
+        """
+        Re-applies the most recently undone delete or completion.
+        """
+
+        self.end_selection()
+        self.journal.redo(self.apply_journal_op)
+
+    def restore_op(self, list_key, node):
+        """
+        Builds the journal operation that re-creates a node about to be deleted.
+        """
+
+        return (
+            "restore",
+            list_key,
+            node.id_num,
+            node.previous.id_num,
+            node.get_fields(),
+        )
+
+    def archive_task(self, node):
+        """
+        Queues a completed task into the archive, recording the operation that removes it again.
+        """
+
+        archive_id = self.next_archive_id
+        self.next_archive_id += 1
+        row = database.archive_row(node, date.today())
+        self.database_writer.upsert(
+            "task_archive",
+            archive_id,
+            dict(zip(database.TABLE_COLUMNS["task_archive"], row)),
+        )
+        self.journal.record(("archive", archive_id, row, False))
+        if self.trend_analytics:
+            self.trend_analytics.invalidate()
+
+    def stats_op(self, map_name, title):
+        """
+        Builds the journal operation that reverts a completion or purchase about to be recorded.
+        """
+
+        return ("stats", map_name, title, -1, self.stats_screen.get_state())
+
+    def apply_journal_op(self, op):
+        """
+        Applies a single journal operation, touching only the affected node and button, and returns its inverse.
+        """
+
+        if op[0] == "stats":
+            _, map_name, title, delta, state = op
+            current_state = self.stats_screen.get_state()
+            self.stats_screen.adjust_count(map_name, title, delta)
+            self.stats_screen.set_state(state)
+            self.persist_stats(map_name, title)
+            return ("stats", map_name, title, -delta, current_state)
+
+        if op[0] == "archive":
+            _, archive_id, row, keep = op
+            if keep:
+                self.database_writer.upsert(
+                    "task_archive",
+                    archive_id,
+                    dict(zip(database.TABLE_COLUMNS["task_archive"], row)),
+                )
+            else:
+                self.database_writer.delete("task_archive", archive_id)
+            if self.trend_analytics:
+                self.trend_analytics.invalidate()
+            return ("archive", archive_id, row, not keep)
+
+        linked_list, container, pool, node_attr = self._journal_target(op[1])
+
+        if op[0] == "update":
+            _, list_key, id_num, fields = op
+            node = linked_list.node_lookup.get(id_num)
+            if not node:
+                return None
+            inverse_op = ("update", list_key, id_num, node.get_fields())
+            node.set_fields(fields)
+            self.persist_node(node)
+            return inverse_op
+
+        if op[0] == "delete":
+            node = linked_list.node_lookup.get(op[2])
+            if not node:
+                return None
+            inverse_op = self.restore_op(op[1], node)
+            for button in container.children:
+                if getattr(button, node_attr, None) is node:
+                    pool.release(button)
+                    break
+            linked_list.delete_node_handler(node.id_num)
+            self.persist_delete(op[1], node.id_num)
+            return inverse_op
+
+        _, list_key, id_num, previous_id, fields = op
+        node = linked_list.restore_node_handler(id_num, previous_id)
+        node.set_fields(fields)
+        self.persist_node(node)
+
+        if list_key == "List":
+            # Items are shown grouped by location rather than in list order.
+            self.render_item_groups()
+            return ("delete", list_key, id_num)
+
+        index = 0
+        for position, button in enumerate(container.children):
+            if getattr(button, node_attr, None) is node.previous:
+                index = position
+                break
+        else:
+            if node.previous is linked_list.head:
+                index = len(container.children)
+        container.add_widget(pool.acquire(node), index=index)
+
+        return ("delete", list_key, id_num)
+
+    def merge_duplicate_item(self, item_button, duplicate):
+        """
+        Folds a new item's quantity into an existing item with the same title, location and unit family, then
+        discards the new item's node and button. Undo restores the existing item's previous quantity.
+        """
+
+        node = item_button.item_node
+        self.journal.record(
+            ("update", "List", duplicate.id_num, duplicate.get_fields())
+        )
+        duplicate.quantity, duplicate.interval_index = combine_quantities(
+            duplicate.quantity,
+            duplicate.interval_index,
+            node.quantity,
+            node.interval_index,
+        )
+        self.persist_node(duplicate)
+
+        self.item_list.delete_node_handler(node.id_num)
+        self.persist_delete("List", node.id_num)
+        self.item_button_pool.release(item_button)
+
+    def _journal_target(self, list_key):
+        """
+        Helper for 'apply_journal_op' to find the list, container and button pool for a screen.
+        """
+
+        if list_key == "Current":
+            return (
+                self.current_task_list,
+                self.root.ids.current_screen_container,
+                self.task_button_pool,
+                "task_node",
+            )
+        elif list_key == "Repeat":
+            return (
+                self.repeat_task_list,
+                self.root.ids.repeat_screen_container,
+                self.task_button_pool,
+                "task_node",
+            )
+        return (
+            self.item_list,
+            self.root.ids.list_screen_container,
+            self.item_button_pool,
+            "item_node",
+        )
+
+    def memory_structures(self):
+        return diagnostics.app_structures(
+            self.current_task_list,
+            self.repeat_task_list,
+            self.item_list,
+            self.autocomplete,
+            self.stats_screen,
+        )
+
+    def update_memory_overlay(self, *args):
+        """
+        Shows the size of each structure and the allocations of the most recent tracked operations.
+        """
+
+        sizes = diagnostics.measure_structures(self.memory_structures())
+        diffs = list(diagnostics.memory_probe.diffs)[-3:]
+        self.diagnostics_overlay.memory_text = diagnostics.format_memory_report(
+            sizes, diffs, diagnostics.memory_probe.traced_memory()
+        )
+
+    def record_frame(self, dt):
+        diagnostics.tracer.record_frame(dt)
+
+    def update_trace_overlay(self, *args):
+        self.diagnostics_overlay.trace_text = diagnostics.tracer.format_report()
+
+    @diagnostics.trace_handler
+    def cycle_color_schemes(self):
+        """
+        Switches to the next palette, using the colors generated ahead of time when available.
+        """
+
+        from palettes import PALETTE_NAMES
+
+        self.color_index = (self.color_index + 1) % len(PALETTE_NAMES)
+        self.palette_cache.apply(self.theme_cls, PALETTE_NAMES[self.color_index])
@@ -0,0 +1,553 @@
+# Standard library imports
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from datetime import date
+
+# Local/application-specific imports
+from data_structures import LinkedList, StatsScreen
+import database
+from recurrence import RecurrenceRule
+
+MAGIC = b"TODOSNAP"
+FORMAT_VERSION = 1
+
+# Magic, format version, size and modification time of the database the snapshot was written from, next archive
+# id, level, xp, start and next level, then the record count of each section in SECTIONS order.
+HEADER = struct.Struct("<8sIQqq4q7I")
+
+# Fixed-width records. Text is stored as an index into the string table, with NO_STRING standing for None, and
+# a missing interval is stored as -1.
+TASK_RECORD = struct.Struct("<qIIIIiBbI")
+ITEM_RECORD = struct.Struct("<qIIIb")
+COUNT_RECORD = struct.Struct("<Iq")
+LOCATION_RECORD = struct.Struct("<I")
+STRING_OFFSET = struct.Struct("<I")
+NO_STRING = 0xFFFFFFFF
+
+SECTIONS = (
+    ("current", TASK_RECORD),
+    ("repeat", TASK_RECORD),
+    ("items", ITEM_RECORD),
+    ("completed_tasks", COUNT_RECORD),
+    ("purchased_items", COUNT_RECORD),
+    ("locations", LOCATION_RECORD),
+    ("strings", STRING_OFFSET),
+)
+
+
+def database_stamp(db_path) -> tuple:
+    """
+    Size and modification time of the database. Any write made after the snapshot, by the app or the CLI,
+    changes at least one of them.
+    """
+
+    stat = os.stat(db_path)
+
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class StringTable:
+    """
+    Collects the distinct strings of a snapshot while it is written, so repeated titles, steps and locations are
+    stored once.
+    """
+
+    def __init__(self) -> None:
+        self.indexes = {}
+        self.strings = []
+
+    def add(self, text) -> int:
+        if text is None:
+            return NO_STRING
+        text = str(text)
+        index = self.indexes.get(text)
+        if index is None:
+            index = self.indexes[text] = len(self.strings)
+            self.strings.append(text.encode("utf-8"))
+
+        return index
+
+    def pack(self) -> tuple:
+        """
+        Returns the offsets section, with one extra offset marking the end of the last string, and the UTF-8 data.
+        """
+
+        offsets = bytearray()
+        position = 0
+        for data in self.strings:
+            offsets += STRING_OFFSET.pack(position)
+            position += len(data)
+        offsets += STRING_OFFSET.pack(position)
+
+        return bytes(offsets), b"".join(self.strings)
+
+
+def pack_snapshot(cursor, stamp) -> list:
+    """
+    Returns the chunks of a snapshot of the lists and stats in the database, stamped with the database's size and
+    modification time.
+    """
+
+    strings = StringTable()
+    sections = {}
+
+    for section, list_name in (
+        ("current", "current_task_list"),
+        ("repeat", "repeat_task_list"),
+    ):
+        sections[section] = [
+            TASK_RECORD.pack(
+                row[0],
+                strings.add(row[1]),
+                strings.add(row[2]),
+                strings.add(row[3]),
+                strings.add(row[4]),
+                row[5],
+                bool(row[6]),
+                -1 if row[7] is None else row[7],
+                strings.add(row[8]),
+            )
+            for row in database.get_task_list(cursor, list_name)
+        ]
+    sections["items"] = [
+        ITEM_RECORD.pack(
+            row[0],
+            strings.add(row[1]),
+            strings.add(row[2]),
+            strings.add(row[3]),
+            -1 if row[4] is None else row[4],
+        )
+        for row in database.get_item_list(cursor)
+    ]
+    for map_name in ("completed_tasks", "purchased_items"):
+        sections[map_name] = [
+            COUNT_RECORD.pack(strings.add(title), count)
+            for title, count in database.get_stats_maps(cursor, map_name)
+        ]
+    sections["locations"] = [
+        LOCATION_RECORD.pack(strings.add(location))
+        for location in database.get_item_locations(cursor)
+    ]
+
+    stats_row = database.get_stats_data(cursor)
+    stats_state = stats_row[0] if stats_row else StatsScreen().get_state()
+    offsets, string_data = strings.pack()
+    counts = [len(sections[name]) for name, _ in SECTIONS[:-1]]
+    counts.append(len(strings.strings))
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        *stamp,
+        database.next_archive_id(cursor),
+        *stats_state,
+        *counts,
+    )
+
+    chunks = [header]
+    chunks.extend(b"".join(sections[name]) for name, _ in SECTIONS[:-1])
+    chunks.extend((offsets, string_data))
+
+    return chunks
+
+
+def write_snapshot(db_path="main.db", path="main.db.bin"):
+    """
+    Writes the lists and stats in 'db_path' to a binary snapshot, through a temporary file and an atomic rename.
+    Read from the database rather than from memory, so the snapshot holds exactly what a database load would.
+    """
+
+    temp_path = f"{path}.tmp"
+    connection = None
+    try:
+        connection = sqlite3.connect(db_path)
+        chunks = pack_snapshot(connection.cursor(), database_stamp(db_path))
+        with open(temp_path, "wb") as stream:
+            stream.writelines(chunks)
+        os.replace(temp_path, path)
+    except (OSError, sqlite3.Error, struct.error) as e:
+        print(f"An error occurred: {e}")
+        return False
+    finally:
+        if connection:
+            connection.close()
+
+    return True
+
+
+class BinarySnapshot:
+    """
+    Read-only view of a snapshot file through mmap. Records are unpacked straight from the mapping and each string
+    is decoded the first time a record refers to it, so nothing is parsed ahead of the nodes being built.
+    """
+
+    def __init__(self, stream) -> None:
+        self.mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mapping)
+
+        fields = HEADER.unpack_from(self.view)
+        magic, version = fields[0], fields[1]
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("not a snapshot of this format")
+        self.stamp = fields[2:4]
+        self.next_archive_id = fields[4]
+        self.stats_state = fields[5:9]
+
+        # (start offset, record count, record struct) per section.
+        self.sections = {}
+        position = HEADER.size
+        for (name, record), count in zip(SECTIONS, fields[9:]):
+            self.sections[name] = (position, count, record)
+            position += count * record.size
+        # The offsets section ends with one more offset than there are strings.
+        position += STRING_OFFSET.size
+        self.string_data = position
+
+        if position > len(self.mapping):
+            self.close()
+            raise ValueError("truncated snapshot")
+
+        self.decoded = [None] * self.sections["strings"][1]
+        self.rules = {}
+
+    def close(self) -> None:
+        self.view.release()
+        self.mapping.close()
+
+    def records(self, name):
+        """
+        Unpacks a section's records lazily, in file order.
+        """
+
+        start, count, record = self.sections[name]
+
+        return record.iter_unpack(self.view[start : start + count * record.size])
+
+    def string(self, index):
+        if index == NO_STRING:
+            return None
+        text = self.decoded[index]
+        if text is None:
+            offsets_start = self.sections["strings"][0]
+            start, end = struct.unpack_from(
+                "<II", self.view, offsets_start + index * STRING_OFFSET.size
+            )
+            text = self.decoded[index] = str(
+                self.view[self.string_data + start : self.string_data + end],
+                "utf-8",
+            )
+
+        return text
+
+    def rule(self, index):
+        """
+        Parses each distinct recurrence rule once. Rules are never modified in place, so nodes can share them.
+        """
+
+        if index in self.rules:
+            return self.rules[index]
+        text = self.string(index)
+        rule = self.rules[index] = RecurrenceRule.from_string(text) if text else None
+
+        return rule
+
+    def load_task_list(self, linked_list, section):
+        """
+        Adds a node to 'linked_list' for every task in the section, keeping each task's id.
+        """
+
+        string = self.string
+        for (
+            id_num,
+            title,
+            first_step,
+            second_step,
+            third_step,
+            task_date,
+            repeat_toggle,
+            interval_index,
+            recurrence,
+        ) in self.records(section):
+            linked_list.load_node_handler(
+                id_num,
+                (
+                    string(title),
+                    string(first_step),
+                    string(second_step),
+                    string(third_step),
+                    date.fromordinal(task_date),
+                    bool(repeat_toggle),
+                    None if interval_index < 0 else interval_index,
+                    self.rule(recurrence),
+                ),
+            )
+
+        return linked_list
+
+    def load_item_list(self, linked_list):
+        string = self.string
+        for id_num, title, quantity, item_location, interval_index in self.records(
+            "items"
+        ):
+            node = linked_list.load_node_handler(
+                id_num,
+                (
+                    string(title),
+                    string(quantity),
+                    string(item_location),
+                    None if interval_index < 0 else interval_index,
+                ),
+            )
+            linked_list.reindex_item(node)
+
+        return linked_list
+
+    def load_stats(self, stats_screen):
+        stats_screen.set_state(self.stats_state)
+        for map_name in ("completed_tasks", "purchased_items"):
+            task_map = getattr(stats_screen, map_name)
+            for title, count in self.records(map_name):
+                task_map[self.string(title)] = count
+        stats_screen.locations.update(
+            self.string(location) for (location,) in self.records("locations")
+        )
+
+        return stats_screen
+
+
+def open_snapshot(db_path="main.db", path="main.db.bin"):
+    """
+    Returns the snapshot at 'path' if it was written from the database as it is now, or None if it is missing,
+    unreadable or older than the database.
+    """
+
+    try:
+        with open(path, "rb") as stream:
+            snapshot = BinarySnapshot(stream)
+        if snapshot.stamp != database_stamp(db_path):
+            snapshot.close()
+            return None
+    except (OSError, ValueError, struct.error):
+        return None
+
+    return snapshot
+
+
+def load_from_database(cursor):
+    """
+    Builds the lists and stats from SQLite the way the app does on startup, for comparison with a snapshot load.
+    """
+
+    lists = {}
+    for section, list_name, label in (
+        ("current", "current_task_list", "Current Tasks"),
+        ("repeat", "repeat_task_list", "Repeat Tasks"),
+    ):
+        linked_list = lists[section] = LinkedList(label, "Task")
+        for row in database.get_task_list(cursor, list_name):
+            node = linked_list.add_node_handler(row[0])
+            node.title = row[1]
+            node.first_step = row[2]
+            node.second_step = row[3]
+            node.third_step = row[4]
+            node.start_date = date.fromordinal(row[5])
+            node.repeat_toggle = bool(row[6])
+            node.interval_index = row[7]
+            if row[8]:
+                node.recurrence = RecurrenceRule.from_string(row[8])
+            node.mark_clean()
+
+    linked_list = lists["items"] = LinkedList("Item List", "Item")
+    for row in database.get_item_list(cursor):
+        node = linked_list.add_node_handler(row[0])
+        node.title = row[1]
+        node.quantity = row[2]
+        node.item_location = row[3]
+        node.interval_index = row[4]
+        node.mark_clean()
+        linked_list.reindex_item(node)
+
+    stats_screen = StatsScreen()
+    stats_row = database.get_stats_data(cursor)
+    if stats_row:
+        stats_screen.set_state(stats_row[0])
+    stats_screen.completed_tasks.update(
+        database.get_stats_maps(cursor, "completed_tasks")
+    )
+    stats_screen.purchased_items.update(
+        database.get_stats_maps(cursor, "purchased_items")
+    )
+    stats_screen.locations.update(database.get_item_locations(cursor))
+
+    return lists, stats_screen
+
+
+def load_from_snapshot(snapshot):
+    lists = {
+        "current": snapshot.load_task_list(
+            LinkedList("Current Tasks", "Task"), "current"
+        ),
+        "repeat": snapshot.load_task_list(LinkedList("Repeat Tasks", "Task"), "repeat"),
+        "items": snapshot.load_item_list(LinkedList("Item List", "Item")),
+    }
+    stats_screen = snapshot.load_stats(StatsScreen())
+
+    return lists, stats_screen
+
+
+def fill_database(cursor, tasks):
+    """
+    Fills an empty database with 'tasks' tasks split between the Current and Repeat lists, a tenth as many items,
+    and stats for a few hundred titles. Sync capture is paused, since sync metadata isn't read on startup.
+    """
+
+    cursor.execute("UPDATE sync_meta SET value = 1 WHERE key = 'applying'")
+
+    today = date.today().toordinal()
+    titles = [f"task {number}" for number in range(500)]
+    locations = [f"store {number}" for number in range(20)]
+
+    for list_name, count in (
+        ("current_task_list", tasks // 2),
+        ("repeat_task_list", tasks - tasks // 2),
+    ):
+        cursor.executemany(
+            f"""
+            INSERT INTO {list_name} (title, first_step, second_step, third_step, task_date, repeat_toggle,
+                interval_index, recurrence) VALUES (?,?,?,?,?,?,?,?)
+            """,
+            (
+                (
+                    f"{titles[number % len(titles)]} #{number}",
+                    "first step",
+                    "",
+                    "",
+                    today + number % 365,
+                    number % 3 == 0,
+                    number % 4,
+                    "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH" if number % 50 == 0 else None,
+                )
+                for number in range(count)
+            ),
+        )
+    cursor.executemany(
+        "INSERT INTO item_list (title, quantity, item_location, interval_index) VALUES (?,?,?,?)",
+        (
+            (f"item {number}", str(number % 7), locations[number % 20], number % 6)
+            for number in range(tasks // 10)
+        ),
+    )
+    cursor.executemany(
+        "INSERT INTO completed_tasks (title, count) VALUES (?,?)",
+        ((title, 3) for title in titles),
+    )
+    cursor.executemany(
+        "INSERT INTO item_locations (location) VALUES (?)",
+        ((location,) for location in locations),
+    )
+    cursor.execute(
+        "INSERT INTO stats_screen (id_num, current_level, current_xp, start_level, next_level) VALUES (1,5,600,570,700)"
+    )
+    cursor.execute("UPDATE sync_meta SET value = 0 WHERE key = 'applying'")
+    cursor.connection.commit()
+
+
+def benchmark(tasks, repeats=5):
+    """
+    Times building the app's structures from SQLite and from a binary snapshot of the same database. Both read
+    from the page cache after the first run, so this measures parsing and node construction rather than disk reads.
+    """
+
+    # Only needed by the benchmark, so the app doesn't import them on startup.
+    import gc
+    import statistics
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        snapshot_path = os.path.join(directory, "bench.db.bin")
+
+        connection, cursor = database.initialize_db(db_path)
+        fill_database(cursor, tasks)
+        database.close_db(connection, cursor)
+
+        start = time.perf_counter()
+        write_snapshot(db_path, snapshot_path)
+        write_time = time.perf_counter() - start
+
+        def sqlite_load():
+            connection = sqlite3.connect(db_path)
+            try:
+                return load_from_database(connection.cursor())
+            finally:
+                connection.close()
+
+        def snapshot_load():
+            snapshot = open_snapshot(db_path, snapshot_path)
+            try:
+                return load_from_snapshot(snapshot)
+            finally:
+                snapshot.close()
+
+        sqlite_times = []
+        snapshot_times = []
+        for _ in range(repeats):
+            for load, times in (
+                (sqlite_load, sqlite_times),
+                (snapshot_load, snapshot_times),
+            ):
+                # The previous result is dropped first, so each load starts on a heap the size of a fresh start.
+                gc.collect()
+                start = time.perf_counter()
+                load()
+                times.append(time.perf_counter() - start)
+
+        results = (sqlite_load(), snapshot_load())
+        for section in ("current", "repeat", "items"):
+            loaded = [
+                [node.get_fields() for node in result[0][section].iter_nodes()]
+                for result in results
+            ]
+            if loaded[0] != loaded[1]:
+                raise AssertionError(f"snapshot differs from the database in {section}")
+        if results[0][1].__dict__ != results[1][1].__dict__:
+            raise AssertionError("snapshot differs from the database in stats")
+
+        return {
+            "tasks": tasks,
+            "database_bytes": os.path.getsize(db_path),
+            "snapshot_bytes": os.path.getsize(snapshot_path),
+            "snapshot_write_ms": write_time * 1000,
+            "sqlite_load_ms": statistics.median(sqlite_times) * 1000,
+            "snapshot_load_ms": statistics.median(snapshot_times) * 1000,
+        }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compare starting from SQLite with starting from a binary snapshot."
+    )
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    result = benchmark(args.tasks, args.repeats)
+    print(
+        f"{result['tasks']} tasks: database {result['database_bytes'] / 1024:.0f} KiB, "
+        f"snapshot {result['snapshot_bytes'] / 1024:.0f} KiB written in {result['snapshot_write_ms']:.0f} ms"
+    )
+    print(f"sqlite load\t{result['sqlite_load_ms']:.0f} ms")
+    print(f"snapshot load\t{result['snapshot_load_ms']:.0f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,541 @@
+# Standard library imports
+import argparse
+import json
+import sys
+from datetime import date
+
+# Local/application-specific imports
+from data_structures import (
+    ItemNode,
+    LinkedList,
+    StatsScreen,
+    TaskNode,
+    Trie,
+    combine_quantities,
+)
+import database
+from recurrence import RecurrenceRule
+import transfer
+
+TASK_LISTS = {"current": "current_task_list", "repeat": "repeat_task_list"}
+INTERVALS = ("day", "week", "month", "year")
+UNITS = ("units", "ounces", "pounds", "milligrams", "grams", "kilograms")
+
+
+def task_from_row(row):
+    """
+    Builds a TaskNode from a task list row.
+    """
+
+    node = TaskNode(row[0])
+    node.title = row[1]
+    node.first_step = row[2] or ""
+    node.second_step = row[3] or ""
+    node.third_step = row[4] or ""
+    node.start_date = date.fromordinal(row[5])
+    node.repeat_toggle = bool(row[6])
+    node.interval_index = row[7]
+    node.recurrence = RecurrenceRule.from_string(row[8]) if row[8] else None
+
+    return node
+
+
+def item_from_row(row):
+    """
+    Builds an ItemNode from an item list row.
+    """
+
+    node = ItemNode(row[0])
+    node.title = row[1]
+    node.quantity = row[2]
+    node.item_location = row[3] or ""
+    node.interval_index = row[4]
+
+    return node
+
+
+def load_stats_screen(cursor):
+    """
+    Loads the stored level and xp, falling back to a fresh StatsScreen for a new database.
+    """
+
+    stats_screen = StatsScreen()
+    stats_row = database.get_stats_data(cursor)
+    if stats_row:
+        (
+            stats_screen.current_level,
+            stats_screen.current_xp,
+            stats_screen.start_level,
+            stats_screen.next_level,
+        ) = stats_row[0]
+
+    return stats_screen
+
+
+def format_task(task):
+    repeat = f"every {task.interval_label()}" if task.repeat_toggle else ""
+    steps = ", ".join(
+        step for step in (task.first_step, task.second_step, task.third_step) if step
+    )
+
+    return f"{task.id_num}\t{task.start_date}\t{task.title}\t{repeat}\t{steps}"
+
+
+def format_item(item):
+    quantity = f"{item.quantity} {UNITS[item.interval_index]}" if item.quantity else ""
+
+    return f"{item.id_num}\t{item.item_location}\t{item.title}\t{quantity}"
+
+
+def list_command(cursor, args):
+    if args.list_name == "items":
+        items = [item_from_row(row) for row in database.get_item_list(cursor)]
+        items.sort(key=lambda item: item.item_location.lower())
+        for item in items:
+            print(format_item(item))
+        return 0
+
+    rows = database.get_task_list(cursor, TASK_LISTS[args.list_name])
+    tasks = [task_from_row(row) for row in rows]
+    tasks.sort(key=lambda task: task.start_date)
+    for task in tasks:
+        print(format_task(task))
+
+    return 0
+
+
+def add_task_command(cursor, args):
+    """
+    Adds a task to the Current list, or to the Repeat list if it starts in the future.
+    """
+
+    task = TaskNode(-1)
+    task.title = args.title.lower()
+    task.first_step, task.second_step, task.third_step = (args.steps + ["", "", ""])[:3]
+    task.start_date = args.date
+    task.repeat_toggle = args.repeat is not None or args.rule is not None
+    task.interval_index = INTERVALS.index(args.repeat) if args.repeat else 0
+    task.recurrence = args.rule
+
+    list_key = "repeat" if task.start_date > date.today() else "current"
+    task.id_num = database.add_task(cursor, task, TASK_LISTS[list_key])
+    print(f"{list_key}\t{format_task(task)}")
+
+    return 0
+
+
+def add_item_command(cursor, args):
+    """
+    Adds a shopping item, or folds its quantity into an existing item with the same title, location and unit family.
+    """
+
+    item = ItemNode(-1)
+    item.title = args.title.lower()
+    item.quantity = args.quantity
+    item.item_location = args.location.lower()
+    item.interval_index = UNITS.index(args.unit)
+
+    merge_key = LinkedList.item_merge_key(item)
+    for row in database.get_item_list(cursor):
+        existing = item_from_row(row)
+        if LinkedList.item_merge_key(existing) == merge_key:
+            existing.quantity, existing.interval_index = combine_quantities(
+                existing.quantity,
+                existing.interval_index,
+                item.quantity,
+                item.interval_index,
+            )
+            database.update_item(cursor, existing)
+            print(f"merged\t{format_item(existing)}")
+            return 0
+
+    item.id_num = database.add_item(cursor, item)
+    print(format_item(item))
+
+    return 0
+
+
+def complete_command(cursor, args):
+    """
+    Completes a current task or purchases an item, mirroring the app's dialogs. Repeating tasks are rescheduled
+    onto the Repeat list. Everything is written in one transaction, so a failure leaves the database unchanged.
+    """
+
+    # Taking the write lock up front keeps the level and count read here from going stale before the update.
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        status = complete(cursor, args)
+        cursor.connection.commit()
+    except BaseException:
+        cursor.connection.rollback()
+        raise
+
+    return status
+
+
+def complete(cursor, args):
+    stats_screen = load_stats_screen(cursor)
+
+    if args.kind == "item":
+        row = database.get_item(cursor, args.id_num)
+        if not row:
+            print(f"Error: no item with id {args.id_num}", file=sys.stderr)
+            return 1
+        item = item_from_row(row)
+        # The xp earned depends on how often the item was bought before.
+        stats_screen.purchased_items[item.title] = database.get_stats_count(
+            cursor, "purchased_items", item.title
+        )
+        stats_screen.purchased_item_handler(item.title, item.item_location)
+        database.increment_stats_map(cursor, "purchased_items", item.title)
+        database.insert_table_rows(cursor, "item_locations", [(item.item_location,)])
+        database.delete_row(cursor, "item_list", item.id_num)
+        database.replace_stats_data(cursor, stats_screen)
+        print(format_item(item))
+        return 0
+
+    row = database.get_task(cursor, "current_task_list", args.id_num)
+    if not row:
+        print(f"Error: no current task with id {args.id_num}", file=sys.stderr)
+        return 1
+
+    task = task_from_row(row)
+    stats_screen.completed_tasks[task.title] = database.get_stats_count(
+        cursor, "completed_tasks", task.title
+    )
+    stats_screen.completed_task_handler(task.title)
+    database.increment_stats_map(cursor, "completed_tasks", task.title)
+    database.archive_task(cursor, task, date.today())
+    database.delete_row(cursor, "current_task_list", task.id_num)
+
+    if task.repeat_toggle:
+        next_task = TaskNode(-1)
+        task.clone_self(next_task)
+        next_task.advance_start_date()
+        next_task.id_num = database.add_task(cursor, next_task, "repeat_task_list")
+        print(f"repeat\t{format_task(next_task)}")
+
+    database.replace_stats_data(cursor, stats_screen)
+
+    return 0
+
+
+def archive_key(text):
+    """
+    Parses a page key printed by the archive command, 'YYYY-MM-DD:ID'.
+    """
+
+    completed, _, id_num = text.partition(":")
+
+    return (date.fromisoformat(completed).toordinal(), int(id_num))
+
+
+def archive_command(cursor, args):
+    """
+    Pages through completed tasks, newest first. The key for the next page is printed to stderr.
+    """
+
+    if args.summary:
+        for month, title, count, _, _ in database.get_archive_summary(
+            cursor, args.title
+        ):
+            print(f"{month}\t{title}\t{count}")
+        return 0
+
+    rows, next_key = database.get_archive_page(
+        cursor, args.before, args.limit, args.title
+    )
+    for row in rows:
+        print(f"{date.fromordinal(row[-1])}\t{format_task(task_from_row(row))}")
+    if next_key:
+        print(
+            f"more: --before {date.fromordinal(next_key[0])}:{next_key[1]}",
+            file=sys.stderr,
+        )
+
+    return 0
+
+
+def compact_archive_command(cursor, args):
+    compacted = database.compact_archive(cursor, args.days)
+    print(f"Compacted {compacted} archived tasks", file=sys.stderr)
+
+    return 0
+
+
+def query_command(cursor, args):
+    """
+    Case-insensitive substring search over task titles and steps, and item titles and locations.
+    """
+
+    text = args.text.lower()
+
+    for list_key, list_name in TASK_LISTS.items():
+        for row in database.get_task_list(cursor, list_name):
+            task = task_from_row(row)
+            if args.due_by and task.start_date > args.due_by:
+                continue
+            fields = (task.title, task.first_step, task.second_step, task.third_step)
+            if any(text in field.lower() for field in fields):
+                print(f"{list_key}\t{format_task(task)}")
+
+    if args.due_by:
+        return 0
+
+    for row in database.get_item_list(cursor):
+        item = item_from_row(row)
+        if text in item.title.lower() or text in item.item_location.lower():
+            print(f"items\t{format_item(item)}")
+
+    return 0
+
+
+def stats_command(cursor, args):
+    stats_screen = load_stats_screen(cursor)
+    xp_needed = stats_screen.next_level - stats_screen.current_xp
+    print(f"level\t{stats_screen.current_level}")
+    print(f"xp\t{stats_screen.current_xp}")
+    print(f"to next level\t{xp_needed}")
+
+    return 0
+
+
+def trends_command(cursor, args):
+    import analytics
+
+    report = analytics.compute_report(args.db, date.today().toordinal())
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(analytics.format_report(report))
+
+    return 0
+
+
+def transfer_command(cursor, args):
+    try:
+        if args.command == "export":
+            report = transfer.run_export(
+                cursor, args.path, args.format, args.tables, args.batch_size
+            )
+        else:
+            report = transfer.run_import(
+                cursor, args.path, args.format, args.tables, args.batch_size
+            )
+    except (OSError, transfer.TransferError) as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+    print(report, file=sys.stderr)
+
+    return 0
+
+
+def load_linked_list(linked_list, rows, from_row):
+    """
+    Fills a LinkedList the way the app does on startup, keeping each row's id.
+    """
+
+    for row in rows:
+        node = linked_list.add_node_handler(row[0])
+        node.set_fields(from_row(row).get_fields())
+        if linked_list.list_type == "Item":
+            linked_list.reindex_item(node)
+        node.mark_clean()
+
+    return linked_list
+
+
+def memory_command(cursor, args):
+    """
+    Loads the database into the app's structures and reports their sizes, with the allocations made by each step.
+    """
+
+    import diagnostics
+
+    probe = diagnostics.memory_probe
+    probe.start()
+
+    with probe.track("load task lists"):
+        current_task_list = load_linked_list(
+            LinkedList("Current Tasks", "Task"),
+            database.get_task_list(cursor, "current_task_list"),
+            task_from_row,
+        )
+        repeat_task_list = load_linked_list(
+            LinkedList("Repeat Tasks", "Task"),
+            database.get_task_list(cursor, "repeat_task_list"),
+            task_from_row,
+        )
+    with probe.track("load item list"):
+        item_list = load_linked_list(
+            LinkedList("Item List", "Item"),
+            database.get_item_list(cursor),
+            item_from_row,
+        )
+    with probe.track("load stats"):
+        stats_screen = load_stats_screen(cursor)
+        stats_screen.completed_tasks.update(
+            database.get_stats_maps(cursor, "completed_tasks")
+        )
+        stats_screen.purchased_items.update(
+            database.get_stats_maps(cursor, "purchased_items")
+        )
+        stats_screen.locations.update(database.get_item_locations(cursor))
+    with probe.track("build autocomplete"):
+        autocomplete = Trie()
+        for title in (
+            *stats_screen.completed_tasks,
+            *stats_screen.purchased_items,
+            *stats_screen.locations,
+        ):
+            autocomplete.insert(title)
+
+    sizes = diagnostics.measure_structures(
+        diagnostics.app_structures(
+            current_task_list, repeat_task_list, item_list, autocomplete, stats_screen
+        )
+    )
+    traced = probe.traced_memory()
+    probe.stop()
+
+    if args.json:
+        report = {
+            "structures": [size.as_dict() for size in sizes],
+            "operations": [diff.as_dict() for diff in probe.diffs],
+            "traced": {"current": traced[0], "peak": traced[1]},
+        }
+        print(json.dumps(report, indent=2))
+    else:
+        print(diagnostics.format_memory_report(sizes, probe.diffs, traced))
+
+    return 0
+
+
+def sync_command(cursor, args):
+    # Commands import their heavier modules when run, so everyday commands start quickly.
+    import sync
+
+    report = sync.sync(cursor, args.server or sync.DEFAULT_SERVER)
+    print(report, file=sys.stderr)
+
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Manage tasks and items without starting the app. The app only "
+        "reads the database on startup, so a running app won't show changes made "
+        "here and may overwrite them with its own edits."
+    )
+    parser.add_argument("--db", default="main.db", help="path to the app database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="list tasks or items")
+    list_parser.add_argument(
+        "list_name",
+        nargs="?",
+        choices=("current", "repeat", "items"),
+        default="current",
+    )
+    list_parser.set_defaults(handler=list_command)
+
+    task_parser = subparsers.add_parser("add-task", help="add a task")
+    task_parser.add_argument("title")
+    task_parser.add_argument("--steps", nargs="+", default=[], metavar="STEP")
+    task_parser.add_argument("--date", type=date.fromisoformat, default=date.today())
+    task_parser.add_argument("--repeat", choices=INTERVALS)
+    task_parser.add_argument(
+        "--rule",
+        type=RecurrenceRule.from_string,
+        help="custom repeat rule, e.g. 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH'",
+    )
+    task_parser.set_defaults(handler=add_task_command)
+
+    item_parser = subparsers.add_parser("add-item", help="add a shopping item")
+    item_parser.add_argument("title")
+    item_parser.add_argument("--quantity", type=int)
+    item_parser.add_argument("--location", default="")
+    item_parser.add_argument("--unit", choices=UNITS, default="units")
+    item_parser.set_defaults(handler=add_item_command)
+
+    complete_parser = subparsers.add_parser(
+        "complete", help="complete a current task or purchase an item"
+    )
+    complete_parser.add_argument("kind", choices=("task", "item"))
+    complete_parser.add_argument("id_num", type=int)
+    complete_parser.set_defaults(handler=complete_command)
+
+    query_parser = subparsers.add_parser("query", help="search tasks and items")
+    query_parser.add_argument("text", nargs="?", default="")
+    query_parser.add_argument(
+        "--due-by", type=date.fromisoformat, help="only tasks starting on or before"
+    )
+    query_parser.set_defaults(handler=query_command)
+
+    stats_parser = subparsers.add_parser("stats", help="show level and xp")
+    stats_parser.set_defaults(handler=stats_command)
+
+    archive_parser = subparsers.add_parser(
+        "archive", help="browse completed tasks, newest first"
+    )
+    archive_parser.add_argument(
+        "--before", type=archive_key, help="page key printed by the previous page"
+    )
+    archive_parser.add_argument("--limit", type=int, default=20)
+    archive_parser.add_argument("--title")
+    archive_parser.add_argument(
+        "--summary", action="store_true", help="show monthly counts of compacted tasks"
+    )
+    archive_parser.set_defaults(handler=archive_command)
+
+    compact_parser = subparsers.add_parser(
+        "compact-archive", help="fold old archived tasks into monthly counts"
+    )
+    compact_parser.add_argument(
+        "--days", type=int, default=database.ARCHIVE_RETENTION_DAYS
+    )
+    compact_parser.set_defaults(handler=compact_archive_command)
+
+    trends_parser = subparsers.add_parser(
+        "trends", help="show completion streaks, averages and the due load forecast"
+    )
+    trends_parser.add_argument("--json", action="store_true")
+    trends_parser.set_defaults(handler=trends_command)
+
+    for command in ("export", "import"):
+        transfer_parser = subparsers.add_parser(command, help=f"{command} app data")
+        transfer.add_transfer_arguments(transfer_parser)
+        transfer_parser.set_defaults(handler=transfer_command)
+
+    memory_parser = subparsers.add_parser(
+        "memory", help="report memory used by the app's data structures"
+    )
+    memory_parser.add_argument("--json", action="store_true")
+    memory_parser.set_defaults(handler=memory_command)
+
+    sync_parser = subparsers.add_parser(
+        "sync", help="exchange changes with a sync server"
+    )
+    sync_parser.add_argument(
+        "--server", help="sync server URL, the local sync server by default"
+    )
+    sync_parser.set_defaults(handler=sync_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    connection, cursor = database.initialize_db(args.db)
+    if not connection:
+        return 1
+
+    try:
+        return args.handler(cursor, args)
+    finally:
+        database.close_db(connection, cursor)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,22 @@
 # Standard library imports
-from datetime import date
+from collections import OrderedDict
 
 # Third-party library imports
-from kivy.graphics import Color, RoundedRectangle
+from kivy.clock import Clock
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle, RoundedRectangle
 from kivy.metrics import dp
-from kivy.uix.screenmanager import NoTransition
+from kivy.properties import BooleanProperty, NumericProperty, StringProperty
+from kivy.uix.behaviors import ButtonBehavior
+from kivy.uix.scrollview import ScrollView
 from kivy.uix.widget import Widget
 from kivymd.app import MDApp
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.button import MDButton
-from kivymd.uix.dialog import MDDialog
-from kivymd.uix.pickers import MDModalDatePicker
-from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
-from kivymd.uix.textfield import MDTextField
+from kivymd.uix.label import MDLabel
+
+# Local/application-specific imports
+import diagnostics
 
 
 class TaskButton(MDButton):
@@ -20,6 +24,8 @@ class TaskButton(MDButton):
     Custom button linked to a specific task node.
     """
 
+    selected = BooleanProperty(False)
+
     def __init__(self, task_node, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.task_node = task_node
@@ -39,12 +45,23 @@ class TaskButton(MDButton):
 
         self.ids.task_button_text.text = self.task_node.title
 
+    def rebind(self, task_node):
+        """
+        Link a recycled button to a different task node.
+        """
+
+        self.task_node = task_node
+        self.selected = False
+        self.update_text()
+
 
 class ItemButton(MDButton):
     """
     Custom button linked to a specific item node.
     """
 
+    selected = BooleanProperty(False)
+
     def __init__(self, item_node, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.item_node = item_node
@@ -62,574 +79,294 @@ class ItemButton(MDButton):
         """
         self.ids.item_button_text.text = self.item_node.title
 
-
-class TaskDialog(MDDialog):
-    """
-    Dialog for editing or viewing details of a task.
-    """
-
-    def __init__(self, task_button, task_node, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.main_app = MDApp.get_running_app()
-        self.task_button = task_button
-        self.task_node = task_node
-
-        self.ids.task_dialog_screen_manager.transition = NoTransition()
-        self.ids.task_dialog_screen_manager.current = (
-            self.main_app.root.ids.main_screen_manager.current
-        )
-
-        self.load_task_details()
-
-    def load_task_details(self):
+    def rebind(self, item_node):
         """
-        Load details into the dialog from the task node.
+        Link a recycled button to a different item node.
         """
+        self.item_node = item_node
+        self.selected = False
+        self.update_text()
 
-        self.ids.task_dialog_title.text = self.task_node.title
-        self.ids.first_step.text = self.task_node.first_step
-        self.ids.second_step.text = self.task_node.second_step
-        self.ids.third_step.text = self.task_node.third_step
-
-        if self.task_node.repeat_toggle:
-            self.ids.task_dialog_repeat_button.style = "filled"
-        else:
-            self.ids.task_dialog_repeat_button.style = "outlined"
-
-        if self.ids.task_dialog_screen_manager.current == "Current":
-            self.ids.current_screen_repeat_interval_text.text = (
-                self.task_node.interval_text[self.task_node.interval_index]
-            )
-        elif self.ids.task_dialog_screen_manager.current == "Repeat":
-            self.ids.repeat_screen_repeat_interval_text.text = str(
-                self.task_node.start_date
-            )
-
-    def on_pre_dismiss(self) -> None:
-        """
-        Deletes current instance if it is an unedited new task.
-        """
-        if (
-            self.ids.task_dialog_title.error
-            and self.task_button == self.main_app.unedited_new_widget
-        ):
-            self.ids.task_dialog_title.error = False
-            screen_title = self.main_app.root.ids.main_screen_manager.current
-            self.delete_task(screen_title)
-
-    def dismiss(self, *args) -> None:
-        """
-        Handle dialog dismissal with additional validation checks.
-        """
 
-        if self.ids.task_dialog_title.error and not self.main_app.unedited_new_widget:
-            self.display_dialog_error()
-            return False
-        return super().dismiss(*args)
+class BatchActionBar(MDBoxLayout):
+    """
+    Actions for the selected tasks or items, shown below a list while selecting. 'screen_name' decides which actions
+    apply.
+    """
 
-    def on_dismiss(self):
-        """
-        Updates the task node and button with the new details when dismissed.
-        """
+    screen_name = StringProperty("")
 
-        super().on_dismiss()
-        self.main_app.unedited_new_widget = None
-        self.task_node.title = self.ids.task_dialog_title.text
-        self.task_node.first_step = self.ids.first_step.text
-        self.task_node.second_step = self.ids.second_step.text
-        self.task_node.third_step = self.ids.third_step.text
-        self.task_button.update_text()
 
-    def display_dialog_error(self):
-        """
-        Show an error message if the dialog is dismissed with invalid inputs.
-        """
+class ButtonPool:
+    """
+    Bounded pool of released TaskButton or ItemButton widgets. Buttons are rebound to a new node instead of being
+    constructed again, and hit/miss counters show how many constructions were avoided.
+    """
 
-        MDSnackbar(MDSnackbarText(text="Error: A title is mandatory!")).open()
+    def __init__(self, button_class, max_size: int = 256) -> None:
+        self.button_class = button_class
+        self.max_size = max_size
+        self.free_buttons = []
 
-    def delete_task(self, screen_title, skip_dialog=False):
-        """
-        Delete task with the option to keep/delete rescheduled task if not unedited new task.
-        """
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
 
-        if self.task_button == self.main_app.unedited_new_widget:
-            self.main_app.unedited_new_widget = None
-        elif (
-            self.task_node.repeat_toggle
-            and not skip_dialog
-            and not screen_title == "Repeat"
-        ):
-            delete_dialog = DeleteRepeatTaskDialog(self.task_button, self.task_node)
-            delete_dialog.open()
-            self.dismiss()
-            return
-
-        if screen_title == "Current":
-            linked_list = self.main_app.current_task_list
-            container = self.main_app.root.ids.current_screen_container
-        elif screen_title == "Repeat":
-            linked_list = self.main_app.repeat_task_list
-            container = self.main_app.root.ids.repeat_screen_container
-
-        linked_list.delete_node_handler(self.task_node.id_num)
-        container.remove_widget(self.task_button)
-
-        self.dismiss()
-
-    def repeat_button_toggle(self, repeat_button):
+    def acquire(self, node):
         """
-        Toggle the repeat state of the task and update the button style.
+        Returns a button linked to the node, reusing a released one when available.
         """
 
-        self.task_node.repeat_toggle = not self.task_node.repeat_toggle
-        repeat_button.style = "filled" if self.task_node.repeat_toggle else "outlined"
+        if self.free_buttons:
+            self.hits += 1
+            button = self.free_buttons.pop()
+            button.rebind(node)
+            return button
 
-    def cycle_interval(self, button_text):
-        """
-        Cycle through predefined intervals for repeating tasks.
-        """
-
-        self.task_node.interval_index = (self.task_node.interval_index + 1) % 4
-        button_text.text = self.task_node.interval_text[self.task_node.interval_index]
+        self.misses += 1
+        return self.button_class(node)
 
-    def open_date_picker(self):
+    def release(self, button):
         """
-        Open date picker with only a select range of dates available. Current date is focused.
+        Removes the button from its container and keeps it for reuse unless the pool is full.
         """
 
-        desired_year = self.task_node.start_date.year
-        desired_month = self.task_node.start_date.month
-        desired_day = self.task_node.start_date.day
-        button = self.ids.repeat_screen_repeat_interval_text
-        min_date = date.today()
-        max_date = date(
-            year=date.today().year + 1, month=date.today().month, day=date.today().day
-        )
-
-        date_dialog = FutureDatePicker(
-            button=button,
-            task_node=self.task_node,
-            year=desired_year,
-            month=desired_month,
-            day=desired_day,
-            min_date=min_date,
-            max_date=max_date,
-        )
+        if button.parent:
+            button.parent.remove_widget(button)
 
-        date_dialog.open()
+        if len(self.free_buttons) < self.max_size:
+            self.free_buttons.append(button)
+        else:
+            self.discarded += 1
 
-    def complete_task(self):
+    def release_all(self, container):
         """
-        Completes task and updates stats screen. Schedules future task if repeat is toggled.
+        Empties a screen container, returning all of its buttons to the pool. Other widgets, such as group headers,
+        are just removed.
         """
 
-        if self.ids.task_dialog_title.error:
-            self.display_dialog_error()
-            return
-
-        task_text = self.ids.task_dialog_title.text
-        self.main_app.stats_screen.completed_task_handler(task_text)
-        self.main_app.autocomplete.insert(task_text)
-        self.dismiss()
-
-        if not self.task_node.repeat_toggle:
-            self.delete_task("Current")
-            return
+        for button in list(container.children):
+            if isinstance(button, self.button_class):
+                self.release(button)
+            else:
+                container.remove_widget(button)
 
-        container = self.main_app.root.ids.repeat_screen_container
-        new_task_node = self.main_app.repeat_task_list.add_node_handler()
-        self.task_node.clone_self(new_task_node)
-        new_task_node.advance_start_date()
-        new_task_widget = TaskButton(task_node=new_task_node)
-        container.add_widget(new_task_widget)
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "free": len(self.free_buttons),
+            "discarded": self.discarded,
+        }
 
-        self.delete_task("Current", True)
 
-
-class DialogTextField(MDTextField):
+class StatsList(Widget):
     """
-    A custom text field for dialogues with several restrictions.
+    Titles and counts on the stats screen, most frequent first, drawn straight onto a single canvas. Only the rows
+    inside the parent scroll view are drawn, reusing a small set of rectangles, and label textures are cached, so
+    thousands of titles render in one frame.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.main_app = MDApp.get_running_app()
-
-    def insert_text(self, substring, from_undo=False):
-        """
-        Delete selection if one exists. Insert lowercase text into field if it fits within the designated width. Function are from Kivy source code.
-        """
-
-        self.delete_selection()
-        current_width = self._get_text_width(
-            self._lines[0], self.tab_width, self._label_cached
-        )
-        substring_width = self._get_text_width(
-            substring, self.tab_width, self._label_cached
-        )
-        if current_width + substring_width >= dp(243):
-            substring = ""
-        substring = substring.lower()
+    row_height = NumericProperty(dp(24))
+    padding_right = NumericProperty(dp(20))
+    texture_cache_size = 512
 
-        super().insert_text(substring, from_undo=from_undo)
-
-    def keyboard_on_key_down(self, window, keycode, text, modifiers):
-        """
-        Handle key down events, specifically intercepting the tab key.
-        """
-
-        if keycode[1] == "tab":
-            return True
-
-        return super().keyboard_on_key_down(window, keycode, text, modifiers)
-
-
-class DialogTextFieldAutocomplete(MDTextField):
-    """
-    A custom text field for dialogues with several restrictions and autocomplete capabilities.
-    """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         self.main_app = MDApp.get_running_app()
+        self.rows = []
+        self.textures = OrderedDict()
+        self.rectangles = []
+
+        with self.canvas:
+            # Textures are rendered white and tinted here, so a theme change doesn't invalidate the cache.
+            self.text_color = Color(1, 1, 1, 1)
+
+        self.redraw_trigger = Clock.create_trigger(self.redraw)
+        self.bind(pos=self.redraw_trigger, size=self.redraw_trigger)
+        self.main_app.theme_cls.bind(onSurfaceColor=self.redraw_trigger)
+
+    def on_parent(self, widget, parent):
+        if isinstance(parent, ScrollView):
+            parent.bind(scroll_y=self.redraw_trigger, size=self.redraw_trigger)
+
+    def set_counts(self, counts: dict) -> None:
+        self.rows = sorted(counts.items(), key=lambda row: row[1], reverse=True)
+        self.height = len(self.rows) * self.row_height
+        self.redraw_trigger()
+
+    def visible_rows(self) -> tuple:
+        """
+        Index range of the rows inside the scroll view's viewport.
+        """
+
+        if not isinstance(self.parent, ScrollView):
+            return 0, len(self.rows)
+
+        viewport_height = self.parent.height
+        scrollable = max(0, self.height - viewport_height)
+        top_offset = (1 - self.parent.scroll_y) * scrollable
+        first = int(top_offset // self.row_height)
+        last = int((top_offset + viewport_height) // self.row_height) + 1
+
+        return max(0, first), min(len(self.rows), last)
+
+    def redraw(self, *args):
+        first, last = self.visible_rows()
+        self.text_color.rgba = self.main_app.theme_cls.onSurfaceColor
+        column_width = max(1, int((self.width - self.padding_right) / 2))
+        right_edge = self.right - self.padding_right
+
+        needed = 2 * (last - first)
+        while len(self.rectangles) < needed:
+            rectangle = Rectangle(size=(0, 0))
+            self.canvas.add(rectangle)
+            self.rectangles.append(rectangle)
+
+        rectangles = iter(self.rectangles)
+        for index in range(first, last):
+            title, count = self.rows[index]
+            row_y = self.top - (index + 1) * self.row_height
+
+            name = self.texture(title, column_width)
+            rectangle = next(rectangles)
+            rectangle.texture = name
+            rectangle.size = name.size
+            rectangle.pos = (self.x, row_y + (self.row_height - name.height) / 2)
+
+            count = self.texture(str(count))
+            rectangle = next(rectangles)
+            rectangle.texture = count
+            rectangle.size = count.size
+            rectangle.pos = (
+                right_edge - count.width,
+                row_y + (self.row_height - count.height) / 2,
+            )
 
-    def insert_text(self, substring, from_undo=False):
-        """
-        Delete selection if one exists. Insert lowercase text into field if it fits within the designated width. Adds suffix if applicable. Function are from Kivy source code.
-        """
-
-        self.delete_selection()
-        current_width = self._get_text_width(
-            self._lines[0], self.tab_width, self._label_cached
-        )
-        substring_width = self._get_text_width(
-            substring, self.tab_width, self._label_cached
-        )
-        if current_width + substring_width >= dp(243):
-            substring = ""
-        substring = substring.lower()
-
-        super().insert_text(substring, from_undo=from_undo)
-
-        suffix = self.main_app.autocomplete.get_suffix(self.text)
-        if suffix:
-            index = self.cursor_index()
-            end_index = index + len(suffix)
-            self.text = self.text[:index] + suffix
-            self.select_text(index, end_index)
+        for rectangle in rectangles:
+            rectangle.size = (0, 0)
 
-    def keyboard_on_key_down(self, window, keycode, text, modifiers):
+    def texture(self, text: str, width: int = None):
         """
-        Handle key down events, specifically intercepting the tab key.
+        Returns the cached texture for a label, rendering it on a miss. Titles wider than 'width' are shortened.
         """
 
-        if keycode[1] == "tab":
-            return True
+        key = (text, width)
+        texture = self.textures.pop(key, None)
+        if texture is None:
+            font = self.main_app.theme_cls.font_styles["Body"]["large"]
+            label = CoreLabel(
+                text=text,
+                font_name=font["font-name"],
+                font_size=font["font-size"],
+                shorten=width is not None,
+                text_size=(width, None),
+            )
+            label.refresh()
+            texture = label.texture
+        self.textures[key] = texture
+        if len(self.textures) > self.texture_cache_size:
+            self.textures.popitem(last=False)
 
-        return super().keyboard_on_key_down(window, keycode, text, modifiers)
+        return texture
 
 
-class DialogNumberField(MDTextField):
+class LocationHeader(ButtonBehavior, MDBoxLayout):
     """
-    A custom text field that only accepts numerical input including a single decimal point.
-    It restricts input to digits and a single decimal, and ensures the text fits within a defined width.
+    Collapsible heading for the items at one location on the List screen. Its filter button shows only that
+    location.
     """
 
-    def __init__(self, *args, **kwargs):
-        """
-        Initialize the dialog number field with a flag to track the presence of a decimal point.
-        """
-
+    def __init__(self, location_key, collapsed, filtered, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.has_decimal = False
-
-    def insert_text(self, substring, from_undo=False):
-        """
-        Insert text into the field, only allowing numeric characters and a single decimal point.
-        Ensures that the text does not exceed the maximum allowed width.
-        """
+        self.location_key = location_key
 
-        if not (substring.isdigit() or (substring == "." and not self.has_decimal)):
-            substring = ""
-
-        if substring == ".":
-            self.has_decimal = True
-
-        current_width = self._get_text_width(
-            self._lines[0], self.tab_width, self._label_cached
+        self.ids.location_header_name.text = location_key or "no location"
+        self.ids.location_header_icon.icon = (
+            "chevron-right" if collapsed else "chevron-down"
         )
-        substring_width = self._get_text_width(
-            substring, self.tab_width, self._label_cached
+        self.ids.location_header_filter.icon = (
+            "filter" if filtered else "filter-outline"
         )
-        if current_width + substring_width >= dp(123):
-            substring = ""
-
-        super().insert_text(substring, from_undo=from_undo)
 
-    def do_backspace(self, from_undo=False, mode="bkspc"):
-        """
-        Handles the backspace operation, adjusting the decimal point tracking flag as necessary.
-        """
 
-        super().do_backspace(from_undo=from_undo, mode=mode)
-        self.has_decimal = "." in self.text
-
-
-class DialogButtonSmall(MDButton):
+class AgendaHeader(MDLabel):
     """
-    Small button to control primary dialog functions.
+    Date heading for a day on the agenda screen.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-    def adjust_pos(self, *args) -> None:
-        self._button_text.pos_hint = {"center_x": 0.5, "center_y": 0.5}
-
-    def adjust_width(self, *args) -> None:
-        self.width = dp(95)
-
 
-class DialogButtonLarge(MDButton):
+class AgendaWidget(MDBoxLayout):
     """
-    Large button to control primary dialog functions.
+    Row for a single task on the agenda screen. 'task_note' marks projected occurrences of repeating tasks.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, task_name, task_note, *args, **kwargs):
         super().__init__(*args, **kwargs)
-
-    def adjust_pos(self, *args) -> None:
-        self._button_text.pos_hint = {"center_x": 0.5, "center_y": 0.5}
-
-    def adjust_width(self, *args) -> None:
-        self.width = dp(274)
+        self.ids.agenda_task_name.text = task_name
+        self.ids.agenda_task_note.text = task_note
 
 
-class FutureDatePicker(MDModalDatePicker):
+class SearchResultWidget(ButtonBehavior, MDBoxLayout):
     """
-    Dialog that allows user to select specific date for task. Two unneeded buttons were removed from the default MDModalDatePicker class.
+    Row on the search screen that opens the matching task or item on its own screen when pressed.
     """
 
-    def __init__(
-        self,
-        button,
-        task_node,
-        year=None,
-        month=None,
-        day=None,
-        firstweekday=0,
-        **kwargs,
-    ):
-        super().__init__(year, month, day, firstweekday, **kwargs)
-        self.button = button
-        self.task_node = task_node
-        self.mark_today = False
-
-        parent = self.children[4]
-        on_edit_button = parent.children[0]
-        parent.remove_widget(on_edit_button)
-
-        parent = self.children[2]
-        select_year_button = parent.children[3]
-        parent.remove_widget(select_year_button)
-
-    def on_ok(self, *args):
-        """
-        Updates button and task node with currently selected date
-        """
-
-        self.task_node.start_date = self.get_date()[0]
-        self.button.text = str(self.task_node.start_date)
-        self.dismiss()
-
-    def on_cancel(self, *args):
-        self.dismiss()
-
-
-class DeleteRepeatTaskDialog(MDDialog):
-    """
-    Dialog that launches when a task set to repeat is being deleted.
-    """
-
-    def __init__(self, task_button, task_node, *args, **kwargs):
+    def __init__(self, list_key, node, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.main_app = MDApp.get_running_app()
-        self.task_button = task_button
-        self.task_node = task_node
-        self.screen_name = self.main_app.root.ids.main_screen_manager.current
-
-    def schedule_repeat_task(self):
-        """
-        Schedules next occurrence of task when user presses 'Keep.'
-        """
-
-        container = self.main_app.root.ids.repeat_screen_container
-        new_task_node = self.main_app.repeat_task_list.add_node_handler()
-        self.task_node.clone_self(new_task_node)
-        new_task_node.advance_start_date()
-        new_task_widget = TaskButton(task_node=new_task_node)
-        container.add_widget(new_task_widget)
-
-        self.delete_selected_task()
-
-    def delete_selected_task(self):
-        """
-        Deletes selected task from display and data structure.
-        """
-
-        if self.task_button == self.main_app.unedited_new_widget:
-            self.main_app.unedited_new_widget = None
-
-        linked_list = self.main_app.current_task_list
-        container = self.main_app.root.ids.current_screen_container
-        linked_list.delete_node_handler(self.task_button.task_node.id_num)
-        container.remove_widget(self.task_button)
+        self.list_key = list_key
+        self.node = node
 
-        self.dismiss()
+        self.ids.search_result_title.text = node.title
+        self.ids.search_result_list.text = list_key.lower()
 
 
-class ItemDialog(MDDialog):
+class DiagnosticsOverlay(MDLabel):
     """
-    A dialog for displaying and editing the details of an item node.
+    Debug text drawn over every screen when memory or latency instrumentation is enabled. Ignores touches.
     """
 
-    def __init__(self, item_button, item_node, *args, **kwargs):
-        """
-        Initialize the dialog with item details.
-        """
-
-        super().__init__(*args, **kwargs)
-        self.main_app = MDApp.get_running_app()
-        self.item_button = item_button
-        self.item_node = item_node
-
-        self.load_task_details()
-
-    def load_task_details(self):
-        """
-        Load and display the details of the item from the item node.
-        """
-
-        self.ids.item_dialog_title.text = self.item_node.title
-        self.ids.item_dialog_location.text = self.item_node.item_location
-        self.ids.item_dialog_quantity.text = (
-            str(self.item_node.quantity) if self.item_node.quantity else ""
-        )
-
-        self.ids.item_dialog_units_text.text = self.item_node.interval_text[
-            self.item_node.interval_index
-        ]
-
-    def on_pre_dismiss(self) -> None:
-        """
-        Handle the dialog's pre-dismiss event, including the deletion of a task if necessary.
-        """
-
-        if (
-            self.ids.item_dialog_title.error
-            and self.item_button == self.main_app.unedited_new_widget
-        ):
-            self.ids.item_dialog_title.error = False
-            self.delete_task()
+    memory_text = StringProperty("")
+    trace_text = StringProperty("")
 
-    def on_dismiss(self):
-        """
-        Handle the dialog's dismiss event, updating the item node with new data.
-        """
+    def on_memory_text(self, *args):
+        self.refresh_text()
 
-        self.main_app.unedited_new_widget = None
+    def on_trace_text(self, *args):
+        self.refresh_text()
 
-        self.item_node.title = self.ids.item_dialog_title.text
-        self.item_node.item_location = self.ids.item_dialog_location.text
-        self.item_node.quantity = (
-            int(self.ids.item_dialog_quantity.text)
-            if self.ids.item_dialog_quantity.text
-            else None
+    def refresh_text(self):
+        self.text = "\n\n".join(
+            text for text in (self.trace_text, self.memory_text) if text
         )
 
-        self.item_button.update_text()
-
-        super().on_dismiss()
+    def on_touch_down(self, touch):
+        return False
 
-    def dismiss(self, *args) -> None:
-        """
-        Attempt to dismiss the dialog and display an error if there are validation issues.
-        """
-
-        if self.ids.item_dialog_title.error and not self.main_app.unedited_new_widget:
-            self.display_dialog_error()
-            return False
-
-        return super().dismiss(*args)
-
-    def display_dialog_error(self):
-        """
-        Display a snackbar with an error message when there are dialog validation errors.
-        """
-
-        MDSnackbar(MDSnackbarText(text="Error: Task details are incorrect!")).open()
-
-    def delete_task(self):
-        """
-        Delete the current task and remove its widget from the list.
-        """
 
-        if self.item_button == self.main_app.unedited_new_widget:
-            self.main_app.unedited_new_widget = None
-
-        linked_list = self.main_app.item_list
-        container = self.main_app.root.ids.list_screen_container
-
-        linked_list.delete_node_handler(self.item_node.id_num)
-        container.remove_widget(self.item_button)
-
-        self.dismiss()
-
-    def complete_task(self):
-        """
-        Mark the task as completed, update stats, and handle auto-complete entries.
-        """
-
-        title_text = self.ids.item_dialog_title.text
-        location_text = self.ids.item_dialog_location.text
-        self.main_app.stats_screen.purchased_item_handler(title_text, location_text)
-        self.main_app.autocomplete.insert(title_text)
-        self.main_app.autocomplete.insert(location_text)
-
-        self.delete_task()
-
-    def cycle_unit(self, unit_text):
-        """
-        Cycle through the intervals and update the interval button's display text.
-        """
-
-        self.item_node.interval_index = (self.item_node.interval_index + 1) % 6
-        unit_text.text = self.item_node.interval_text[self.item_node.interval_index]
-        unit_text.pos_hint = {"center_x": 0.5, "center_y": 0.5}
-
-
-class CompletedWidget(MDBoxLayout):
+class ProgressBarWidget(Widget):
     """
-    Widget that is added dynamically to the scroll view containers on the stats screen.
+    Xp bar on the stats screen. The fill is one retained rectangle that is resized in place, and it follows the
+    widget's own layout, so it is correct however early it is first filled.
     """
 
-    def __init__(self, task_name, task_count, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.task_name = task_name
-        self.task_count = task_count
-
-        self.ids.completed_task_name.text = self.task_name
-        self.ids.completed_task_count.text = self.task_count
-
-
-class ProgressBarWidget(Widget):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.main_app = MDApp.get_running_app()
 
-    def fill_progress_bar(self):
-        self.canvas.clear()
+        with self.canvas:
+            self.fill_color = Color(1, 1, 1, 1)
+            self.fill = RoundedRectangle(
+                size=(0, 0), radius=[dp(3), dp(0), dp(0), dp(3)]
+            )
+
+        self.bind(pos=self.fill_progress_bar, size=self.fill_progress_bar)
+        self.main_app.theme_cls.bind(onSurfaceColor=self.fill_progress_bar)
 
+    @diagnostics.trace_handler
+    def fill_progress_bar(self, *args):
         progress_percentage = (
             self.main_app.stats_screen.current_xp
             - self.main_app.stats_screen.start_level
@@ -638,15 +375,9 @@ class ProgressBarWidget(Widget):
             - self.main_app.stats_screen.start_level
         )
 
-        progress_width = progress_percentage * (self.width - dp(4))
-        progress_height = self.height - dp(4)
-        progress_pos = self.x + dp(2), self.y + dp(2)
-
-        self.canvas.add(Color(self.main_app.theme_cls.onSurfaceColor))
-        self.canvas.add(
-            RoundedRectangle(
-                size=(progress_width, progress_height),
-                pos=progress_pos,
-                radius=[dp(3), dp(0), dp(0), dp(3)],
-            ),
+        self.fill_color.rgba = self.main_app.theme_cls.onSurfaceColor
+        self.fill.size = (
+            max(0, progress_percentage * (self.width - dp(4))),
+            max(0, self.height - dp(4)),
         )
+        self.fill.pos = (self.x + dp(2), self.y + dp(2))
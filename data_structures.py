@@ -1,12 +1,137 @@
+import heapq
+import math
+import re
+import sys
+from bisect import bisect_left
+from collections import deque
 from datetime import date, timedelta
 
+from recurrence import RecurrenceRule
 
-class TaskNode:
+WORD_PATTERN = re.compile(r"\w+")
+
+
+# Family and size in the family's smallest unit for each entry of ItemNode.interval_text. Quantities are only
+# merged within a family.
+UNIT_FAMILIES = {
+    0: ("count", 1),
+    1: ("imperial", 1),
+    2: ("imperial", 16),
+    3: ("metric", 1),
+    4: ("metric", 1000),
+    5: ("metric", 1000000),
+}
+
+
+def normalize_key(text: str) -> str:
+    """
+    Case- and whitespace-insensitive form of a title or location, used as an index key.
+    """
+
+    return " ".join(text.lower().split())
+
+
+def parse_quantity(quantity):
+    """
+    The number in a quantity typed into the item dialog, or None if it is missing or not a finite number.
+    """
+
+    try:
+        value = float(quantity)
+    except (TypeError, ValueError):
+        return None
+
+    return value if math.isfinite(value) else None
+
+
+def combine_quantities(quantity_a, unit_a: int, quantity_b, unit_b: int) -> tuple:
+    """
+    Adds two quantities from the same unit family and returns (quantity, unit) in the smaller of the two units,
+    so whole numbers stay whole. A missing or unparseable quantity counts as one unit, or as nothing for weights.
+    The quantity is returned as text, matching the 'item_list' column.
+    """
+
+    family, size_a = UNIT_FAMILIES[unit_a]
+    size_b = UNIT_FAMILIES[unit_b][1]
+    unit, size = (unit_a, size_a) if size_a <= size_b else (unit_b, size_b)
+    default = 1 if family == "count" else 0
+
+    total = 0
+    for quantity, quantity_size in ((quantity_a, size_a), (quantity_b, size_b)):
+        value = parse_quantity(quantity)
+        if value is None:
+            value = default
+        total += value * quantity_size / size
+
+    if not total:
+        return (None, unit)
+
+    return (str(int(total)) if total.is_integer() else str(total), unit)
+
+
+class DirtyTracking:
+    """
+    Mixin recording which of a node's persisted 'FIELDS' changed since it was last saved, and a revision counter
+    bumped on every change. Assigning an equal value leaves the field clean, so dialogs can reassign every field.
+    A new node starts with all of its fields dirty.
+    """
+
+    FIELDS = ()
+
+    def __setattr__(self, name, value):
+        if name in self.FIELDS:
+            state = self.__dict__
+            if name not in state or state[name] != value:
+                state["dirty_fields"].add(name)
+                state["revision"] += 1
+        object.__setattr__(self, name, value)
+
+    def mark_clean(self) -> None:
+        self.dirty_fields.clear()
+
+    @classmethod
+    def from_fields(cls, id_num: int, fields: tuple):
+        """
+        Builds a clean node from persisted fields in 'FIELDS' order. The other attributes are copied from a template
+        node in one step, since running '__setattr__' for each attribute dominates the time to load a large list.
+        """
+
+        template = cls.__dict__.get("_template")
+        if template is None:
+            template = cls(-1)
+            cls._template = template
+
+        state = dict(template.__dict__)
+        state.update(zip(cls.FIELDS, fields))
+        state["id_num"] = id_num
+        state["dirty_fields"] = set()
+        state["revision"] = 0
+        node = cls.__new__(cls)
+        node.__dict__.update(state)
+
+        return node
+
+
+class TaskNode(DirtyTracking):
     """
     Data structure to maintain the buttons and dialogs on the Current and Repeat screens.
     """
 
+    # Persisted fields in the order of 'get_fields' and the task table columns.
+    FIELDS = (
+        "title",
+        "first_step",
+        "second_step",
+        "third_step",
+        "start_date",
+        "repeat_toggle",
+        "interval_index",
+        "recurrence",
+    )
+
     def __init__(self, id_num: int, previous=None, nxt=None):
+        self.dirty_fields = set()
+        self.revision = 0
         self.id_num = id_num
         self.previous = previous
         self.next = nxt
@@ -19,6 +144,7 @@ class TaskNode:
         self.repeat_toggle = False
         self.interval_index = 0
         self.interval_text = ["a day", "a week", "a month", "a year"]
+        self.recurrence = None
 
     def clone_self(self, clone):
         """
@@ -33,34 +159,94 @@ class TaskNode:
         clone.repeat_toggle = self.repeat_toggle
         clone.interval_index = self.interval_index
         clone.interval_text = self.interval_text
+        clone.recurrence = self.recurrence
 
-    def advance_start_date(self):
+    def get_fields(self) -> tuple:
         """
-        Used to advance a task's date based on the current interval selected.
+        Returns the node's data as a compact tuple for the undo journal.
         """
 
-        if self.interval_index == 0:
-            self.start_date += timedelta(days=1)
-        elif self.interval_index == 1:
-            self.start_date += timedelta(weeks=1)
-        elif self.interval_index == 2:
-            self.start_date += timedelta(weeks=4)
-        else:
-            self.start_date += timedelta(weeks=52)
+        return (
+            self.title,
+            self.first_step,
+            self.second_step,
+            self.third_step,
+            self.start_date,
+            self.repeat_toggle,
+            self.interval_index,
+            self.recurrence,
+        )
+
+    def set_fields(self, fields: tuple) -> None:
+        (
+            self.title,
+            self.first_step,
+            self.second_step,
+            self.third_step,
+            self.start_date,
+            self.repeat_toggle,
+            self.interval_index,
+            self.recurrence,
+        ) = fields
+
+    def recurrence_rule(self) -> RecurrenceRule:
+        """
+        Returns the task's custom rule, or the rule for the preset interval selected in the dialog.
+        """
+
+        if self.recurrence is not None:
+            return self.recurrence
+
+        return RecurrenceRule.from_interval_index(self.interval_index)
+
+    def interval_label(self) -> str:
+        if self.recurrence is not None:
+            return self.recurrence.describe()
+
+        return self.interval_text[self.interval_index]
+
+    def advance_start_date(self, today: date = None):
+        """
+        Used to advance a task's date to its next occurrence after today, skipping any missed intervals.
+        Monthly and yearly rules keep the original day of month, so the 31st isn't lost in a shorter month.
+        """
+
+        rule = self.recurrence_rule()
+        if rule.month_day is None and rule.frequency in ("MONTHLY", "YEARLY"):
+            rule = rule.anchored(self.start_date)
+            self.recurrence = rule
+
+        self.start_date = rule.next_after(self.start_date, today or date.today())
+
+    def reschedule(self, start_date: date) -> None:
+        """
+        Moves the task to a chosen date. A custom monthly or yearly rule is re-anchored to the new day of month.
+        """
 
+        self.start_date = start_date
+        if self.recurrence is not None:
+            self.recurrence = self.recurrence.anchored(start_date)
 
-class ItemNode:
+
+class ItemNode(DirtyTracking):
     """
     Data structure to maintain the buttons and dialogs on the Item screen.
     """
 
+    # Persisted fields in the order of 'get_fields' and the item table columns.
+    FIELDS = ("title", "quantity", "item_location", "interval_index")
+
     def __init__(self, id_num: int, previous=None, nxt=None) -> None:
+        self.dirty_fields = set()
+        self.revision = 0
         self.id_num = id_num
         self.previous = previous
         self.next = nxt
         self.title = ""
         self.quantity = None
         self.item_location = ""
+        self.location_key = ""
+        self.merge_key = None
         self.item_price = ""
         self.interval_index = 0
         self.interval_text = [
@@ -72,6 +258,16 @@ class ItemNode:
             "kilograms",
         ]
 
+    def get_fields(self) -> tuple:
+        """
+        Returns the node's data as a compact tuple for the undo journal.
+        """
+
+        return (self.title, self.quantity, self.item_location, self.interval_index)
+
+    def set_fields(self, fields: tuple) -> None:
+        self.title, self.quantity, self.item_location, self.interval_index = fields
+
 
 class LinkedList:
     """
@@ -82,6 +278,8 @@ class LinkedList:
         self.list_name = list_name
         self.list_type = list_type
         self.node_lookup = {}
+        self.location_index = {}
+        self.duplicate_index = {}
         self.current_id = 1
 
         if self.list_type == "Task":
@@ -94,24 +292,59 @@ class LinkedList:
         self.head.next = self.tail
         self.tail.previous = self.head
 
-    def add_node_handler(self):
+    def add_node_handler(self, task_id: int = None):
         """
-        Creates a new node and adds it to the tail of the list.
+        Creates a new node and adds it to the tail of the list. 'task_id' keeps the id of a node loaded from the
+        database; new nodes are numbered after the highest id seen.
         """
 
+        if task_id is None:
+            task_id = self.current_id
+
         if self.list_type == "Task":
-            new_task = TaskNode(self.current_id, self.tail.previous, self.tail)
+            new_task = TaskNode(task_id)
         elif self.list_type == "Item":
-            new_task = ItemNode(self.current_id, self.tail.previous, self.tail)
+            new_task = ItemNode(task_id)
+
+        return self._append_node(new_task)
 
-        self.node_lookup[self.current_id] = new_task
-        self.current_id += 1
+    def load_node_handler(self, task_id: int, fields: tuple):
+        """
+        Adds a node read from storage to the tail of the list, already clean.
+        """
+
+        node_class = TaskNode if self.list_type == "Task" else ItemNode
+
+        return self._append_node(node_class.from_fields(task_id, fields))
+
+    def _append_node(self, new_task):
+        """
+        Helper for 'add_node_handler' and 'load_node_handler' linking a new node in at the tail.
+        """
+
+        task_id = new_task.id_num
+        new_task.previous, new_task.next = self.tail.previous, self.tail
+        self.node_lookup[task_id] = new_task
+        self.current_id = max(self.current_id, task_id + 1)
 
         new_task.previous.next = new_task
         new_task.next.previous = new_task
 
+        if self.list_type == "Item":
+            self.location_index.setdefault("", {})[task_id] = new_task
+
         return new_task
 
+    def iter_nodes(self):
+        """
+        Yields the nodes in list order.
+        """
+
+        current = self.head.next
+        while current != self.tail:
+            yield current
+            current = current.next
+
     def delete_node_handler(self, task_id: int):
         """
         Deletes task from linked list and node_lookup.
@@ -125,9 +358,116 @@ class LinkedList:
         old_task.previous.next = old_task.next
         old_task.next.previous = old_task.previous
 
+        if self.list_type == "Item":
+            self._unindex_location(old_task)
+            self._unindex_duplicate(old_task)
+
         del old_task
         del self.node_lookup[task_id]
 
+    def restore_node_handler(self, task_id: int, previous_id: int):
+        """
+        Re-creates a deleted node under its old id, directly after 'previous_id'. Falls back to the tail if that node
+        no longer exists. An id of -1 refers to the head.
+        """
+
+        if self.list_type == "Task":
+            restored_task = TaskNode(task_id)
+        elif self.list_type == "Item":
+            restored_task = ItemNode(task_id)
+
+        if previous_id == -1:
+            previous_task = self.head
+        else:
+            previous_task = self.node_lookup.get(previous_id, self.tail.previous)
+
+        restored_task.previous, restored_task.next = previous_task, previous_task.next
+        previous_task.next.previous = restored_task
+        previous_task.next = restored_task
+
+        self.node_lookup[task_id] = restored_task
+        self.current_id = max(self.current_id, task_id + 1)
+
+        if self.list_type == "Item":
+            self.location_index.setdefault("", {})[task_id] = restored_task
+
+        return restored_task
+
+    def reindex_item(self, node) -> bool:
+        """
+        Moves an item to the group of its current location and updates its duplicate key. Returns True if the
+        location group changed.
+        """
+
+        merge_key = self.item_merge_key(node)
+        if merge_key != node.merge_key:
+            self._unindex_duplicate(node)
+            node.merge_key = merge_key
+            self.duplicate_index.setdefault(merge_key, {})[node.id_num] = node
+
+        location_key = normalize_key(node.item_location)
+        if location_key == node.location_key:
+            return False
+
+        self._unindex_location(node)
+        node.location_key = location_key
+        self.location_index.setdefault(location_key, {})[node.id_num] = node
+
+        return True
+
+    @staticmethod
+    def item_merge_key(node) -> tuple:
+        """
+        Items with the same normalized title and location, and units that convert into each other, are duplicates.
+        """
+
+        return (
+            normalize_key(node.title),
+            normalize_key(node.item_location),
+            UNIT_FAMILIES[node.interval_index][0],
+        )
+
+    def find_duplicate(self, node):
+        """
+        Returns another item that 'node' could be merged into, or None. Uses the node's current fields, so it works
+        before the node is reindexed.
+        """
+
+        group = self.duplicate_index.get(self.item_merge_key(node), {})
+        for other in group.values():
+            if other is not node:
+                return other
+
+        return None
+
+    def items_at(self, location: str) -> list:
+        """
+        Returns the items at a location in the order they were added, without sorting the list.
+        """
+
+        return list(self.location_index.get(normalize_key(location), {}).values())
+
+    def locations(self) -> list:
+        """
+        Returns the normalized locations that currently have items, in alphabetical order.
+        """
+
+        return sorted(self.location_index)
+
+    def _unindex_location(self, node) -> None:
+        group = self.location_index.get(node.location_key)
+        if group and group.get(node.id_num) is node:
+            del group[node.id_num]
+            if not group:
+                del self.location_index[node.location_key]
+
+    def _unindex_duplicate(self, node) -> None:
+        group = self.duplicate_index.get(node.merge_key)
+        if group and group.get(node.id_num) is node:
+            del group[node.id_num]
+            if not group:
+                del self.duplicate_index[node.merge_key]
+
     def remove_node_handler(self, task_id: int):
         """
         Not currently in use. Made in anticipation of a drag-and-drop feature yet to be implemented.
@@ -217,7 +557,7 @@ class LinkedList:
                 output = head_b
                 output.next = self._merge(head_a, head_b.next)
         elif self.list_type == "Item":
-            if head_a.item_location.lower() <= head_b.item_location.lower():
+            if head_a.location_key <= head_b.location_key:
                 output = head_a
                 output.next = self._merge(head_a.next, head_b)
             else:
@@ -340,13 +680,346 @@ class StatsScreen:
         xp = 10 + min(10, self.purchased_items[item])
         self.add_xp(xp)
 
+    def record_batch(self, map_name: str, titles: list, locations=()) -> None:
+        """
+        Records several completed tasks or purchased items at once. Each title earns the same xp as it would alone,
+        and the total is added in one step.
+        """
+
+        task_map = getattr(self, map_name)
+        xp = 0
+        for title in titles:
+            task_map[title] = task_map.get(title, 0) + 1
+            xp += 10 + min(10, task_map[title])
+        self.locations.update(locations)
+        self.add_xp(xp)
+
+    def get_state(self) -> tuple:
+        return (self.current_level, self.current_xp, self.start_level, self.next_level)
+
+    def set_state(self, state: tuple) -> None:
+        self.current_level, self.current_xp, self.start_level, self.next_level = state
+
+    def adjust_count(self, map_name: str, title: str, delta: int) -> None:
+        """
+        Changes the count of a completed task or purchased item, dropping the title once it reaches zero.
+        """
+
+        task_map = getattr(self, map_name)
+        count = task_map.get(title, 0) + delta
+        if count > 0:
+            task_map[title] = count
+        else:
+            task_map.pop(title, None)
+
     def add_xp(self, xp):
         """
         Adds xp to total and adjusts current_level and next_level accordingly.
         """
 
         self.current_xp += xp
-        if self.current_xp >= self.next_level:
+        while self.current_xp >= self.next_level:
             self.start_level = self.next_level
             self.next_level += 100 + (self.current_level * 10)
             self.current_level += 1
+
+
+class OperationJournal:
+    """
+    Bounded multi-level undo/redo history. Each entry is a list of small inverse-operation tuples rather than copies
+    of nodes. Applying an operation through the caller's 'apply_op' returns the operation that reverses it, which
+    becomes the matching redo (or undo) entry. The oldest entries are dropped once 'max_bytes' is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = deque()
+        self.size = 0
+
+        self._group = None
+        self._group_depth = 0
+
+    def begin(self) -> None:
+        """
+        Starts grouping recorded operations into a single entry, for actions made of several steps.
+        """
+
+        if self._group_depth == 0:
+            self._group = []
+        self._group_depth += 1
+
+    def end(self) -> None:
+        self._group_depth -= 1
+        if self._group_depth == 0:
+            group, self._group = self._group, None
+            if group:
+                self._push_new_entry(group)
+
+    def record(self, op: tuple) -> None:
+        """
+        Records the operation that would undo an action that was just performed.
+        """
+
+        if self._group is not None:
+            self._group.append(op)
+        else:
+            self._push_new_entry([op])
+
+    def undo(self, apply_op) -> bool:
+        return self._replay(self.undo_stack, self.redo_stack, apply_op)
+
+    def redo(self, apply_op) -> bool:
+        return self._replay(self.redo_stack, self.undo_stack, apply_op)
+
+    def _push_new_entry(self, entry: list) -> None:
+        for old_entry in self.redo_stack:
+            self.size -= self._entry_size(old_entry)
+        self.redo_stack.clear()
+        self._push(self.undo_stack, entry)
+
+    def _replay(self, source, target, apply_op) -> bool:
+        """
+        Applies the newest entry of 'source' in reverse order and pushes the resulting inverse entry onto 'target'.
+        """
+
+        if not source:
+            return False
+
+        entry = source.pop()
+        self.size -= self._entry_size(entry)
+
+        inverse_entry = []
+        for op in reversed(entry):
+            inverse_op = apply_op(op)
+            if inverse_op is not None:
+                inverse_entry.append(inverse_op)
+
+        if inverse_entry:
+            self._push(target, inverse_entry)
+        return True
+
+    def _push(self, stack, entry: list) -> None:
+        stack.append(entry)
+        self.size += self._entry_size(entry)
+
+        # Evict the entries furthest from the present, never the one just pushed.
+        while self.size > self.max_bytes:
+            if len(self.undo_stack) > (stack is self.undo_stack):
+                self.size -= self._entry_size(self.undo_stack.popleft())
+            elif len(self.redo_stack) > (stack is self.redo_stack):
+                self.size -= self._entry_size(self.redo_stack.popleft())
+            else:
+                break
+
+    def _entry_size(self, entry: list) -> int:
+        """
+        Approximate memory used by an entry, counting the tuples and their immediate contents.
+        """
+
+        size = sys.getsizeof(entry)
+        for op in entry:
+            size += sys.getsizeof(op)
+            for value in op:
+                size += sys.getsizeof(value)
+                if isinstance(value, tuple):
+                    size += sum(sys.getsizeof(field) for field in value)
+        return size
+
+
+class AgendaIndex:
+    """
+    Date-bucketed index of tasks for the Agenda screen. Repeat tasks are bucketed by start date and Current tasks
+    are all due today. Later occurrences of repeating tasks are never stored; they are expanded from each task's
+    rule only across the window being displayed. Tasks are keyed by (list_key, id_num), matching the database
+    writer, so the index is updated whenever a task is written or deleted.
+    """
+
+    def __init__(self) -> None:
+        self.buckets = {}
+        self.entries = {}
+        self.due = {}
+        self.recurring = {}
+
+    def update(self, list_key: str, node) -> None:
+        """
+        Adds a task or moves it to its new date, replacing whatever was indexed under its key.
+        """
+
+        key = (list_key, node.id_num)
+        self.remove(list_key, node.id_num)
+
+        if list_key == "Current":
+            self.due[key] = node
+        else:
+            self.buckets.setdefault(node.start_date, {})[key] = node
+            self.entries[key] = node.start_date
+
+        if node.repeat_toggle:
+            self.recurring[key] = node
+
+    def remove(self, list_key: str, id_num: int) -> None:
+        key = (list_key, id_num)
+        self.due.pop(key, None)
+        self.recurring.pop(key, None)
+
+        day = self.entries.pop(key, None)
+        if day is not None:
+            bucket = self.buckets[day]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[day]
+
+    def window(self, first_day: date, days: int, today: date = None) -> list:
+        """
+        Returns (day, [(node, projected), ...]) for each day in the window that has tasks, in date order.
+        'projected' marks future occurrences of repeating tasks that don't exist as nodes yet.
+        """
+
+        today = today or date.today()
+        last_day = first_day + timedelta(days=days - 1)
+        agenda = {}
+
+        if first_day <= today <= last_day:
+            for node in self.due.values():
+                agenda.setdefault(today, []).append((node, False))
+
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            for node in self.buckets.get(day, {}).values():
+                agenda.setdefault(day, []).append((node, False))
+
+        for (list_key, _), node in self.recurring.items():
+            # A Current task's next occurrence comes after today; a Repeat task's after its start date.
+            previous = today if list_key == "Current" else node.start_date
+            self._expand(
+                node, max(previous, first_day - timedelta(days=1)), last_day, agenda
+            )
+
+        return [
+            (day, sorted(agenda[day], key=lambda entry: entry[0].title))
+            for day in sorted(agenda)
+        ]
+
+    def _expand(self, node, after: date, last_day: date, agenda: dict) -> None:
+        """
+        Helper for 'window' to add a repeating task's occurrences later than 'after', up to 'last_day'.
+        """
+
+        if node.start_date >= last_day:
+            return
+
+        rule = node.recurrence_rule()
+        day = rule.next_after(node.start_date, after)
+        while day <= last_day:
+            agenda.setdefault(day, []).append((node, True))
+            day = rule.next_after(node.start_date, day)
+
+
+class SearchIndex:
+    """
+    Inverted index over task titles and steps, and item titles and locations, for the Search screen. Each word maps
+    to the keys of the nodes containing it. The last word of a query matches as a prefix, using a vocabulary that is
+    sorted lazily on the first search after words are added or dropped. Nodes are keyed by (list_key, id_num) and
+    reindexed whenever they are written or deleted.
+    """
+
+    LIST_ORDER = {"Current": 0, "Repeat": 1, "List": 2}
+
+    def __init__(self) -> None:
+        self.postings = {}
+        self.documents = {}
+        self.sort_keys = {}
+        self.vocabulary = []
+        self.vocabulary_stale = False
+
+    @staticmethod
+    def tokenize(text: str) -> list:
+        return WORD_PATTERN.findall(text.lower())
+
+    def update(self, list_key: str, node) -> None:
+        """
+        Indexes a node, replacing its previous words.
+        """
+
+        if list_key == "List":
+            text = f"{node.title} {node.item_location}"
+        else:
+            text = (
+                f"{node.title} {node.first_step} {node.second_step} {node.third_step}"
+            )
+
+        key = (list_key, node.id_num)
+        words = set(self.tokenize(text))
+        old_words = self.documents[key][1] if key in self.documents else set()
+
+        for word in old_words - words:
+            self._discard(word, key)
+        for word in words - old_words:
+            if word not in self.postings:
+                self.postings[word] = set()
+                self.vocabulary_stale = True
+            self.postings[word].add(key)
+
+        self.documents[key] = (node, words)
+        self.sort_keys[key] = (self.LIST_ORDER[list_key], node.title, node.id_num)
+
+    def remove(self, list_key: str, id_num: int) -> None:
+        key = (list_key, id_num)
+        if key not in self.documents:
+            return
+
+        for word in self.documents.pop(key)[1]:
+            self._discard(word, key)
+        del self.sort_keys[key]
+
+    def search(self, text: str, limit: int = 50) -> list:
+        """
+        Returns up to 'limit' (list_key, node) pairs containing every word of the query, ordered by list and then
+        title. The last word may be incomplete.
+        """
+
+        words = self.tokenize(text)
+        if not words:
+            return []
+
+        # Exact words usually narrow the matches most, so the prefix is intersected last.
+        matches = None
+        for word in set(words[:-1]):
+            keys = self.postings.get(word, set())
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                return []
+
+        matches = self._prefix_keys(words[-1], matches)
+        results = heapq.nsmallest(limit, matches, key=self.sort_keys.__getitem__)
+
+        return [(key[0], self.documents[key][0]) for key in results]
+
+    def _prefix_keys(self, prefix: str, candidates) -> set:
+        """
+        Helper for 'search' that collects the keys of every word starting with the prefix, limited to 'candidates'
+        when earlier words have already narrowed the search.
+        """
+
+        if self.vocabulary_stale:
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_stale = False
+
+        keys = set()
+        index = bisect_left(self.vocabulary, prefix)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(
+            prefix
+        ):
+            postings = self.postings[self.vocabulary[index]]
+            keys |= postings if candidates is None else postings & candidates
+            index += 1
+
+        return keys
+
+    def _discard(self, word: str, key: tuple) -> None:
+        postings = self.postings[word]
+        postings.discard(key)
+        if not postings:
+            del self.postings[word]
+            self.vocabulary_stale = True
@@ -1,11 +1,95 @@
+import os
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
 
+# Version stored in 'PRAGMA user_version'. Databases from before versioning report 0.
+SCHEMA_VERSION = 5
 
-def initialize_db():
+# Days a completed task is kept in full in 'task_archive'. Older ones are folded into monthly counts per title.
+ARCHIVE_RETENTION_DAYS = 365
+
+# How many repeat intervals a task may use (a day to a year) and how many units an item may use.
+INTERVAL_COUNTS = {"task": 4, "item": 6}
+
+# Times the writer retries a failing flush while the app closes before giving up on the unsaved changes.
+STOP_WRITE_ATTEMPTS = 3
+
+# Columns that are portable between databases, keyed by table. Row ids are local to each database and are left out.
+TABLE_COLUMNS = {
+    "current_task_list": (
+        "title",
+        "first_step",
+        "second_step",
+        "third_step",
+        "task_date",
+        "repeat_toggle",
+        "interval_index",
+        "recurrence",
+    ),
+    "repeat_task_list": (
+        "title",
+        "first_step",
+        "second_step",
+        "third_step",
+        "task_date",
+        "repeat_toggle",
+        "interval_index",
+        "recurrence",
+    ),
+    "item_list": ("title", "quantity", "item_location", "interval_index"),
+    "stats_screen": ("current_level", "current_xp", "start_level", "next_level"),
+    "completed_tasks": ("title", "count"),
+    "purchased_items": ("title", "count"),
+    "item_locations": ("location",),
+    "task_archive": (
+        "title",
+        "first_step",
+        "second_step",
+        "third_step",
+        "task_date",
+        "repeat_toggle",
+        "interval_index",
+        "recurrence",
+        "completed_date",
+    ),
+}
+
+
+# Column identifying a row for write-through updates, keyed by table.
+KEY_COLUMNS = {
+    "current_task_list": "id_num",
+    "repeat_task_list": "id_num",
+    "item_list": "id_num",
+    "stats_screen": "id_num",
+    "completed_tasks": "title",
+    "purchased_items": "title",
+    "item_locations": "location",
+    "task_archive": "id_num",
+}
+
+
+# Expression giving a newly inserted row its sync uid, keyed by table. List rows get random uids since their ids
+# are local to each database; the other tables are keyed by value, which is the same on every device.
+SYNC_UIDS = {
+    "current_task_list": "lower(hex(randomblob(16)))",
+    "repeat_task_list": "lower(hex(randomblob(16)))",
+    "item_list": "lower(hex(randomblob(16)))",
+    "stats_screen": "'stats'",
+    "completed_tasks": "NEW.title",
+    "purchased_items": "NEW.title",
+    "item_locations": "NEW.location",
+}
+
+
+def initialize_db(path="main.db"):
     try:
-        connection = sqlite3.connect("main.db")
+        connection = sqlite3.connect(path)
         cursor = connection.cursor()
-        create_tables(cursor)
+        upgrade_schema(cursor)
         return (connection, cursor)
     except sqlite3.Error as e:
         print(f"An error occurred: {e}")
@@ -20,9 +104,10 @@ def create_tables(cursor):
         first_step TEXT,
         second_step TEXT,
         third_step TEXT,
-        task_date TEXT,
-        repeat_toggle INTEGER,
-        interval_index INTEGER
+        task_date INTEGER,
+        repeat_toggle BOOLEAN NOT NULL DEFAULT 0 CHECK (repeat_toggle IN (0, 1)),
+        interval_index INTEGER,
+        recurrence TEXT
     )
     """
 
@@ -35,9 +120,10 @@ def create_tables(cursor):
         first_step TEXT,
         second_step TEXT,
         third_step TEXT,
-        task_date TEXT,
-        repeat_toggle INTEGER,
-        interval_index INTEGER
+        task_date INTEGER,
+        repeat_toggle BOOLEAN NOT NULL DEFAULT 0 CHECK (repeat_toggle IN (0, 1)),
+        interval_index INTEGER,
+        recurrence TEXT
     )
     """
 
@@ -96,84 +182,488 @@ def create_tables(cursor):
 
     cursor.execute(item_locations)
 
+    snapshot_meta = """
+    CREATE TABLE IF NOT EXISTS snapshot_meta(
+        id_num INTEGER PRIMARY KEY AUTOINCREMENT,
+        saved_at REAL NOT NULL
+    )
+    """
+
+    cursor.execute(snapshot_meta)
 
-def save_task_list(cursor, task_list, list_name):
-    sql = f"""
-    INSERT INTO {list_name} (title, first_step, second_step, third_step, task_date, repeat_toggle, interval_index) VALUES (?,?,?,?,?,?,?);
+    task_archive = """
+    CREATE TABLE IF NOT EXISTS task_archive(
+        id_num INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        first_step TEXT,
+        second_step TEXT,
+        third_step TEXT,
+        task_date INTEGER,
+        repeat_toggle BOOLEAN NOT NULL DEFAULT 0 CHECK (repeat_toggle IN (0, 1)),
+        interval_index INTEGER,
+        recurrence TEXT,
+        completed_date INTEGER NOT NULL
+    )
     """
 
-    data_list = [
-        (
-            task.title,
-            task.first_step,
-            task.second_step,
-            task.third_step,
-            task.start_date,
-            task.repeat_toggle,
-            task.interval_index,
-        )
-        for task in task_list
-    ]
+    cursor.execute(task_archive)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS task_archive_completed ON task_archive (completed_date, id_num)"
+    )
+
+    archive_summary = """
+    CREATE TABLE IF NOT EXISTS archive_summary(
+        month TEXT NOT NULL,
+        title TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        first_date INTEGER NOT NULL,
+        last_date INTEGER NOT NULL,
+        PRIMARY KEY (month, title)
+    )
+    """
+
+    cursor.execute(archive_summary)
+
 
-    cursor.executemany(sql, data_list)
+def upgrade_schema(cursor):
+    """
+    Creates missing tables and migrates older databases in place, one version at a time.
+    Each migration and its version bump are committed together, so an interrupted upgrade can simply be rerun.
+    """
+
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    is_new = not cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='current_task_list'"
+    ).fetchone()
+
+    create_tables(cursor)
     cursor.connection.commit()
 
+    if is_new:
+        create_sync_tables(cursor)
+        create_sync_triggers(cursor)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        cursor.connection.commit()
+        return
+
+    for target_version, migration in MIGRATIONS:
+        if version >= target_version:
+            continue
+        cursor.execute("BEGIN")
+        try:
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {target_version}")
+            cursor.connection.commit()
+        except sqlite3.Error:
+            cursor.connection.rollback()
+            raise
+        version = target_version
+
+    # Triggers are created last so they only ever attach to tables in their final shape.
+    create_sync_triggers(cursor)
+    cursor.connection.commit()
+
+
+def migrate_text_dates(cursor):
+    """
+    Version 2: stores 'task_date' as a day ordinal (date.toordinal) instead of ISO text, and 'repeat_toggle' as a
+    constrained boolean. Unparseable dates fall back to today.
+    """
+
+    today = date.today().toordinal()
+
+    for list_name in ("current_task_list", "repeat_task_list"):
+        cursor.execute(f"ALTER TABLE {list_name} RENAME TO {list_name}_v1")
+        create_tables(cursor)
+        cursor.execute(
+            f"""
+            INSERT INTO {list_name} (id_num, title, first_step, second_step, third_step, task_date, repeat_toggle, interval_index)
+            SELECT
+                id_num,
+                title,
+                first_step,
+                second_step,
+                third_step,
+                COALESCE(CAST(julianday(task_date) - julianday('0001-01-01') AS INTEGER) + 1, ?),
+                CASE WHEN repeat_toggle THEN 1 ELSE 0 END,
+                interval_index
+            FROM {list_name}_v1
+            """,
+            (today,),
+        )
+        cursor.execute(f"DROP TABLE {list_name}_v1")
+
+
+def migrate_recurrence(cursor):
+    """
+    Version 3: adds the 'recurrence' rule column. NULL keeps the preset chosen by 'interval_index'.
+    """
+
+    for list_name in ("current_task_list", "repeat_task_list"):
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({list_name})")]
+        # Tables rebuilt by an earlier migration in the same upgrade already have the column.
+        if "recurrence" not in columns:
+            cursor.execute(f"ALTER TABLE {list_name} ADD COLUMN recurrence TEXT")
+
+
+def migrate_sync_metadata(cursor):
+    """
+    Version 4: adds the sync tables and registers every existing row as changed once, so the first sync sends
+    everything.
+    """
+
+    create_sync_tables(cursor)
+
+    for table_name, uid in SYNC_UIDS.items():
+        key_column = KEY_COLUMNS[table_name]
+        cursor.execute("UPDATE sync_meta SET value = value + 1 WHERE key = 'clock'")
+        cursor.execute(f"""
+            INSERT INTO sync_rows (table_name, uid, local_key, deleted, version, device)
+            SELECT '{table_name}', {uid.replace("NEW.", "")}, {key_column}, 0, {SYNC_CLOCK}, {SYNC_DEVICE}
+            FROM {table_name}
+            """)
+        for column in TABLE_COLUMNS[table_name]:
+            cursor.execute(f"""
+                INSERT INTO sync_fields (table_name, uid, column_name, version, device)
+                SELECT table_name, uid, '{column}', version, device FROM sync_rows WHERE table_name = '{table_name}'
+                """)
+
+
+def migrate_task_archive(cursor):
+    """
+    Version 5: adds 'task_archive' and 'archive_summary'. Completions from before the archive only exist as counts,
+    so both start empty.
+    """
+
+    create_tables(cursor)
+
+
+# Pairs of (version, migration) applied in order to databases older than that version. Versions 0 and 1 are the
+# original schema with ISO text dates.
+MIGRATIONS = (
+    (2, migrate_text_dates),
+    (3, migrate_recurrence),
+    (4, migrate_sync_metadata),
+    (5, migrate_task_archive),
+)
+
+
+SYNC_CLOCK = "(SELECT value FROM sync_meta WHERE key = 'clock')"
+SYNC_DEVICE = "(SELECT value FROM sync_meta WHERE key = 'device')"
+SYNC_CAPTURING = "(SELECT value FROM sync_meta WHERE key = 'applying') = 0"
+
+
+def create_sync_tables(cursor):
+    """
+    Creates the sync bookkeeping. 'sync_rows' maps each row's local key to a uid shared between devices and holds
+    its tombstone, and 'sync_fields' holds a version per column. Versions come from a Lamport clock in 'sync_meta',
+    with the device id breaking ties.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_meta(
+            key TEXT PRIMARY KEY,
+            value
+        )
+        """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO sync_meta (key, value) VALUES
+            ('device', lower(hex(randomblob(8)))),
+            ('clock', 0),
+            ('applying', 0),
+            ('pushed_clock', 0),
+            ('server_token', 0)
+        """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_rows(
+            table_name TEXT NOT NULL,
+            uid TEXT NOT NULL,
+            local_key,
+            deleted BOOLEAN NOT NULL DEFAULT 0,
+            version INTEGER NOT NULL,
+            device TEXT NOT NULL,
+            PRIMARY KEY (table_name, uid),
+            UNIQUE (table_name, local_key)
+        )
+        """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_fields(
+            table_name TEXT NOT NULL,
+            uid TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            device TEXT NOT NULL,
+            PRIMARY KEY (table_name, uid, column_name)
+        )
+        """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS sync_rows_version ON sync_rows (version)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS sync_fields_version ON sync_fields (version)"
+    )
+
+
+def _sync_field_sql(table_name, column, key_ref):
+    """
+    Helper for 'create_sync_triggers' stamping one column of a row with the current clock.
+    """
+
+    return f"""
+        INSERT INTO sync_fields (table_name, uid, column_name, version, device)
+        SELECT '{table_name}', uid, '{column}', {SYNC_CLOCK}, {SYNC_DEVICE}
+        FROM sync_rows WHERE table_name = '{table_name}' AND local_key = {key_ref}
+        ON CONFLICT (table_name, uid, column_name) DO UPDATE SET version = excluded.version, device = excluded.device;
+    """
+
+
+def create_sync_triggers(cursor):
+    """
+    Records every insert, changed column and delete in the sync tables, whichever code path wrote it. Changes
+    applied from a sync set 'applying' and are stamped with their remote versions instead.
+    """
+
+    for table_name, uid in SYNC_UIDS.items():
+        key_column = KEY_COLUMNS[table_name]
+        bump_clock = "UPDATE sync_meta SET value = value + 1 WHERE key = 'clock';"
+        stamp_fields = "".join(
+            _sync_field_sql(table_name, column, f"NEW.{key_column}")
+            for column in TABLE_COLUMNS[table_name]
+        )
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS sync_{table_name}_insert AFTER INSERT ON {table_name}
+            WHEN {SYNC_CAPTURING}
+            BEGIN
+                {bump_clock}
+                INSERT INTO sync_rows (table_name, uid, local_key, deleted, version, device)
+                VALUES (
+                    '{table_name}',
+                    COALESCE(
+                        (SELECT uid FROM sync_rows WHERE table_name = '{table_name}' AND local_key = NEW.{key_column}),
+                        {uid}
+                    ),
+                    NEW.{key_column},
+                    0,
+                    {SYNC_CLOCK},
+                    {SYNC_DEVICE}
+                )
+                ON CONFLICT (table_name, uid) DO UPDATE SET
+                    local_key = excluded.local_key,
+                    deleted = 0,
+                    version = excluded.version,
+                    device = excluded.device;
+                {stamp_fields}
+            END
+            """)
+
+        for column in TABLE_COLUMNS[table_name]:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS sync_{table_name}_update_{column}
+                AFTER UPDATE OF {column} ON {table_name}
+                WHEN {SYNC_CAPTURING} AND NEW.{column} IS NOT OLD.{column}
+                BEGIN
+                    {bump_clock}
+                    {_sync_field_sql(table_name, column, f"NEW.{key_column}")}
+                END
+                """)
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS sync_{table_name}_delete AFTER DELETE ON {table_name}
+            WHEN {SYNC_CAPTURING}
+            BEGIN
+                {bump_clock}
+                UPDATE sync_rows SET deleted = 1, version = {SYNC_CLOCK}, device = {SYNC_DEVICE}
+                WHERE table_name = '{table_name}' AND local_key = OLD.{key_column};
+            END
+            """)
+
+
+def task_row(task):
+    """
+    Returns a task's portable columns in storage form.
+    """
+
+    return (
+        task.title,
+        task.first_step,
+        task.second_step,
+        task.third_step,
+        task.start_date.toordinal(),
+        bool(task.repeat_toggle),
+        task.interval_index,
+        str(task.recurrence) if task.recurrence is not None else None,
+    )
+
+
+def archive_row(task, completed_date):
+    """
+    Returns the archive columns of a task completed on 'completed_date', in storage form.
+    """
+
+    return task_row(task) + (completed_date.toordinal(),)
+
+
+class SaveReport:
+    """
+    Rows and columns written by a dirty-only save, compared with the full save that rewrites every column of every
+    row.
+    """
+
+    def __init__(self) -> None:
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.columns_written = 0
+        self.columns_total = 0
+
+    def record(self, written_columns: int, total_columns: int) -> None:
+        if written_columns:
+            self.rows_written += 1
+        else:
+            self.rows_skipped += 1
+        self.columns_written += written_columns
+        self.columns_total += total_columns
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_written": self.rows_written,
+            "rows_skipped": self.rows_skipped,
+            "columns_written": self.columns_written,
+            "columns_total": self.columns_total,
+        }
+
+    def __str__(self) -> str:
+        rows_total = self.rows_written + self.rows_skipped
+        return (
+            f"Wrote {self.rows_written} of {rows_total} rows and {self.columns_written} of "
+            f"{self.columns_total} columns ({self.rows_skipped} unchanged rows skipped)"
+        )
+
+
+def dirty_values(table_name, node):
+    """
+    Returns the storage-form values of the node's dirty columns, keyed by column name.
+    """
+
+    row = (
+        task_row(node)
+        if "task_date" in TABLE_COLUMNS[table_name]
+        else node.get_fields()
+    )
+
+    return {
+        column: value
+        for column, value, field in zip(TABLE_COLUMNS[table_name], row, node.FIELDS)
+        if field in node.dirty_fields
+    }
+
+
+def upsert_sql(table_name, columns):
+    """
+    Builds the statement writing the given columns of a row, with parameters (key, *values). A full set of columns
+    is inserted or updated in place. A partial set updates an existing row only, since SQLite checks NOT NULL
+    columns of the inserted row before it detects the conflict.
+    """
+
+    key_column = KEY_COLUMNS[table_name]
+    if set(TABLE_COLUMNS[table_name]) - {key_column} - set(columns):
+        assignments = ", ".join(
+            f"{column} = ?{index}" for index, column in enumerate(columns, 2)
+        )
+        return f"UPDATE {table_name} SET {assignments} WHERE {key_column} = ?1"
+
+    column_list = ", ".join((key_column,) + tuple(columns))
+    placeholders = ",".join("?" for _ in range(len(columns) + 1))
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in columns)
+    conflict = f"DO UPDATE SET {assignments}" if columns else "DO NOTHING"
+
+    return (
+        f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders}) "
+        f"ON CONFLICT({key_column}) {conflict}"
+    )
+
+
+# The single-row helpers below leave committing to the caller, so a CLI command can group them into one transaction.
+def add_task(cursor, task, list_name):
+    """
+    Inserts a single task and returns its row id.
+    """
+
+    sql = f"""
+    INSERT INTO {list_name} (title, first_step, second_step, third_step, task_date, repeat_toggle, interval_index, recurrence) VALUES (?,?,?,?,?,?,?,?);
+    """
+
+    cursor.execute(sql, task_row(task))
+
+    return cursor.lastrowid
+
+
+def add_item(cursor, item):
+    """
+    Inserts a single item and returns its row id.
+    """
 
-def save_item_list(cursor, item_list):
     sql = """
     INSERT INTO item_list (title, quantity, item_location, interval_index) VALUES (?,?,?,?);
     """
 
-    data_list = [
+    cursor.execute(
+        sql, (item.title, item.quantity, item.item_location, item.interval_index)
+    )
+
+    return cursor.lastrowid
+
+
+def update_item(cursor, item):
+    """
+    Rewrites an existing item's columns in place, keeping its row id.
+    """
+
+    sql = """
+    UPDATE item_list SET title = ?, quantity = ?, item_location = ?, interval_index = ? WHERE id_num = ?;
+    """
+
+    cursor.execute(
+        sql,
         (
             item.title,
             item.quantity,
             item.item_location,
             item.interval_index,
-        )
-        for item in item_list
-    ]
-
-    cursor.executemany(sql, data_list)
-    cursor.connection.commit()
+            item.id_num,
+        ),
+    )
 
 
-def save_stats_data(cursor, stats_screen):
-    sql = """
-    INSERT INTO stats_screen (current_level, current_xp, start_level, next_level) VALUES (?,?,?,?);
+def delete_row(cursor, table_name, id_num):
+    """
+    Deletes a single row by id. Returns False if no such row exists.
     """
 
-    data_list = (
-        stats_screen.current_level,
-        stats_screen.current_xp,
-        stats_screen.start_level,
-        stats_screen.next_level,
-    )
+    cursor.execute(f"DELETE FROM {table_name} WHERE id_num = ?", (id_num,))
 
-    cursor.execute(sql, data_list)
-    cursor.connection.commit()
+    return cursor.rowcount > 0
 
 
-def save_stats_maps(cursor, task_map, map_name):
-    sql = f"""
-    INSERT INTO {map_name} (title, count) VALUES (?,?);
+def replace_stats_data(cursor, stats_screen):
+    """
+    Overwrites the single stats row rather than appending another one.
     """
 
-    data_list = [(title, count) for title, count in task_map.items()]
+    insert_table_rows(cursor, "stats_screen", [stats_screen.get_state()])
 
-    cursor.executemany(sql, data_list)
-    cursor.connection.commit()
 
-
-def save_item_locations(cursor, locations_set):
-    sql = """
-    INSERT INTO item_locations (location) VALUES (?);
+def increment_stats_map(cursor, map_name, title):
+    """
+    Adds one to the count of a completed task or purchased item, creating it if needed.
     """
 
-    data_list = [(location,) for location in locations_set]
+    sql = f"""
+    INSERT INTO {map_name} (title, count) VALUES (?, 1)
+    ON CONFLICT(title) DO UPDATE SET count = count + 1;
+    """
 
-    cursor.executemany(sql, data_list)
-    cursor.connection.commit()
+    cursor.execute(sql, (title,))
 
 
 def close_db(connection, cursor):
@@ -184,15 +674,178 @@ def close_db(connection, cursor):
         connection.close()
 
 
+def iter_table_rows(cursor, table_name, batch_size=1000):
+    """
+    Yields the portable columns of a table one row at a time, fetching in batches to keep memory bounded.
+    """
+
+    columns = ", ".join(TABLE_COLUMNS[table_name])
+    cursor.execute(f"SELECT {columns} FROM {table_name} ORDER BY id_num")
+
+    rows = cursor.fetchmany(batch_size)
+    while rows:
+        if table_name == "task_archive":
+            rows = [_portable_archive_row(row) for row in rows]
+        elif "task_date" in TABLE_COLUMNS[table_name]:
+            rows = [_portable_task_row(row) for row in rows]
+        yield from rows
+        rows = cursor.fetchmany(batch_size)
+
+
+def _portable_task_row(row):
+    """
+    Helper for 'iter_table_rows' to export task dates as ISO text, which doesn't depend on the schema version.
+    """
+
+    title, first_step, second_step, third_step, task_date, *rest = row
+    task_date = date.fromordinal(task_date).isoformat()
+
+    return (title, first_step, second_step, third_step, task_date, *rest)
+
+
+def _portable_archive_row(row):
+    """
+    Helper for 'iter_table_rows' exporting an archived task, whose completion date follows the task columns.
+    """
+
+    return _portable_task_row(row[:-1]) + (date.fromordinal(row[-1]).isoformat(),)
+
+
+def _checked_interval(interval, kind):
+    """
+    Helper for 'insert_table_rows' converting an imported interval or unit index, which must be in range.
+    """
+
+    if interval in (None, ""):
+        raise ValueError("interval_index is required")
+    interval = int(interval)
+    if not 0 <= interval < INTERVAL_COUNTS[kind]:
+        raise ValueError(f"interval_index {interval} is out of range")
+
+    return interval
+
+
+def _stored_date(value, column):
+    """
+    Helper for 'insert_table_rows' converting a required ISO text date to an ordinal.
+    """
+
+    if value in (None, ""):
+        raise ValueError(f"{column} is required")
+    if isinstance(value, str):
+        return date.fromisoformat(value).toordinal()
+
+    return value
+
+
+def _stored_task_row(row):
+    """
+    Helper for 'insert_table_rows' to convert ISO text dates and text booleans, as found in NDJSON or CSV files.
+    Raises ValueError for a missing date or an out of range interval.
+    """
+
+    (
+        title,
+        first_step,
+        second_step,
+        third_step,
+        task_date,
+        repeat_toggle,
+        interval,
+        recurrence,
+    ) = row
+    task_date = _stored_date(task_date, "task_date")
+    if isinstance(repeat_toggle, str):
+        repeat_toggle = repeat_toggle.lower() in ("1", "true")
+
+    return (
+        title,
+        first_step,
+        second_step,
+        third_step,
+        task_date,
+        bool(repeat_toggle),
+        _checked_interval(interval, "task"),
+        recurrence or None,
+    )
+
+
+def _stored_archive_row(row):
+    """
+    Helper for 'insert_table_rows' converting an imported archived task.
+    """
+
+    completed_date = _stored_date(row[-1], "completed_date")
+
+    return _stored_task_row(row[:-1]) + (completed_date,)
+
+
+def _stored_item_row(row):
+    """
+    Helper for 'insert_table_rows' checking an imported item's unit.
+    """
+
+    title, quantity, item_location, interval = row
+
+    return (title, quantity, item_location, _checked_interval(interval, "item"))
+
+
+def insert_table_rows(cursor, table_name, rows):
+    """
+    Inserts a batch of portable rows into a table without committing, leaving the transaction to the caller.
+    Stats counts are merged into existing titles and the stats row is replaced since only one may exist.
+    """
+
+    columns = TABLE_COLUMNS[table_name]
+    placeholders = ",".join("?" for _ in columns)
+    sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    if table_name == "stats_screen":
+        # Only one stats row may exist, and it always uses id 1.
+        cursor.execute("DELETE FROM stats_screen")
+        sql = f"INSERT INTO {table_name} (id_num, {', '.join(columns)}) VALUES (1,{placeholders})"
+        rows = rows[-1:]
+    elif table_name in ("completed_tasks", "purchased_items"):
+        sql += " ON CONFLICT(title) DO UPDATE SET count = count + excluded.count"
+    elif table_name == "item_locations":
+        sql += " ON CONFLICT(location) DO NOTHING"
+    elif table_name == "task_archive":
+        rows = [_stored_archive_row(row) for row in rows]
+    elif table_name == "item_list":
+        rows = [_stored_item_row(row) for row in rows]
+    elif "task_date" in columns:
+        rows = [_stored_task_row(row) for row in rows]
+
+    cursor.executemany(sql, rows)
+
+
 def get_task_list(cursor, list_name):
     cursor.execute(
-        f"SELECT id_num, title, first_step, second_step, third_step, task_date, repeat_toggle, interval_index FROM {list_name}"
+        f"SELECT id_num, title, first_step, second_step, third_step, task_date, repeat_toggle, interval_index, recurrence FROM {list_name}"
     )
     rows = cursor.fetchall()
 
     return rows
 
 
+def get_task(cursor, list_name, id_num):
+    cursor.execute(
+        f"SELECT id_num, title, first_step, second_step, third_step, task_date, repeat_toggle, interval_index, recurrence FROM {list_name} WHERE id_num = ?",
+        (id_num,),
+    )
+
+    return cursor.fetchone()
+
+
+def get_item(cursor, id_num):
+    cursor.execute(
+        "SELECT id_num, title, quantity, item_location, interval_index FROM item_list WHERE id_num = ?",
+        (id_num,),
+    )
+
+    return cursor.fetchone()
+
+
 def get_item_list(cursor):
     cursor.execute(
         "SELECT id_num, title, quantity, item_location, interval_index FROM item_list"
@@ -218,8 +871,500 @@ def get_stats_maps(cursor, table_name):
     return rows
 
 
+def get_stats_count(cursor, map_name, title):
+    """
+    Returns how many times a task has been completed or an item purchased, 0 if never.
+    """
+
+    cursor.execute(f"SELECT count FROM {map_name} WHERE title = ?", (title,))
+    row = cursor.fetchone()
+
+    return row[0] if row else 0
+
+
 def get_item_locations(cursor):
     cursor.execute(f"SELECT location FROM item_locations")
     rows = cursor.fetchall()
 
     return [row[0] for row in rows]
+
+
+def archive_task(cursor, task, completed_date):
+    """
+    Inserts a completed task into the archive and returns its row id.
+    """
+
+    columns = TABLE_COLUMNS["task_archive"]
+    placeholders = ",".join("?" for _ in columns)
+    cursor.execute(
+        f"INSERT INTO task_archive ({', '.join(columns)}) VALUES ({placeholders})",
+        archive_row(task, completed_date),
+    )
+
+    return cursor.lastrowid
+
+
+def next_archive_id(cursor):
+    """
+    Returns an archive row id that has never been used, so ids handed out by the app don't collide with rows
+    that were compacted away.
+    """
+
+    row = cursor.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'task_archive'"
+    ).fetchone()
+
+    return (row[0] if row else 0) + 1
+
+
+def get_archive_page(cursor, before=None, limit=50, title=None):
+    """
+    Returns a page of archived tasks, most recently completed first, and the (completed_date, id_num) key to pass
+    as 'before' for the next page, or None on the last page. Pages are found by seeking the completion index to
+    the key rather than with OFFSET, so a page far back in the history costs the same as the first.
+    """
+
+    conditions = []
+    params = []
+    if before is not None:
+        conditions.append("(completed_date, id_num) < (?, ?)")
+        params.extend(before)
+    if title is not None:
+        conditions.append("title = ?")
+        params.append(title)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    rows = cursor.execute(
+        f"""
+        SELECT id_num, {', '.join(TABLE_COLUMNS['task_archive'])} FROM task_archive {where}
+        ORDER BY completed_date DESC, id_num DESC LIMIT ?
+        """,
+        params + [limit + 1],
+    ).fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+
+    return rows, (rows[-1][-1], rows[-1][0])
+
+
+def get_archive_summary(cursor, title=None):
+    """
+    Returns (month, title, count, first_date, last_date) rows of compacted history, newest month first.
+    """
+
+    sql = "SELECT month, title, count, first_date, last_date FROM archive_summary"
+    params = ()
+    if title is not None:
+        sql += " WHERE title = ?"
+        params = (title,)
+    sql += " ORDER BY month DESC, title"
+
+    return cursor.execute(sql, params).fetchall()
+
+
+def compact_archive(cursor, retention_days=ARCHIVE_RETENTION_DAYS, today=None):
+    """
+    Folds archived tasks completed more than 'retention_days' ago into per-month counts in 'archive_summary' and
+    deletes them, in one transaction. Returns the number of rows compacted.
+    """
+
+    cutoff = (today or date.today()).toordinal() - retention_days
+
+    with cursor.connection:
+        # Day ordinals count from 0001-01-01, which SQLite takes as a Julian day number once offset.
+        cursor.execute(
+            """
+            INSERT INTO archive_summary (month, title, count, first_date, last_date)
+            SELECT
+                strftime('%Y-%m', julianday('0001-01-01') + completed_date - 1),
+                title,
+                COUNT(*),
+                MIN(completed_date),
+                MAX(completed_date)
+            FROM task_archive
+            WHERE completed_date < ?
+            GROUP BY 1, 2
+            ON CONFLICT (month, title) DO UPDATE SET
+                count = count + excluded.count,
+                first_date = min(first_date, excluded.first_date),
+                last_date = max(last_date, excluded.last_date)
+            """,
+            (cutoff,),
+        )
+        cursor.execute("DELETE FROM task_archive WHERE completed_date < ?", (cutoff,))
+
+    return cursor.rowcount
+
+
+def write_backup(connection, path):
+    """
+    Copies a live database to '<path>.snapshot' with the SQLite backup API. The copy is written and synced to a
+    temporary file first and then renamed, so a crash leaves either the old or the new backup intact.
+    """
+
+    backup_path = f"{path}.snapshot"
+    temp_path = f"{backup_path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    backup_connection = sqlite3.connect(temp_path)
+    try:
+        connection.backup(backup_connection)
+    finally:
+        backup_connection.close()
+
+    with open(temp_path, "rb+") as temp_file:
+        os.fsync(temp_file.fileno())
+
+    os.replace(temp_path, backup_path)
+
+
+def snapshot_saved_at(path):
+    """
+    Returns when a database was last written, or None if the file is missing or not a valid database.
+    Databases from before this was tracked fall back to their modification time. The file is opened for writing, so
+    SQLite rolls back a hot journal left by a crash mid-transaction instead of reporting the database as unreadable.
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    connection = None
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=rw", uri=True)
+        cursor = connection.cursor()
+        if cursor.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            return None
+        tables = {
+            row[0]
+            for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            )
+        }
+        # Tables added by later migrations are created on upgrade, so only the original ones are required.
+        if not set(TABLE_COLUMNS) - {"task_archive"} <= tables:
+            return None
+        if "snapshot_meta" in tables:
+            row = cursor.execute("SELECT MAX(saved_at) FROM snapshot_meta").fetchone()
+            if row[0] is not None:
+                return row[0]
+        return os.path.getmtime(path)
+    except sqlite3.Error:
+        return None
+    finally:
+        if connection:
+            connection.close()
+
+
+def recover_snapshot(path="main.db"):
+    """
+    Makes sure a valid database is in place at 'path'. The database itself is kept whenever it opens and passes
+    its check, since it holds every committed change. Otherwise the newer of its backup and a finished temporary
+    backup that was never renamed replaces it. Returns False if no valid copy exists.
+    """
+
+    if snapshot_saved_at(path) is not None:
+        return True
+
+    candidates = []
+    for candidate in (f"{path}.snapshot", f"{path}.snapshot.tmp"):
+        saved_at = snapshot_saved_at(candidate)
+        if saved_at is not None:
+            candidates.append((saved_at, candidate))
+
+    if not candidates:
+        return False
+
+    # The damaged database and its journal are set aside rather than deleted. A journal left next to the restored
+    # backup would be rolled back into it.
+    for suffix in ("", "-journal"):
+        if os.path.exists(f"{path}{suffix}"):
+            os.replace(f"{path}{suffix}", f"{path}.damaged{suffix}")
+    os.replace(max(candidates)[1], path)
+
+    return True
+
+
+class DatabaseWriter(threading.Thread):
+    """
+    Background thread that owns the database connection and applies write-through mutations.
+    Each mutation is keyed by table and row, so repeated edits to the same row before a flush collapse into one
+    statement. Pending mutations are written in a single transaction every 'flush_interval' seconds. Archived tasks
+    older than 'archive_retention_days' are compacted when the thread starts.
+    """
+
+    def __init__(
+        self,
+        path="main.db",
+        flush_interval=0.5,
+        archive_retention_days=ARCHIVE_RETENTION_DAYS,
+    ):
+        super().__init__(name="database-writer", daemon=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.archive_retention_days = archive_retention_days
+
+        self.pending = OrderedDict()
+        self.staged = None
+        self.condition = threading.Condition()
+        self.submitted = 0
+        self.committed = 0
+        self.backup_requested = False
+        self.flush_requested = False
+        self.stopping = False
+
+        self.coalesced = 0
+        self.flush_count = 0
+        self.rows_written = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    def upsert(self, table_name, key, values):
+        """
+        Queues an insert or update of the row identified by 'key'. 'values' maps column names to new values.
+        """
+
+        self._submit(table_name, key, values)
+
+    def delete(self, table_name, key):
+        self._submit(table_name, key, None)
+
+    def request_backup(self):
+        """
+        Asks for a backup copy to be written after the next flush.
+        """
+
+        with self.condition:
+            self.backup_requested = True
+            self.condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every mutation submitted before the call has been committed. Returns False on timeout.
+        """
+
+        with self.condition:
+            target = self.submitted
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(
+                lambda: self.committed >= target or not self.is_alive(), timeout
+            )
+
+    def close(self, timeout=None):
+        """
+        Flushes outstanding mutations and stops the thread.
+        """
+
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.join(timeout)
+
+    def metrics(self) -> dict:
+        with self.condition:
+            return {
+                "queue_depth": len(self.pending),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "flushes": self.flush_count,
+                "rows_written": self.rows_written,
+                "last_flush_ms": self.last_flush_latency * 1000,
+                "max_flush_ms": self.max_flush_latency * 1000,
+                "avg_flush_ms": (
+                    self.total_flush_latency / self.flush_count * 1000
+                    if self.flush_count
+                    else 0.0
+                ),
+            }
+
+    @contextmanager
+    def batch(self):
+        """
+        Holds back the mutations submitted inside the block and queues them together, so a flush can't fall between
+        them and they are committed in one transaction. Nested blocks join the outermost one.
+        """
+
+        if self.staged is not None:
+            yield
+            return
+
+        self.staged = []
+        try:
+            yield
+        finally:
+            staged, self.staged = self.staged, None
+            with self.condition:
+                for table_name, key, values in staged:
+                    self._queue(table_name, key, values)
+
+    def _submit(self, table_name, key, values):
+        if self.staged is not None:
+            self.staged.append((table_name, key, values))
+            return
+
+        with self.condition:
+            self._queue(table_name, key, values)
+
+    def _queue(self, table_name, key, values):
+        """
+        Helper for '_submit' adding one mutation to the pending batch. Called with 'condition' held.
+        """
+
+        row_key = (table_name, key)
+        if row_key in self.pending:
+            self.coalesced += 1
+            previous = self.pending[row_key]
+            if values is not None and previous is not None:
+                values = {**previous, **values}
+        self.pending[row_key] = values
+        self.submitted += 1
+
+    def run(self):
+        connection = None
+        try:
+            connection = sqlite3.connect(self.path)
+            cursor = connection.cursor()
+            upgrade_schema(cursor)
+
+            # Compacted here rather than while loading, so startup never waits on it.
+            if self.archive_retention_days is not None:
+                try:
+                    compact_archive(cursor, self.archive_retention_days)
+                except sqlite3.Error as e:
+                    print(f"An error occurred: {e}")
+
+            failed_attempts = 0
+            while True:
+                with self.condition:
+                    self.condition.wait_for(
+                        lambda: self.stopping
+                        or self.flush_requested
+                        or self.backup_requested,
+                        self.flush_interval,
+                    )
+                    self.flush_requested = False
+                    batch, self.pending = self.pending, OrderedDict()
+                    target = self.submitted
+                    backup_requested, self.backup_requested = (
+                        self.backup_requested,
+                        False,
+                    )
+                    stopping = self.stopping
+
+                written = not batch or self._write_or_requeue(cursor, batch)
+                failed_attempts = 0 if written else failed_attempts + 1
+
+                if written:
+                    with self.condition:
+                        self.committed = target
+                        self.condition.notify_all()
+
+                if backup_requested:
+                    try:
+                        write_backup(connection, self.path)
+                    except (OSError, sqlite3.Error) as e:
+                        print(f"An error occurred: {e}")
+
+                if stopping and (
+                    not self.pending or failed_attempts >= STOP_WRITE_ATTEMPTS
+                ):
+                    if self.pending:
+                        print(f"Dropped {len(self.pending)} unsaved changes")
+                    return
+        except (OSError, sqlite3.Error) as e:
+            print(f"An error occurred: {e}")
+        finally:
+            with self.condition:
+                self.condition.notify_all()
+            if connection:
+                connection.close()
+
+    def _write_or_requeue(self, cursor, batch):
+        """
+        Writes a batch, returning False if it has to be retried. A locked or unwritable database puts the whole
+        batch back in front of newer mutations. Any other failure is narrowed down by writing each mutation on its
+        own, so a single bad row is dropped rather than blocking everything queued after it.
+        """
+
+        try:
+            self._write_batch(cursor, batch)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"An error occurred: {e}")
+            self._requeue(batch)
+            return False
+        except sqlite3.Error as e:
+            print(f"An error occurred: {e}")
+
+        for row_key, values in batch.items():
+            try:
+                self._write_batch(cursor, {row_key: values})
+            except sqlite3.OperationalError as e:
+                print(f"An error occurred: {e}")
+                remaining = list(batch)
+                self._requeue(
+                    OrderedDict(
+                        (key, batch[key])
+                        for key in remaining[remaining.index(row_key) :]
+                    )
+                )
+                return False
+            except sqlite3.Error as e:
+                print(f"Dropped change to {row_key[0]} {row_key[1]!r}: {e}")
+
+        return True
+
+    def _requeue(self, batch):
+        """
+        Helper for '_write_or_requeue' putting an unwritten batch back ahead of the mutations queued since, which
+        are merged over it as if they had been submitted after it.
+        """
+
+        with self.condition:
+            pending, self.pending = self.pending, OrderedDict(batch)
+            for (table_name, key), values in pending.items():
+                row_key = (table_name, key)
+                previous = self.pending.get(row_key)
+                if values is not None and previous is not None:
+                    values = {**previous, **values}
+                self.pending[row_key] = values
+
+    def _write_batch(self, cursor, batch):
+        """
+        Writes a batch of coalesced mutations in one transaction, grouping identical statements for executemany.
+        """
+
+        start_time = time.perf_counter()
+        statements = OrderedDict()
+
+        for (table_name, key), values in batch.items():
+            key_column = KEY_COLUMNS[table_name]
+            if values is None:
+                sql = f"DELETE FROM {table_name} WHERE {key_column} = ?"
+                params = (key,)
+            else:
+                columns = tuple(column for column in values if column != key_column)
+                sql = upsert_sql(table_name, columns)
+                params = (key,) + tuple(values[column] for column in columns)
+            statements.setdefault(sql, []).append(params)
+
+        with cursor.connection:
+            for sql, params_list in statements.items():
+                cursor.executemany(sql, params_list)
+            cursor.execute(
+                "INSERT INTO snapshot_meta (id_num, saved_at) VALUES (1, ?) "
+                "ON CONFLICT(id_num) DO UPDATE SET saved_at = excluded.saved_at",
+                (time.time(),),
+            )
+
+        latency = time.perf_counter() - start_time
+        with self.condition:
+            self.flush_count += 1
+            self.rows_written += len(batch)
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self.total_flush_latency += latency
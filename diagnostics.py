@@ -0,0 +1,323 @@
+# Standard library imports
+import functools
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Set to 1 to start tracemalloc and show the memory overlay when the app starts.
+MEMORY_ENV = "TODOAPP_MEMORY"
+
+# Set to 1 to time traced handlers and show their latency and dropped frames in the overlay. Read once at import,
+# since handlers are only wrapped when tracing is on.
+TRACE_ENV = "TODOAPP_TRACE"
+
+# Timings kept per handler, and the frame time above which a frame counts as dropped.
+TRACE_HISTORY = 256
+FRAME_BUDGET = 1 / 60
+
+# Instances of classes from these modules are followed when sizing a structure. Anything else, such as widgets,
+# is counted by its own size only.
+FOLLOWED_MODULES = ("data_structures", "recurrence")
+CONTAINER_TYPES = (dict, list, tuple, set, frozenset, deque)
+
+
+def memory_enabled() -> bool:
+    return os.environ.get(MEMORY_ENV) == "1"
+
+
+def deep_size(root) -> tuple:
+    """
+    Returns the number of objects reachable from 'root' and their approximate total size in bytes. Each object is
+    counted once, so a node reached through both a linked list and its 'node_lookup' isn't counted twice.
+    """
+
+    seen = set()
+    pending = [root]
+    objects = 0
+    size = 0
+
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        objects += 1
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, CONTAINER_TYPES):
+            pending.extend(obj)
+        elif type(obj).__module__ in FOLLOWED_MODULES and hasattr(obj, "__dict__"):
+            pending.append(vars(obj))
+
+    return objects, size
+
+
+class StructureSize:
+    """
+    Object count and approximate bytes of one named structure.
+    """
+
+    def __init__(self, name: str, objects: int, size: int) -> None:
+        self.name = name
+        self.objects = objects
+        self.size = size
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "objects": self.objects, "bytes": self.size}
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.objects} objects, {self.size / 1024:.1f} KiB"
+
+
+def measure_structures(structures: dict) -> list:
+    """
+    Sizes each structure separately, largest first. Objects shared between structures are counted in each.
+    """
+
+    sizes = [
+        StructureSize(name, *deep_size(structure))
+        for name, structure in structures.items()
+    ]
+    sizes.sort(key=lambda entry: entry.size, reverse=True)
+
+    return sizes
+
+
+def app_structures(
+    current_task_list, repeat_task_list, item_list, autocomplete, stats_screen
+) -> dict:
+    """
+    The structures that grow with use, keyed by the name shown in reports. Shared by the app and the CLI.
+    """
+
+    structures = {}
+    for linked_list in (current_task_list, repeat_task_list, item_list):
+        structures[f"{linked_list.list_name} node_lookup"] = linked_list.node_lookup
+        structures[linked_list.list_name] = linked_list
+    structures["autocomplete trie"] = autocomplete
+    structures["stats completed_tasks"] = stats_screen.completed_tasks
+    structures["stats purchased_items"] = stats_screen.purchased_items
+    structures["stats locations"] = stats_screen.locations
+
+    return structures
+
+
+class MemoryDiff:
+    """
+    Net allocations made during one tracked operation, with the source lines that allocated the most.
+    """
+
+    def __init__(self, label: str, stats: list, top: int = 5) -> None:
+        self.label = label
+        self.size_diff = sum(stat.size_diff for stat in stats)
+        self.count_diff = sum(stat.count_diff for stat in stats)
+        self.top = [
+            f"{stat.traceback[0].filename.rsplit(os.sep, 1)[-1]}:{stat.traceback[0].lineno} "
+            f"{stat.size_diff / 1024:+.1f} KiB"
+            for stat in stats[:top]
+        ]
+
+    def as_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "bytes": self.size_diff,
+            "objects": self.count_diff,
+            "top": self.top,
+        }
+
+    def __str__(self) -> str:
+        return f"{self.label}: {self.size_diff / 1024:+.1f} KiB, {self.count_diff:+d} blocks"
+
+
+class MemoryProbe:
+    """
+    Takes tracemalloc snapshots around tracked operations and keeps the most recent differences. Does nothing until
+    started, so tracked functions only pay for a flag check.
+    """
+
+    def __init__(self, history: int = 20) -> None:
+        self.enabled = False
+        self.diffs = deque(maxlen=history)
+
+    def start(self) -> None:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def stop(self) -> None:
+        import tracemalloc
+
+        self.enabled = False
+        tracemalloc.stop()
+
+    @contextmanager
+    def track(self, label: str):
+        if not self.enabled:
+            yield
+            return
+
+        before = self._snapshot()
+        try:
+            yield
+        finally:
+            stats = self._snapshot().compare_to(before, "lineno")
+            self.diffs.append(MemoryDiff(label, stats))
+
+    def _snapshot(self):
+        import tracemalloc
+
+        # Leaves out tracemalloc's own allocations, which would otherwise dominate every difference.
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+    def traced_memory(self) -> tuple:
+        """
+        Current and peak bytes allocated since the probe started.
+        """
+
+        if not self.enabled:
+            return (0, 0)
+
+        import tracemalloc
+
+        return tracemalloc.get_traced_memory()
+
+
+memory_probe = MemoryProbe()
+
+
+def track_memory(function):
+    """
+    Decorator recording a snapshot difference around each call while 'memory_probe' is started.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not memory_probe.enabled:
+            return function(*args, **kwargs)
+        with memory_probe.track(function.__name__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def format_memory_report(sizes: list, diffs=(), traced=(0, 0)) -> str:
+    lines = [str(size) for size in sizes]
+    if any(traced):
+        lines.append(
+            f"traced: {traced[0] / 1024:.1f} KiB, peak {traced[1] / 1024:.1f} KiB"
+        )
+    for diff in diffs:
+        lines.append(str(diff))
+        lines.extend(f"    {line}" for line in diff.top)
+
+    return "\n".join(lines)
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class HandlerTracer:
+    """
+    Keeps the most recent durations of each traced handler in a ring buffer, along with frame times.
+    """
+
+    def __init__(self, enabled: bool, history: int = TRACE_HISTORY) -> None:
+        self.enabled = enabled
+        self.history = history
+        self.timings = {}
+        self.frame_times = deque(maxlen=history)
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def record(self, name: str, seconds: float) -> None:
+        timings = self.timings.get(name)
+        if timings is None:
+            timings = self.timings[name] = deque(maxlen=self.history)
+        timings.append(seconds)
+
+    def record_frame(self, seconds: float) -> None:
+        """
+        Counts a frame as dropped when it took longer than one and a half frame budgets.
+        """
+
+        self.frames += 1
+        self.frame_times.append(seconds)
+        if seconds > FRAME_BUDGET * 1.5:
+            self.dropped_frames += 1
+
+    def summary(self) -> list:
+        """
+        (name, calls kept, p50 ms, p99 ms, max ms) per handler, slowest p99 first.
+        """
+
+        rows = [
+            (
+                name,
+                len(timings),
+                percentile(timings, 0.5) * 1000,
+                percentile(timings, 0.99) * 1000,
+                max(timings) * 1000,
+            )
+            for name, timings in self.timings.items()
+            if timings
+        ]
+        rows.sort(key=lambda row: row[3], reverse=True)
+
+        return rows
+
+    def format_report(self) -> str:
+        lines = []
+        if self.frame_times:
+            lines.append(
+                f"frames: p50 {percentile(self.frame_times, 0.5) * 1000:.1f} ms, "
+                f"p99 {percentile(self.frame_times, 0.99) * 1000:.1f} ms, "
+                f"{self.dropped_frames} of {self.frames} dropped"
+            )
+        for name, calls, p50, p99, longest in self.summary():
+            lines.append(
+                f"{name}: p50 {p50:.1f} ms, p99 {p99:.1f} ms, max {longest:.1f} ms ({calls})"
+            )
+
+        return "\n".join(lines)
+
+
+tracer = HandlerTracer(os.environ.get(TRACE_ENV) == "1")
+
+
+def trace_handler(function):
+    """
+    Decorator timing each call into 'tracer'. With tracing off the function is returned unwrapped, so it costs
+    nothing at call time.
+    """
+
+    if not tracer.enabled:
+        return function
+
+    name = function.__qualname__
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            tracer.record(name, perf_counter() - start)
+
+    return wrapper
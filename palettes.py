@@ -0,0 +1,281 @@
+# Standard library imports
+import json
+import os
+
+# Third-party imports
+import kivymd
+from kivy.clock import Clock
+from kivymd.theming import ThemeManager
+
+# Palettes cycled through by the button on the Stats screen, in order.
+PALETTE_NAMES = (
+    "Aliceblue",
+    "Antiquewhite",
+    "Aqua",
+    "Aquamarine",
+    "Azure",
+    "Beige",
+    "Bisque",
+    "Black",
+    "Blanchedalmond",
+    "Blue",
+    "Blueviolet",
+    "Brown",
+    "Burlywood",
+    "Cadetblue",
+    "Chartreuse",
+    "Chocolate",
+    "Coral",
+    "Cornflowerblue",
+    "Cornsilk",
+    "Crimson",
+    "Cyan",
+    "Darkblue",
+    "Darkcyan",
+    "Darkgoldenrod",
+    "Darkgray",
+    "Darkgrey",
+    "Darkgreen",
+    "Darkkhaki",
+    "Darkmagenta",
+    "Darkolivegreen",
+    "Darkorange",
+    "Darkorchid",
+    "Darkred",
+    "Darksalmon",
+    "Darkseagreen",
+    "Darkslateblue",
+    "Darkslategray",
+    "Darkslategrey",
+    "Darkturquoise",
+    "Darkviolet",
+    "Deeppink",
+    "Deepskyblue",
+    "Dimgray",
+    "Dimgrey",
+    "Dodgerblue",
+    "Firebrick",
+    "Floralwhite",
+    "Forestgreen",
+    "Fuchsia",
+    "Gainsboro",
+    "Ghostwhite",
+    "Gold",
+    "Goldenrod",
+    "Gray",
+    "Grey",
+    "Green",
+    "Greenyellow",
+    "Honeydew",
+    "Hotpink",
+    "Indianred",
+    "Indigo",
+    "Ivory",
+    "Khaki",
+    "Lavender",
+    "Lavenderblush",
+    "Lawngreen",
+    "Lemonchiffon",
+    "Lightblue",
+    "Lightcoral",
+    "Lightcyan",
+    "Lightgoldenrodyellow",
+    "Lightgreen",
+    "Lightgray",
+    "Lightgrey",
+    "Lightpink",
+    "Lightsalmon",
+    "Lightseagreen",
+    "Lightskyblue",
+    "Lightslategray",
+    "Lightslategrey",
+    "Lightsteelblue",
+    "Lightyellow",
+    "Lime",
+    "Limegreen",
+    "Linen",
+    "Magenta",
+    "Maroon",
+    "Mediumaquamarine",
+    "Mediumblue",
+    "Mediumorchid",
+    "Mediumpurple",
+    "Mediumseagreen",
+    "Mediumslateblue",
+    "Mediumspringgreen",
+    "Mediumturquoise",
+    "Mediumvioletred",
+    "Midnightblue",
+    "Mintcream",
+    "Mistyrose",
+    "Moccasin",
+    "Navajowhite",
+    "Navy",
+    "Oldlace",
+    "Olive",
+    "Olivedrab",
+    "Orange",
+    "Orangered",
+    "Orchid",
+    "Palegoldenrod",
+    "Palegreen",
+    "Paleturquoise",
+    "Palevioletred",
+    "Papayawhip",
+    "Peachpuff",
+    "Peru",
+    "Pink",
+    "Plum",
+    "Powderblue",
+    "Purple",
+    "Red",
+    "Rosybrown",
+    "Royalblue",
+    "Saddlebrown",
+    "Salmon",
+    "Sandybrown",
+    "Seagreen",
+    "Seashell",
+    "Sienna",
+    "Silver",
+    "Skyblue",
+    "Slateblue",
+    "Slategray",
+    "Slategrey",
+    "Snow",
+    "Springgreen",
+    "Steelblue",
+    "Tan",
+    "Teal",
+    "Thistle",
+    "Tomato",
+    "Turquoise",
+    "Violet",
+    "Wheat",
+    "White",
+    "Whitesmoke",
+    "Yellow",
+    "Yellowgreen",
+)
+
+
+class PaletteCache:
+    """
+    Theme colors for every palette, generated ahead of time and kept on disk. Applying a cached palette sets the
+    theme's color properties directly, skipping the color scheme computation that 'primary_palette' triggers, so
+    'primary_palette' keeps naming the last palette KivyMD computed. The app sets 'theme_style' only on startup,
+    which would otherwise recompute the scheme from that name. Entries are keyed by everything else the scheme
+    depends on, so a different style or KivyMD version regenerates them.
+    """
+
+    def __init__(self, path="palettes.json") -> None:
+        self.path = path
+        self.palettes = {}
+        self.generator = None
+        self.pending = []
+        self.dirty = False
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as stream:
+                self.palettes = json.load(stream)
+        except (OSError, ValueError):
+            self.palettes = {}
+
+    def save(self) -> None:
+        """
+        Writes through a temporary file and an atomic rename, so an interrupted save keeps the previous cache.
+        """
+
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as stream:
+                json.dump(self.palettes, stream)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"An error occurred: {e}")
+
+    @staticmethod
+    def cache_key(theme_cls, name: str) -> str:
+        return "/".join(
+            (
+                kivymd.__version__,
+                name,
+                theme_cls.theme_style,
+                theme_cls.dynamic_scheme_name,
+                str(theme_cls.dynamic_scheme_contrast),
+            )
+        )
+
+    @staticmethod
+    def capture(theme_cls) -> dict:
+        return {
+            color_name: list(getattr(theme_cls, color_name))
+            for color_name in theme_cls.dynamic_color_names
+        }
+
+    def apply(self, theme_cls, name: str) -> None:
+        """
+        Switches the app to a palette. A palette that hasn't been generated yet is computed by KivyMD as before and
+        captured for next time.
+        """
+
+        colors = self.palettes.get(self.cache_key(theme_cls, name))
+        if colors is None:
+            # A cached palette leaves 'primary_palette' behind, so it may already hold this name.
+            if theme_cls.primary_palette == name:
+                theme_cls.set_colors()
+            else:
+                theme_cls.primary_palette = name
+            self.palettes[self.cache_key(theme_cls, name)] = self.capture(theme_cls)
+            self.dirty = True
+            return
+
+        # Colors shared with the current palette are skipped so their bound widgets aren't dispatched.
+        for color_name, value in colors.items():
+            if list(getattr(theme_cls, color_name)) != value:
+                setattr(theme_cls, color_name, value)
+        if theme_cls.on_colors:
+            theme_cls.on_colors()
+
+    def generate(self, theme_cls, start_index: int = 0) -> None:
+        """
+        Fills in missing palettes one per frame, starting with the next one in the cycle, and saves them once done.
+        A separate ThemeManager does the work, so nothing on screen is redrawn.
+        """
+
+        self.pending = [
+            name
+            for name in PALETTE_NAMES[start_index:] + PALETTE_NAMES[:start_index]
+            if self.cache_key(theme_cls, name) not in self.palettes
+        ]
+        if not self.pending:
+            return
+
+        self.generator = ThemeManager()
+        self.generator.theme_style = theme_cls.theme_style
+        self.generator.dynamic_scheme_name = theme_cls.dynamic_scheme_name
+        self.generator.dynamic_scheme_contrast = theme_cls.dynamic_scheme_contrast
+        Clock.schedule_once(lambda dt: self._generate_next(theme_cls))
+
+    def _generate_next(self, theme_cls) -> None:
+        """
+        Helper for 'generate' computing a single palette.
+        """
+
+        while self.pending:
+            name = self.pending.pop(0)
+            key = self.cache_key(theme_cls, name)
+            if key in self.palettes:
+                continue
+            self.generator.primary_palette = name
+            self.generator.set_colors()
+            self.palettes[key] = self.capture(self.generator)
+            self.dirty = True
+            Clock.schedule_once(lambda dt: self._generate_next(theme_cls))
+            return
+
+        self.generator = None
+        if self.dirty:
+            self.save()
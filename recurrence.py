@@ -0,0 +1,184 @@
+# Standard library imports
+import calendar
+from datetime import date, timedelta
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+class RecurrenceRule:
+    """
+    A repeat schedule stored as a subset of an iCalendar RRULE, e.g. 'FREQ=MONTHLY;INTERVAL=1;BYMONTHDAY=31'.
+    Supports every N days, every N weeks (optionally on specific weekdays) and every N calendar months or years.
+    Occurrences are counted from the task's start date, so the next one can be found in constant time however
+    many intervals have been missed.
+    """
+
+    def __init__(self, frequency="DAILY", interval=1, weekdays=(), month_day=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unsupported frequency '{frequency}'")
+        if interval < 1:
+            raise ValueError("Interval must be at least 1")
+        if month_day is not None and not 1 <= month_day <= 31:
+            raise ValueError("Day of month must be between 1 and 31")
+        if weekdays and frequency != "WEEKLY":
+            raise ValueError("Weekdays are only supported by weekly rules")
+        if month_day is not None and frequency not in ("MONTHLY", "YEARLY"):
+            raise ValueError(
+                "Day of month is only supported by monthly and yearly rules"
+            )
+
+        self.frequency = frequency
+        self.interval = interval
+        self.weekdays = tuple(sorted(set(weekdays)))
+        self.month_day = month_day
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Parses a rule written by '__str__'. Unknown parts raise a ValueError.
+        """
+
+        parts = {}
+        for part in text.strip().upper().split(";"):
+            if not part:
+                continue
+            name, _, value = part.partition("=")
+            parts[name] = value
+
+        frequency = parts.pop("FREQ", "DAILY")
+        interval = int(parts.pop("INTERVAL", 1))
+        weekdays = []
+        if "BYDAY" in parts:
+            weekdays = [WEEKDAYS.index(day) for day in parts.pop("BYDAY").split(",")]
+        month_day = int(parts.pop("BYMONTHDAY")) if "BYMONTHDAY" in parts else None
+
+        if parts:
+            raise ValueError(f"Unsupported rule parts: {', '.join(parts)}")
+
+        return cls(frequency, interval, weekdays, month_day)
+
+    @classmethod
+    def from_interval_index(cls, interval_index):
+        """
+        Rule matching one of the dialog's preset intervals: a day, a week, a month or a year.
+        """
+
+        return cls(FREQUENCIES[interval_index])
+
+    def __str__(self):
+        text = f"FREQ={self.frequency};INTERVAL={self.interval}"
+        if self.weekdays:
+            text += ";BYDAY=" + ",".join(WEEKDAYS[day] for day in self.weekdays)
+        if self.month_day is not None:
+            text += f";BYMONTHDAY={self.month_day}"
+
+        return text
+
+    def __eq__(self, other):
+        return isinstance(other, RecurrenceRule) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def describe(self):
+        """
+        Short label for the task dialog, e.g. 'a month', '3 weeks' or 'mo, th'.
+        """
+
+        if self.weekdays:
+            days = ", ".join(WEEKDAYS[day].lower() for day in self.weekdays)
+            return days if self.interval == 1 else f"{days} /{self.interval}w"
+
+        unit = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month", "YEARLY": "year"}
+        if self.interval == 1:
+            return f"a {unit[self.frequency]}"
+
+        return f"{self.interval} {unit[self.frequency]}s"
+
+    def anchored(self, start_date):
+        """
+        Returns a copy that remembers the start date's day of month, so a task due on the 31st returns to the 31st
+        after passing through shorter months. Rules that don't count months are returned unchanged.
+        """
+
+        if self.frequency in ("MONTHLY", "YEARLY"):
+            return RecurrenceRule(
+                self.frequency, self.interval, self.weekdays, start_date.day
+            )
+
+        return self
+
+    def next_after(self, start_date, after):
+        """
+        Returns the first occurrence later than both 'start_date' and 'after'.
+        """
+
+        after = max(after, start_date)
+
+        if self.frequency == "DAILY":
+            return self._next_by_days(start_date, after, self.interval)
+        if self.frequency == "WEEKLY" and self.weekdays:
+            return self._next_weekday(start_date, after)
+        if self.frequency == "WEEKLY":
+            return self._next_by_days(start_date, after, 7 * self.interval)
+        if self.frequency == "MONTHLY":
+            return self._next_by_months(start_date, after, self.interval)
+
+        return self._next_by_months(start_date, after, 12 * self.interval)
+
+    def _next_by_days(self, start_date, after, step):
+        """
+        Helper for 'next_after' with a fixed number of days between occurrences.
+        """
+
+        count = (after - start_date).days // step + 1
+
+        return start_date + timedelta(days=count * step)
+
+    def _next_by_months(self, start_date, after, step):
+        """
+        Helper for 'next_after' with calendar months between occurrences. The day is clamped to the month's length.
+        """
+
+        day = self.month_day or start_date.day
+        start_month = start_date.year * 12 + start_date.month - 1
+        months_elapsed = after.year * 12 + after.month - 1 - start_month
+        count = max(1, months_elapsed // step)
+
+        # The first guess lands in or before the month of 'after', so at most two more steps are needed.
+        while True:
+            year, month = divmod(start_month + count * step, 12)
+            month += 1
+            occurrence = date(
+                year, month, min(day, calendar.monthrange(year, month)[1])
+            )
+            if occurrence > after:
+                return occurrence
+            count += 1
+
+    def _next_weekday(self, start_date, after):
+        """
+        Helper for 'next_after' on specific weekdays of every Nth week, counted from the start date's week.
+        """
+
+        start_monday = start_date - timedelta(days=start_date.weekday())
+        candidate = after + timedelta(days=1)
+        weeks_elapsed = (candidate - start_monday).days // 7
+        offset = weeks_elapsed % self.interval
+
+        if offset:
+            week = weeks_elapsed + self.interval - offset
+            first_weekday = 0
+        else:
+            week = weeks_elapsed
+            first_weekday = candidate.weekday()
+
+        for day in self.weekdays:
+            if day >= first_weekday:
+                return start_monday + timedelta(weeks=week, days=day)
+
+        # Only reachable when the candidate is past this week's last matching day.
+        week += self.interval
+
+        return start_monday + timedelta(weeks=week, days=self.weekdays[0])
@@ -0,0 +1,291 @@
+# Standard library imports
+import json
+import time
+import urllib.request
+
+# Local/application-specific imports
+import database
+
+DEFAULT_SERVER = "http://127.0.0.1:8765"
+
+
+class SyncReport:
+    """
+    Changes sent and received by a single sync, with the payload sizes and elapsed time.
+    """
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.received = 0
+        self.applied = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start_time
+        return self
+
+    def __str__(self) -> str:
+        return (
+            f"Sent {self.sent} rows ({self.bytes_sent} bytes), received {self.received} rows "
+            f"({self.bytes_received} bytes), applied {self.applied} and kept {self.skipped} newer local "
+            f"changes in {self.elapsed:.3f}s"
+        )
+
+
+def newer(version, device, other_version, other_device):
+    """
+    Last-writer-wins ordering of two (version, device) stamps. The device id breaks ties between equal clocks.
+    """
+
+    return (version, device) > (other_version, other_device)
+
+
+def get_meta(cursor, key):
+    return cursor.execute(
+        "SELECT value FROM sync_meta WHERE key = ?", (key,)
+    ).fetchone()[0]
+
+
+def set_meta(cursor, key, value):
+    cursor.execute("UPDATE sync_meta SET value = ? WHERE key = ?", (value, key))
+
+
+def collect_changes(cursor, pushed_clock, device):
+    """
+    Returns this device's rows and fields changed since the last push, with the current values of changed fields.
+    Reads two version indexes, so the work scales with the number of changes rather than the number of rows.
+    """
+
+    changes = {}
+
+    rows = cursor.execute(
+        """
+        SELECT table_name, uid, deleted, version, device FROM sync_rows
+        WHERE version > ? AND device = ?
+        """,
+        (pushed_clock, device),
+    ).fetchall()
+    for table_name, uid, deleted, version, row_device in rows:
+        changes[(table_name, uid)] = {
+            "table": table_name,
+            "uid": uid,
+            "deleted": bool(deleted),
+            "version": version,
+            "device": row_device,
+            "fields": {},
+        }
+
+    fields = cursor.execute(
+        """
+        SELECT f.table_name, f.uid, f.column_name, f.version, f.device, r.local_key, r.deleted
+        FROM sync_fields AS f
+        JOIN sync_rows AS r ON r.table_name = f.table_name AND r.uid = f.uid
+        WHERE f.version > ? AND f.device = ?
+        """,
+        (pushed_clock, device),
+    ).fetchall()
+    for table_name, uid, column, version, field_device, local_key, deleted in fields:
+        if deleted:
+            continue
+        key_column = database.KEY_COLUMNS[table_name]
+        value = cursor.execute(
+            f"SELECT {column} FROM {table_name} WHERE {key_column} = ?", (local_key,)
+        ).fetchone()
+        if value is None:
+            continue
+        change = changes.setdefault(
+            (table_name, uid),
+            {"table": table_name, "uid": uid, "fields": {}},
+        )
+        change["fields"][column] = [value[0], version, field_device]
+
+    return list(changes.values())
+
+
+def apply_change(cursor, change, report):
+    """
+    Merges one remote row into the local tables. The row's tombstone and each field are resolved separately, so
+    edits to different fields of the same task on two devices are both kept.
+    """
+
+    table_name = change["table"]
+    uid = change["uid"]
+    key_column = database.KEY_COLUMNS[table_name]
+    local = cursor.execute(
+        "SELECT local_key, deleted, version, device FROM sync_rows WHERE table_name = ? AND uid = ?",
+        (table_name, uid),
+    ).fetchone()
+
+    if "version" in change:
+        remote_wins = local is None or newer(
+            change["version"], change["device"], local[2], local[3]
+        )
+        if not remote_wins:
+            if (change["version"], change["device"]) != (local[2], local[3]):
+                report.skipped += 1
+        elif change["deleted"]:
+            if local is not None and not local[1]:
+                cursor.execute(
+                    f"DELETE FROM {table_name} WHERE {key_column} = ?", (local[0],)
+                )
+            if local is not None:
+                cursor.execute(
+                    """
+                    UPDATE sync_rows SET deleted = 1, version = ?, device = ?
+                    WHERE table_name = ? AND uid = ?
+                    """,
+                    (change["version"], change["device"], table_name, uid),
+                )
+            report.applied += 1
+            return
+        elif local is None or local[1]:
+            if insert_remote_row(cursor, change):
+                report.applied += 1
+            else:
+                report.skipped += 1
+            return
+
+    if local is None or local[1]:
+        # The row is unknown here or deleted with a newer tombstone, so there is nothing to update.
+        return
+
+    for column, (value, version, device) in change["fields"].items():
+        stamp = cursor.execute(
+            """
+            SELECT version, device FROM sync_fields WHERE table_name = ? AND uid = ? AND column_name = ?
+            """,
+            (table_name, uid, column),
+        ).fetchone()
+        if stamp is not None and not newer(version, device, *stamp):
+            report.skipped += 1
+            continue
+        cursor.execute(
+            f"UPDATE {table_name} SET {column} = ? WHERE {key_column} = ?",
+            (value, local[0]),
+        )
+        stamp_field(cursor, table_name, uid, column, version, device)
+        report.applied += 1
+
+
+def stamp_field(cursor, table_name, uid, column, version, device):
+    cursor.execute(
+        """
+        INSERT INTO sync_fields (table_name, uid, column_name, version, device) VALUES (?,?,?,?,?)
+        ON CONFLICT (table_name, uid, column_name) DO UPDATE SET version = excluded.version, device = excluded.device
+        """,
+        (table_name, uid, column, version, device),
+    )
+
+
+def insert_remote_row(cursor, change):
+    """
+    Helper for 'apply_change' creating a row that is new here or was revived on the other device. Returns False
+    if the change doesn't carry every column.
+    """
+
+    table_name = change["table"]
+    columns = database.TABLE_COLUMNS[table_name]
+    values = {column: field[0] for column, field in change["fields"].items()}
+    if any(column not in values for column in columns):
+        return False
+
+    row = [values[column] for column in columns]
+    if table_name == "stats_screen":
+        cursor.execute("DELETE FROM stats_screen")
+        cursor.execute(
+            f"INSERT INTO stats_screen (id_num, {', '.join(columns)}) VALUES (1,?,?,?,?)",
+            row,
+        )
+        local_key = 1
+    else:
+        placeholders = ",".join("?" for _ in columns)
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+            row,
+        )
+        key_column = database.KEY_COLUMNS[table_name]
+        local_key = cursor.lastrowid if key_column == "id_num" else values[key_column]
+
+    # A tombstone may still hold a reused row id. It keeps its uid and version, but can no longer be revived by undo.
+    cursor.execute(
+        "UPDATE sync_rows SET local_key = NULL WHERE table_name = ? AND local_key = ? AND uid != ?",
+        (table_name, local_key, change["uid"]),
+    )
+    cursor.execute(
+        """
+        INSERT INTO sync_rows (table_name, uid, local_key, deleted, version, device) VALUES (?,?,?,0,?,?)
+        ON CONFLICT (table_name, uid) DO UPDATE SET
+            local_key = excluded.local_key, deleted = 0, version = excluded.version, device = excluded.device
+        """,
+        (table_name, change["uid"], local_key, change["version"], change["device"]),
+    )
+
+    for column, (_, version, device) in change["fields"].items():
+        stamp_field(cursor, table_name, change["uid"], column, version, device)
+
+    return True
+
+
+def post_json(url, payload, report):
+    body = json.dumps(payload).encode("utf-8")
+    report.bytes_sent += len(body)
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        data = response.read()
+    report.bytes_received += len(data)
+
+    return json.loads(data)
+
+
+def sync(cursor, server=DEFAULT_SERVER):
+    """
+    Sends local changes made since the last sync and applies the server's changes since the last token.
+    Local changes made while the request is in flight keep newer versions and go out with the next sync.
+    """
+
+    report = SyncReport()
+
+    cursor.execute("BEGIN")
+    try:
+        device = get_meta(cursor, "device")
+        clock = get_meta(cursor, "clock")
+        changes = collect_changes(cursor, get_meta(cursor, "pushed_clock"), device)
+        token = get_meta(cursor, "server_token")
+    finally:
+        cursor.connection.commit()
+    report.sent = len(changes)
+
+    response = post_json(
+        f"{server.rstrip('/')}/sync",
+        {"device": device, "since": token, "changes": changes},
+        report,
+    )
+    report.received = len(response["changes"])
+
+    cursor.execute("BEGIN")
+    try:
+        set_meta(cursor, "applying", 1)
+        latest = clock
+        for change in response["changes"]:
+            apply_change(cursor, change, report)
+            versions = [field[1] for field in change["fields"].values()]
+            latest = max([latest, change.get("version", 0)] + versions)
+        set_meta(cursor, "applying", 0)
+        # Lamport clock: later local edits are stamped above everything seen so far.
+        cursor.execute(
+            "UPDATE sync_meta SET value = max(value, ?) WHERE key = 'clock'", (latest,)
+        )
+        set_meta(cursor, "pushed_clock", clock)
+        set_meta(cursor, "server_token", response["token"])
+        cursor.connection.commit()
+    except Exception:
+        cursor.connection.rollback()
+        raise
+
+    return report.finish()
@@ -0,0 +1,164 @@
+# Standard library imports
+import argparse
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SyncStore:
+    """
+    In-memory merged state of every device's rows. Each change is stamped with a sequence number, and rows are kept
+    in the order they last changed, so the changes since a token are read from the end without scanning the rest.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.seq = 0
+        # (table, uid) -> {"table", "uid", "deleted", "version", "device", "seq", "fields"}, oldest change first.
+        self.rows = OrderedDict()
+
+    def exchange(self, since, changes):
+        """
+        Returns the changes made after 'since' and the new token, then merges the incoming changes. Tokens from
+        before a server restart are treated as 0 so the device receives everything again.
+        """
+
+        with self.lock:
+            if since > self.seq:
+                since = 0
+            outgoing = self.changes_since(since)
+            for change in changes:
+                self.merge(change)
+
+            return outgoing, self.seq
+
+    def changes_since(self, since):
+        outgoing = []
+        for row in reversed(self.rows.values()):
+            if row["seq"] <= since:
+                break
+            change = {
+                "table": row["table"],
+                "uid": row["uid"],
+                "deleted": row["deleted"],
+                "version": row["version"],
+                "device": row["device"],
+                "fields": {
+                    column: field[:3]
+                    for column, field in row["fields"].items()
+                    if field[3] > since
+                },
+            }
+            outgoing.append(change)
+        outgoing.reverse()
+
+        return outgoing
+
+    def merge(self, change):
+        """
+        Last-writer-wins merge of one row, deciding the tombstone and each field by their (version, device) stamps.
+        """
+
+        key = (change["table"], change["uid"])
+        row = self.rows.get(key)
+        changed = False
+
+        if row is None:
+            if "version" not in change:
+                return
+            row = {
+                "table": change["table"],
+                "uid": change["uid"],
+                "deleted": change["deleted"],
+                "version": change["version"],
+                "device": change["device"],
+                "fields": {},
+            }
+            self.rows[key] = row
+            changed = True
+        elif "version" in change and (change["version"], change["device"]) > (
+            row["version"],
+            row["device"],
+        ):
+            row["deleted"] = change["deleted"]
+            row["version"] = change["version"]
+            row["device"] = change["device"]
+            changed = True
+
+        for column, (value, version, device) in change["fields"].items():
+            field = row["fields"].get(column)
+            if field is None or (version, device) > (field[1], field[2]):
+                self.seq += 1
+                row["fields"][column] = [value, version, device, self.seq]
+                changed = True
+
+        if changed:
+            self.seq += 1
+            row["seq"] = self.seq
+            self.rows.move_to_end(key)
+
+    def status(self) -> dict:
+        with self.lock:
+            return {"token": self.seq, "rows": len(self.rows)}
+
+
+class SyncHandler(BaseHTTPRequestHandler):
+    store = SyncStore()
+
+    def do_POST(self):
+        if self.path != "/sync":
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            changes, token = self.store.exchange(
+                int(request.get("since", 0)), request.get("changes", [])
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_error(400, str(e))
+            return
+
+        self.send_json({"token": token, "changes": changes})
+
+    def do_GET(self):
+        if self.path != "/status":
+            self.send_error(404)
+            return
+
+        self.send_json(self.store.status())
+
+    def send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Local sync server for testing. State is kept in memory and lost when it stops."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), SyncHandler)
+    print(f"Serving sync on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
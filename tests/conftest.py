@@ -0,0 +1,6 @@
+# Standard library imports
+import os
+import sys
+
+# The app's modules live at the repository root rather than in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
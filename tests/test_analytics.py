@@ -0,0 +1,110 @@
+# Standard library imports
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import analytics
+import database
+from data_structures import TaskNode
+
+# A Wednesday.
+TODAY = date(2026, 6, 17).toordinal()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "main.db")
+    connection, cursor = database.initialize_db(path)
+    database.close_db(connection, cursor)
+    return path
+
+
+def archive(db_path, *days):
+    connection, cursor = database.initialize_db(db_path)
+    for day in days:
+        completed_date = date.fromordinal(day)
+        task = TaskNode.from_fields(
+            None, ("water plants", "", "", "", completed_date, False, 0, None)
+        )
+        database.archive_task(cursor, task, completed_date)
+    database.close_db(connection, cursor)
+
+
+def test_current_streak_may_end_yesterday():
+    days = {TODAY - 6, TODAY - 5, TODAY - 4, TODAY - 2, TODAY - 1}
+
+    assert analytics.streaks(days, TODAY) == (2, 3)
+    assert analytics.streaks(days | {TODAY}, TODAY) == (3, 3)
+    assert analytics.streaks({TODAY - 3}, TODAY) == (0, 1)
+
+
+def test_weekdays_without_completions_are_not_best(db_path):
+    monday = TODAY - 2
+    archive(db_path, monday)
+
+    report = analytics.completion_trends(db_path, TODAY)
+
+    assert report["best_weekdays"] == [0]
+    assert "Best days: Mon" in analytics.format_report(
+        dict(report, forecast=[(TODAY, 0)] * 7)
+    )
+
+
+def test_empty_history_has_no_best_days(db_path):
+    report = analytics.compute_report(db_path, TODAY)
+
+    assert report["best_weekdays"] == []
+    assert report["current_streak"] == report["longest_streak"] == 0
+    assert "Best days" not in analytics.format_report(report)
+
+
+def test_monthly_totals_include_compacted_counts(db_path):
+    archive(db_path, date(2025, 9, 2).toordinal(), TODAY - 1, TODAY)
+    connection, cursor = database.initialize_db(db_path)
+    assert database.compact_archive(cursor, 200, date.fromordinal(TODAY)) == 1
+    database.close_db(connection, cursor)
+
+    totals = dict(analytics.completion_trends(db_path, TODAY)["monthly_totals"])
+
+    assert totals["2025-09"] == 1
+    assert totals["2026-06"] == 2
+    assert len(totals) == analytics.TREND_MONTHS
+
+
+def test_pool_workers_are_never_forked_from_the_app():
+    assert analytics.pool_context().get_start_method() in ("forkserver", "spawn")
+
+
+def test_frozen_builds_compute_on_a_thread(monkeypatch):
+    monkeypatch.setattr(sys, "frozen", True, raising=False)
+
+    pool = analytics.start_pool(1)
+
+    assert isinstance(pool, ThreadPoolExecutor)
+    pool.shutdown()
+
+
+def test_reports_are_computed_on_the_pool_and_cached(db_path):
+    archive(db_path, TODAY - 1, TODAY)
+    trend_analytics = analytics.TrendAnalytics(db_path, max_workers=1)
+    done = threading.Event()
+    reports = []
+
+    def receive(report):
+        reports.append(report)
+        done.set()
+
+    try:
+        trend_analytics.request(receive, date.fromordinal(TODAY))
+        assert done.wait(60)
+        assert isinstance(trend_analytics.executor, ProcessPoolExecutor)
+    finally:
+        trend_analytics.shutdown()
+
+    assert reports == [analytics.compute_report(db_path, TODAY)]
+    assert trend_analytics.cached(date.fromordinal(TODAY)) == reports[0]
@@ -0,0 +1,96 @@
+# Standard library imports
+from datetime import date
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import database
+from data_structures import TaskNode
+
+TODAY = date(2026, 6, 15)
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    connection, cursor = database.initialize_db(str(tmp_path / "main.db"))
+    yield cursor
+    database.close_db(connection, cursor)
+
+
+def archive(cursor, title, completed_date):
+    task = TaskNode(None)
+    task.set_fields((title, "", "", "", completed_date, False, 0, None))
+    return database.archive_task(cursor, task, completed_date)
+
+
+def test_old_completions_are_folded_into_monthly_counts(cursor):
+    archive(cursor, "water plants", date(2025, 1, 3))
+    archive(cursor, "water plants", date(2025, 1, 20))
+    archive(cursor, "water plants", date(2025, 2, 1))
+    archive(cursor, "laundry", date(2025, 1, 9))
+    recent_id = archive(cursor, "water plants", date(2026, 6, 1))
+
+    assert database.compact_archive(cursor, 365, TODAY) == 4
+
+    assert database.get_archive_summary(cursor) == [
+        (
+            "2025-02",
+            "water plants",
+            1,
+            date(2025, 2, 1).toordinal(),
+            date(2025, 2, 1).toordinal(),
+        ),
+        (
+            "2025-01",
+            "laundry",
+            1,
+            date(2025, 1, 9).toordinal(),
+            date(2025, 1, 9).toordinal(),
+        ),
+        (
+            "2025-01",
+            "water plants",
+            2,
+            date(2025, 1, 3).toordinal(),
+            date(2025, 1, 20).toordinal(),
+        ),
+    ]
+    rows, next_key = database.get_archive_page(cursor)
+    assert [row[0] for row in rows] == [recent_id]
+    assert next_key is None
+
+
+def test_compaction_without_old_rows_changes_nothing(cursor):
+    archive(cursor, "water plants", date(2025, 1, 3))
+    database.compact_archive(cursor, 365, TODAY)
+    summary = database.get_archive_summary(cursor)
+
+    assert database.compact_archive(cursor, 365, TODAY) == 0
+    assert database.get_archive_summary(cursor) == summary
+
+
+def test_later_compaction_adds_to_an_existing_month(cursor):
+    archive(cursor, "water plants", date(2025, 1, 20))
+    database.compact_archive(cursor, 365, TODAY)
+    archive(cursor, "water plants", date(2025, 1, 3))
+    archive(cursor, "water plants", date(2025, 1, 25))
+
+    assert database.compact_archive(cursor, 365, TODAY) == 2
+    assert database.get_archive_summary(cursor, "water plants") == [
+        (
+            "2025-01",
+            "water plants",
+            3,
+            date(2025, 1, 3).toordinal(),
+            date(2025, 1, 25).toordinal(),
+        ),
+    ]
+
+
+def test_archive_ids_are_not_reused_after_compaction(cursor):
+    old_id = archive(cursor, "water plants", date(2025, 1, 3))
+    database.compact_archive(cursor, 365, TODAY)
+
+    assert database.next_archive_id(cursor) == old_id + 1
+    assert archive(cursor, "laundry", TODAY) == old_id + 1
@@ -0,0 +1,121 @@
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import binary_snapshot
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "main.db")
+    connection, cursor = database.initialize_db(path)
+    cursor.executemany(
+        """
+        INSERT INTO current_task_list (title, first_step, second_step, third_step, task_date, repeat_toggle,
+            interval_index, recurrence) VALUES (?,?,?,?,?,?,?,?)
+        """,
+        [
+            ("café ☕", "grind", None, "", 739000, False, 0, None),
+            (
+                "team sync",
+                "",
+                "",
+                "",
+                739001,
+                True,
+                1,
+                "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH",
+            ),
+        ],
+    )
+    cursor.executemany(
+        "INSERT INTO item_list (title, quantity, item_location, interval_index) VALUES (?,?,?,?)",
+        [("milk", None, "", 0), ("Äpfel", "6", "Markt", 2)],
+    )
+    cursor.execute("INSERT INTO completed_tasks (title, count) VALUES ('café ☕', 4)")
+    cursor.execute("INSERT INTO item_locations (location) VALUES ('Markt')")
+    connection.commit()
+    database.close_db(connection, cursor)
+
+    return path
+
+
+def snapshot_fields(result):
+    lists, stats_screen = result
+    return (
+        {
+            section: [node.get_fields() for node in linked_list.iter_nodes()]
+            for section, linked_list in lists.items()
+        },
+        stats_screen.__dict__,
+    )
+
+
+def test_snapshot_loads_the_same_structures_as_the_database(db_path):
+    snapshot_path = db_path + ".bin"
+    binary_snapshot.write_snapshot(db_path, snapshot_path)
+
+    snapshot = binary_snapshot.open_snapshot(db_path, snapshot_path)
+    assert snapshot is not None
+    try:
+        from_snapshot = snapshot_fields(binary_snapshot.load_from_snapshot(snapshot))
+    finally:
+        snapshot.close()
+
+    connection, cursor = database.initialize_db(db_path)
+    try:
+        from_database = snapshot_fields(binary_snapshot.load_from_database(cursor))
+    finally:
+        database.close_db(connection, cursor)
+
+    assert from_snapshot == from_database
+    assert [fields[0] for fields in from_snapshot[0]["current"]] == [
+        "café ☕",
+        "team sync",
+    ]
+
+
+def test_missing_snapshot_is_ignored(db_path):
+    assert binary_snapshot.open_snapshot(db_path, db_path + ".bin") is None
+
+
+def test_snapshot_of_an_older_database_is_ignored(db_path):
+    snapshot_path = db_path + ".bin"
+    binary_snapshot.write_snapshot(db_path, snapshot_path)
+    connection, cursor = database.initialize_db(db_path)
+    cursor.execute("INSERT INTO item_locations (location) VALUES ('Kiosk')")
+    connection.commit()
+    database.close_db(connection, cursor)
+
+    assert binary_snapshot.open_snapshot(db_path, snapshot_path) is None
+
+
+@pytest.mark.parametrize("contents", [b"", b"not a snapshot" * 10])
+def test_unreadable_snapshot_is_ignored(db_path, contents):
+    snapshot_path = db_path + ".bin"
+    with open(snapshot_path, "wb") as stream:
+        stream.write(contents)
+
+    assert binary_snapshot.open_snapshot(db_path, snapshot_path) is None
+
+
+def test_benchmark_compares_both_loads():
+    result = binary_snapshot.benchmark(300, repeats=1)
+
+    assert result["tasks"] == 300
+    assert result["snapshot_bytes"] > 0
+
+
+def test_benchmark_fails_when_the_loads_differ(monkeypatch):
+    load_from_snapshot = binary_snapshot.load_from_snapshot
+
+    def renamed_load(snapshot):
+        lists, stats_screen = load_from_snapshot(snapshot)
+        next(lists["items"].iter_nodes()).title = "renamed"
+        return lists, stats_screen
+
+    monkeypatch.setattr(binary_snapshot, "load_from_snapshot", renamed_load)
+
+    with pytest.raises(AssertionError, match="items"):
+        binary_snapshot.benchmark(300, repeats=1)
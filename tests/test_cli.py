@@ -0,0 +1,137 @@
+# Standard library imports
+import sqlite3
+from datetime import date, timedelta
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import cli
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "main.db")
+
+
+@pytest.fixture
+def run(db_path, capsys):
+    def run(*args):
+        status = cli.main(["--db", db_path, *args])
+        return status, capsys.readouterr()
+
+    return run
+
+
+def rows(db_path, table_name):
+    connection, cursor = database.initialize_db(db_path)
+    try:
+        return list(database.iter_table_rows(cursor, table_name))
+    finally:
+        database.close_db(connection, cursor)
+
+
+def test_tasks_are_added_to_current_or_repeat_by_date(run):
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    run("add-task", "Water Plants", "--steps", "fill can")
+    run("add-task", "laundry", "--date", tomorrow)
+
+    status, output = run("list")
+    assert status == 0
+    assert "water plants" in output.out
+    assert "fill can" in output.out
+    assert "laundry" not in output.out
+
+    assert "laundry" in run("list", "repeat")[1].out
+
+
+def test_items_are_listed(run):
+    run("add-item", "Milk", "--quantity", "2", "--location", "Store")
+
+    status, output = run("list", "items")
+
+    assert status == 0
+    assert output.out.split("\t")[1:3] == ["store", "milk"]
+    assert "2 units" in output.out
+
+
+def test_completing_a_repeating_task_reschedules_it(run, db_path):
+    run("add-task", "water plants", "--repeat", "week")
+
+    status, output = run("complete", "task", "1")
+
+    assert status == 0
+    assert rows(db_path, "current_task_list") == []
+    assert [row[0] for row in rows(db_path, "repeat_task_list")] == ["water plants"]
+    assert rows(db_path, "completed_tasks") == [("water plants", 1)]
+    assert rows(db_path, "stats_screen")
+
+
+def test_purchasing_an_item_records_its_location(run, db_path):
+    run("add-item", "milk", "--location", "store")
+
+    assert run("complete", "item", "1")[0] == 0
+    assert rows(db_path, "item_list") == []
+    assert rows(db_path, "purchased_items") == [("milk", 1)]
+    assert rows(db_path, "item_locations") == [("store",)]
+
+
+def test_completion_xp_follows_the_stored_count(run, db_path):
+    for _ in range(3):
+        id_num = run("add-task", "water plants")[1].out.split("\t")[1]
+        run("complete", "task", id_num)
+
+    assert rows(db_path, "completed_tasks") == [("water plants", 3)]
+    # 10 + 1, then 10 + 2, then 10 + 3.
+    assert rows(db_path, "stats_screen")[0][:2] == (1, 36)
+
+
+def test_failed_completion_changes_nothing(run, db_path, monkeypatch):
+    run("add-task", "water plants", "--repeat", "week")
+
+    def fail(*args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(database, "replace_stats_data", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        run("complete", "task", "1")
+
+    assert [row[0] for row in rows(db_path, "current_task_list")] == ["water plants"]
+    assert rows(db_path, "repeat_task_list") == []
+    assert rows(db_path, "completed_tasks") == []
+    assert rows(db_path, "task_archive") == []
+
+
+def test_completing_a_missing_row_fails(run):
+    status, output = run("complete", "task", "7")
+
+    assert status == 1
+    assert "no current task with id 7" in output.err
+
+
+def test_query_matches_titles_steps_and_locations(run):
+    later = (date.today() + timedelta(days=30)).isoformat()
+    run("add-task", "water plants", "--steps", "fill can")
+    run("add-task", "repot plants", "--date", later)
+    run("add-item", "plant food", "--location", "garden centre")
+
+    output = run("query", "plant")[1].out
+    assert "water plants" in output
+    assert "repot plants" in output
+    assert "plant food" in output
+
+    output = run("query", "plant", "--due-by", date.today().isoformat())[1].out
+    assert "water plants" in output
+    assert "repot plants" not in output
+    assert "plant food" not in output
+
+
+def test_failed_import_exits_with_an_error(run, tmp_path):
+    path = tmp_path / "bad.ndjson"
+    path.write_text('{"table": "unknown"}\n', encoding="utf-8")
+
+    status, output = run("import", str(path))
+
+    assert status == 1
+    assert "line 1" in output.err
@@ -0,0 +1,262 @@
+# Standard library imports
+from datetime import date
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import database
+from data_structures import (
+    AgendaIndex,
+    ItemNode,
+    OperationJournal,
+    SearchIndex,
+    TaskNode,
+    combine_quantities,
+)
+from recurrence import RecurrenceRule
+
+
+def make_apply(values):
+    """
+    Applies ("set", key, value) operations to 'values' and returns the operation that reverses each one.
+    """
+
+    def apply_op(op):
+        _, key, value = op
+        previous = values.get(key)
+        values[key] = value
+        return ("set", key, previous)
+
+    return apply_op
+
+
+def test_undo_and_redo_restore_values():
+    values = {"title": "new"}
+    journal = OperationJournal()
+    journal.record(("set", "title", "old"))
+    apply_op = make_apply(values)
+
+    assert journal.undo(apply_op)
+    assert values["title"] == "old"
+    assert journal.redo(apply_op)
+    assert values["title"] == "new"
+    assert not journal.redo(apply_op)
+
+
+def test_grouped_operations_undo_as_one_entry():
+    values = {"title": "b", "first_step": "b"}
+    journal = OperationJournal()
+    journal.begin()
+    journal.record(("set", "title", "a"))
+    journal.begin()
+    journal.record(("set", "first_step", "a"))
+    journal.end()
+    journal.end()
+
+    assert len(journal.undo_stack) == 1
+    assert journal.undo(make_apply(values))
+    assert values == {"title": "a", "first_step": "a"}
+    assert not journal.undo_stack
+
+
+def test_new_entry_clears_redo():
+    values = {"title": "b"}
+    journal = OperationJournal()
+    journal.record(("set", "title", "a"))
+    journal.undo(make_apply(values))
+    assert journal.redo_stack
+
+    journal.record(("set", "title", "c"))
+    assert not journal.redo_stack
+    assert journal.size == journal._entry_size(journal.undo_stack[0])
+
+
+def test_oldest_entries_are_evicted_past_max_bytes():
+    journal = OperationJournal()
+    entry_size = journal._entry_size([("set", "title", "x")])
+    journal.max_bytes = entry_size * 3
+
+    for value in "abcde":
+        journal.record(("set", "title", value))
+
+    assert [entry[0][2] for entry in journal.undo_stack] == ["c", "d", "e"]
+    assert journal.size <= journal.max_bytes
+
+
+def test_oversized_entry_is_kept():
+    journal = OperationJournal(max_bytes=1)
+    journal.record(("set", "title", "a"))
+    journal.record(("set", "title", "b"))
+
+    assert [entry[0][2] for entry in journal.undo_stack] == ["b"]
+
+
+def make_task(id_num, title, start_date, repeat_toggle=False, recurrence=None):
+    node = TaskNode(id_num)
+    node.title = title
+    node.start_date = start_date
+    node.repeat_toggle = repeat_toggle
+    node.recurrence = recurrence
+    return node
+
+
+def test_agenda_expands_repeating_tasks_across_the_window():
+    agenda = AgendaIndex()
+    today = date(2026, 6, 1)
+    agenda.update("Current", make_task(1, "dishes", today))
+    weekly = RecurrenceRule.from_string("FREQ=WEEKLY")
+    agenda.update("Repeat", make_task(2, "laundry", date(2026, 6, 3), True, weekly))
+    agenda.update("Repeat", make_task(3, "dentist", date(2026, 6, 9)))
+
+    window = agenda.window(today, 14, today=today)
+
+    assert [
+        (day.day, [(node.title, projected) for node, projected in entries])
+        for day, entries in window
+    ] == [
+        (1, [("dishes", False)]),
+        (3, [("laundry", False)]),
+        (9, [("dentist", False)]),
+        (10, [("laundry", True)]),
+    ]
+
+
+def test_agenda_projects_a_current_task_only_after_today():
+    agenda = AgendaIndex()
+    today = date(2026, 6, 10)
+    daily = RecurrenceRule.from_string("FREQ=DAILY;INTERVAL=2")
+    agenda.update("Current", make_task(1, "stretch", date(2026, 6, 1), True, daily))
+
+    window = agenda.window(date(2026, 6, 9), 5, today=today)
+
+    assert [(day.day, entries[0][1]) for day, entries in window] == [
+        (10, False),
+        (11, True),
+        (13, True),
+    ]
+
+
+def test_agenda_moves_and_removes_tasks():
+    agenda = AgendaIndex()
+    task = make_task(1, "dentist", date(2026, 6, 9))
+    agenda.update("Repeat", task)
+    task.start_date = date(2026, 6, 12)
+    agenda.update("Repeat", task)
+
+    assert list(agenda.buckets) == [date(2026, 6, 12)]
+
+    agenda.remove("Repeat", 1)
+    assert not agenda.buckets and not agenda.entries
+    assert agenda.window(date(2026, 6, 1), 30, today=date(2026, 6, 1)) == []
+
+
+def make_item(id_num, title, item_location=""):
+    node = ItemNode(id_num)
+    node.title = title
+    node.item_location = item_location
+    return node
+
+
+def titles(results):
+    return [(list_key, node.title) for list_key, node in results]
+
+
+def test_search_matches_every_word_with_the_last_as_a_prefix():
+    index = SearchIndex()
+    task = make_task(1, "Water plants", date(2026, 6, 1))
+    task.first_step = "fill the can"
+    index.update("Current", task)
+    index.update("Repeat", make_task(2, "Water lawn", date(2026, 6, 1)))
+    index.update("List", make_item(3, "Plant food", "Garden centre"))
+
+    assert titles(index.search("wat")) == [
+        ("Current", "Water plants"),
+        ("Repeat", "Water lawn"),
+    ]
+    assert titles(index.search("water pla")) == [("Current", "Water plants")]
+    assert titles(index.search("CAN water")) == [("Current", "Water plants")]
+    assert titles(index.search("gard")) == [("List", "Plant food")]
+    assert index.search("lawn plants") == []
+    assert index.search("  ") == []
+
+
+def test_search_follows_updates_and_removals():
+    index = SearchIndex()
+    item = make_item(1, "Milk")
+    index.update("List", item)
+    item.title = "Oat milk"
+    index.update("List", item)
+
+    assert titles(index.search("oat")) == [("List", "Oat milk")]
+    assert titles(index.search("mil")) == [("List", "Oat milk")]
+
+    index.remove("List", 1)
+    assert index.search("milk") == []
+    assert not index.postings
+    index.remove("List", 1)
+
+
+def test_search_limit_keeps_the_first_results_in_order():
+    index = SearchIndex()
+    for id_num, title in enumerate(["call c", "call a", "call b"], start=1):
+        index.update("Current", make_task(id_num, title, date(2026, 6, 1)))
+
+    assert titles(index.search("call", limit=2)) == [
+        ("Current", "call a"),
+        ("Current", "call b"),
+    ]
+
+
+def test_combine_quantities_adds_in_the_smaller_unit():
+    assert combine_quantities("2", 0, "3", 0) == ("5", 0)
+    assert combine_quantities("8", 1, "1", 2) == ("24", 1)
+    assert combine_quantities("0.5", 4, "250", 3) == ("750", 3)
+    assert combine_quantities("1.5", 3, "1", 3) == ("2.5", 3)
+
+
+def test_combine_quantities_defaults_missing_quantities_by_family():
+    assert combine_quantities(None, 0, "", 0) == ("2", 0)
+    assert combine_quantities(None, 3, "", 4) == (None, 3)
+    assert combine_quantities(None, 3, "200", 3) == ("200", 3)
+
+
+@pytest.mark.parametrize("quantity", [".", "two", "nan", "inf", " "])
+def test_combine_quantities_treats_unparseable_quantities_as_missing(quantity):
+    assert combine_quantities(quantity, 0, "2", 0) == ("3", 0)
+    assert combine_quantities(quantity, 3, "200", 4) == ("200000", 3)
+
+
+def test_only_changed_persisted_fields_are_dirty():
+    task = make_task(1, "water plants", date(2026, 6, 1))
+    assert task.dirty_fields == set(TaskNode.FIELDS)
+
+    task.mark_clean()
+    revision = task.revision
+    task.title = "water plants"
+    task.next = make_task(2, "other", date(2026, 6, 1))
+    task.interval_text = ["daily"]
+    assert not task.dirty_fields
+    assert task.revision == revision
+
+    task.start_date = date(2026, 6, 2)
+    task.first_step = "fill can"
+    assert task.dirty_fields == {"start_date", "first_step"}
+    assert task.revision == revision + 2
+
+
+def test_dirty_values_are_in_storage_form():
+    task = make_task(1, "water plants", date(2026, 6, 1))
+    task.mark_clean()
+    task.start_date = date(2026, 6, 2)
+    task.repeat_toggle = 1
+
+    assert database.dirty_values("repeat_task_list", task) == {
+        "task_date": date(2026, 6, 2).toordinal(),
+        "repeat_toggle": True,
+    }
+
+    item = make_item(1, "milk")
+    item.mark_clean()
+    item.quantity = "2"
+    assert database.dirty_values("item_list", item) == {"quantity": "2"}
@@ -0,0 +1,193 @@
+# Standard library imports
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+from datetime import date
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "main.db")
+    connection, cursor = database.initialize_db(path)
+    database.close_db(connection, cursor)
+    return path
+
+
+@pytest.fixture
+def writer(db_path):
+    writer = database.DatabaseWriter(
+        db_path, flush_interval=60, archive_retention_days=None
+    )
+    writer.start()
+    yield writer
+    writer.close(timeout=10)
+
+
+def locations(path):
+    connection = sqlite3.connect(path)
+    try:
+        return database.get_item_locations(connection.cursor())
+    finally:
+        connection.close()
+
+
+def add_location(path, location):
+    connection = sqlite3.connect(path)
+    connection.execute("INSERT INTO item_locations (location) VALUES (?)", (location,))
+    connection.commit()
+    return connection
+
+
+def test_upgrade_from_version_0_stores_dates_as_ordinals(tmp_path):
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    for list_name in ("current_task_list", "repeat_task_list"):
+        connection.execute(f"""
+            CREATE TABLE {list_name}(
+                id_num INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                first_step TEXT,
+                second_step TEXT,
+                third_step TEXT,
+                task_date TEXT,
+                repeat_toggle INTEGER,
+                interval_index INTEGER
+            )
+            """)
+    connection.executemany(
+        "INSERT INTO current_task_list (id_num, title, task_date, repeat_toggle, interval_index) VALUES (?,?,?,?,?)",
+        [(4, "water plants", "2026-06-17", 1, 1), (9, "call", "not a date", 0, 0)],
+    )
+    connection.commit()
+    connection.close()
+
+    connection, cursor = database.initialize_db(path)
+    try:
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        rows = cursor.execute(
+            "SELECT id_num, title, task_date, repeat_toggle FROM current_task_list ORDER BY id_num"
+        ).fetchall()
+    finally:
+        database.close_db(connection, cursor)
+
+    assert version == database.SCHEMA_VERSION
+    assert rows == [
+        (4, "water plants", date(2026, 6, 17).toordinal(), 1),
+        (9, "call", date.today().toordinal(), 0),
+    ]
+
+
+def test_writer_coalesces_edits_to_the_same_row(db_path, writer):
+    item = {"title": "milk", "quantity": "1", "item_location": "", "interval_index": 0}
+    writer.upsert("item_list", 1, item)
+    writer.upsert("item_list", 1, {"quantity": "2"})
+    writer.upsert("item_list", 1, {"item_location": "store"})
+
+    assert writer.flush(timeout=10)
+    metrics = writer.metrics()
+    assert metrics["coalesced"] == 2
+    assert metrics["rows_written"] == 1
+
+    connection = sqlite3.connect(db_path)
+    assert database.get_item_list(connection.cursor()) == [(1, "milk", "2", "store", 0)]
+    connection.close()
+
+
+def test_batch_is_committed_in_one_flush(writer):
+    with writer.batch():
+        for location in ("a", "b", "c"):
+            writer.upsert("item_locations", location, {"location": location})
+        # Nothing reaches the queue until the block ends.
+        assert writer.metrics()["queue_depth"] == 0
+
+    assert writer.flush(timeout=10)
+    assert writer.metrics()["flushes"] == 1
+
+
+def test_writer_retries_a_batch_the_database_rejected(db_path, writer):
+    # The writer creates any missing tables when it starts, so let it finish before moving one away.
+    writer.upsert("completed_tasks", "ready", {"count": 1})
+    assert writer.flush(timeout=10)
+
+    connection = sqlite3.connect(db_path)
+    connection.execute("ALTER TABLE item_locations RENAME TO moved_locations")
+    connection.commit()
+
+    writer.upsert("item_locations", "a", {"location": "a"})
+    assert not writer.flush(timeout=1)
+    assert writer.is_alive()
+
+    connection.execute("ALTER TABLE moved_locations RENAME TO item_locations")
+    connection.commit()
+    connection.close()
+    writer.upsert("item_locations", "b", {"location": "b"})
+
+    assert writer.flush(timeout=10)
+    assert sorted(locations(db_path)) == ["a", "b"]
+
+
+def test_writer_drops_only_the_row_that_fails(db_path, writer):
+    columns = database.TABLE_COLUMNS["current_task_list"]
+    task = dict(zip(columns, (None, "", "", "", 1, False, 0, None)))
+    writer.upsert("current_task_list", 1, task)
+    writer.upsert("item_locations", "kept", {"location": "kept"})
+
+    assert writer.flush(timeout=10)
+    assert locations(db_path) == ["kept"]
+
+    writer.upsert("item_locations", "later", {"location": "later"})
+    assert writer.flush(timeout=10)
+    assert locations(db_path) == ["kept", "later"]
+
+
+def test_recovery_rolls_back_a_hot_journal_instead_of_restoring_the_backup(db_path):
+    connection = add_location(db_path, "before backup")
+    database.write_backup(connection, db_path)
+    connection.close()
+    add_location(db_path, "after backup").close()
+
+    # A writer killed mid-transaction leaves a hot journal behind.
+    crash = textwrap.dedent(f"""
+        import os, sqlite3
+        connection = sqlite3.connect({db_path!r})
+        connection.executemany(
+            "INSERT INTO item_locations (location) VALUES (?)",
+            [("uncommitted " * 50 + str(number),) for number in range(3000)],
+        )
+        os._exit(0)
+        """)
+    subprocess.run([sys.executable, "-c", crash], check=True)
+    assert os.path.exists(f"{db_path}-journal")
+
+    assert database.recover_snapshot(db_path)
+    assert locations(db_path) == ["before backup", "after backup"]
+    assert not os.path.exists(f"{db_path}.damaged")
+
+
+def test_recovery_restores_the_backup_over_a_damaged_database(db_path):
+    connection = add_location(db_path, "backed up")
+    database.write_backup(connection, db_path)
+    connection.close()
+
+    with open(db_path, "wb") as stream:
+        stream.write(b"not a database" * 100)
+
+    assert database.recover_snapshot(db_path)
+    assert locations(db_path) == ["backed up"]
+    assert os.path.exists(f"{db_path}.damaged")
+
+
+def test_recovery_fails_without_a_valid_copy(tmp_path):
+    path = str(tmp_path / "main.db")
+    with open(path, "wb") as stream:
+        stream.write(b"not a database" * 100)
+
+    assert not database.recover_snapshot(path)
@@ -0,0 +1,84 @@
+# Standard library imports
+from datetime import date
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+from recurrence import RecurrenceRule
+
+
+def test_rule_round_trips_through_its_string_form():
+    text = "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH"
+    rule = RecurrenceRule.from_string(text)
+
+    assert str(rule) == text
+    assert rule == RecurrenceRule("WEEKLY", 2, (3, 0))
+    assert rule.describe() == "mo, th /2w"
+
+
+def test_equal_rules_hash_alike():
+    rule = RecurrenceRule("WEEKLY", 2, (3, 0))
+    same = RecurrenceRule.from_string("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH")
+
+    assert rule == same
+    assert hash(rule) == hash(same)
+    assert len({rule, same, RecurrenceRule("WEEKLY", 1)}) == 2
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "FREQ=HOURLY",
+        "FREQ=DAILY;INTERVAL=0",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=DAILY;COUNT=3",
+    ],
+)
+def test_invalid_rules_are_rejected(text):
+    with pytest.raises(ValueError):
+        RecurrenceRule.from_string(text)
+
+
+def test_daily_rule_skips_missed_intervals():
+    rule = RecurrenceRule("DAILY", 3)
+
+    assert rule.next_after(date(2026, 1, 1), date(2026, 1, 10)) == date(2026, 1, 13)
+    assert rule.next_after(date(2026, 1, 1), date(2025, 12, 1)) == date(2026, 1, 4)
+
+
+def test_monthly_rule_clamps_to_short_months_and_returns_to_its_anchor():
+    start = date(2026, 1, 31)
+    rule = RecurrenceRule("MONTHLY").anchored(start)
+
+    february = rule.next_after(start, date(2026, 2, 1))
+    assert february == date(2026, 2, 28)
+    assert rule.next_after(start, february) == date(2026, 3, 31)
+
+
+def test_anchor_is_kept_when_counting_from_a_clamped_date():
+    rule = RecurrenceRule("MONTHLY", month_day=31)
+
+    assert rule.next_after(date(2026, 2, 28), date(2026, 3, 3)) == date(2026, 3, 31)
+
+
+def test_yearly_rule_from_leap_day():
+    rule = RecurrenceRule("YEARLY").anchored(date(2024, 2, 29))
+
+    assert rule.next_after(date(2024, 2, 29), date(2024, 3, 1)) == date(2025, 2, 28)
+    assert rule.next_after(date(2024, 2, 29), date(2027, 3, 1)) == date(2028, 2, 29)
+
+
+def test_weekday_rule_on_every_other_week():
+    start = date(2026, 1, 5)
+    rule = RecurrenceRule("WEEKLY", 2, (0, 3))
+
+    assert rule.next_after(start, start) == date(2026, 1, 8)
+    assert rule.next_after(start, date(2026, 1, 8)) == date(2026, 1, 19)
+    assert rule.next_after(start, date(2026, 1, 12)) == date(2026, 1, 19)
+
+
+def test_preset_intervals_match_the_dialog():
+    assert [
+        RecurrenceRule.from_interval_index(index).describe() for index in range(4)
+    ] == ["a day", "a week", "a month", "a year"]
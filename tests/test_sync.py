@@ -0,0 +1,153 @@
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import database
+import sync
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    connection, cursor = database.initialize_db(str(tmp_path / "main.db"))
+    yield cursor
+    database.close_db(connection, cursor)
+
+
+def apply(cursor, change):
+    """
+    Applies a remote change the way 'sync' does, with local change capture paused.
+    """
+
+    report = sync.SyncReport()
+    sync.set_meta(cursor, "applying", 1)
+    sync.apply_change(cursor, change, report)
+    sync.set_meta(cursor, "applying", 0)
+    cursor.connection.commit()
+
+    return report
+
+
+def remote_item(uid, version, **values):
+    fields = {
+        "title": "milk",
+        "quantity": "1",
+        "item_location": "",
+        "interval_index": 0,
+    }
+    fields.update(values)
+    return {
+        "table": "item_list",
+        "uid": uid,
+        "deleted": False,
+        "version": version,
+        "device": "remote",
+        "fields": {
+            column: [value, version, "remote"] for column, value in fields.items()
+        },
+    }
+
+
+def add_local_item(cursor, title="milk"):
+    cursor.execute(
+        "INSERT INTO item_list (title, quantity, item_location, interval_index) VALUES (?, '1', '', 0)",
+        (title,),
+    )
+    cursor.connection.commit()
+    id_num = cursor.lastrowid
+    uid = cursor.execute(
+        "SELECT uid FROM sync_rows WHERE table_name = 'item_list' AND local_key = ?",
+        (id_num,),
+    ).fetchone()[0]
+
+    return id_num, uid
+
+
+def test_newer_stamp_wins_and_device_breaks_ties():
+    assert sync.newer(2, "a", 1, "z")
+    assert sync.newer(1, "b", 1, "a")
+    assert not sync.newer(1, "a", 1, "a")
+
+
+def test_unknown_remote_row_is_inserted(cursor):
+    report = apply(cursor, remote_item("uid-1", 5, title="eggs"))
+
+    assert report.applied == 1
+    assert [row[1] for row in database.get_item_list(cursor)] == ["eggs"]
+    local_key = cursor.execute(
+        "SELECT local_key FROM sync_rows WHERE uid = 'uid-1'"
+    ).fetchone()[0]
+    assert database.get_item(cursor, local_key)[1] == "eggs"
+
+
+def test_edits_to_different_fields_are_both_kept(cursor):
+    id_num, uid = add_local_item(cursor)
+    cursor.execute(
+        "UPDATE item_list SET title = 'oat milk' WHERE id_num = ?", (id_num,)
+    )
+    cursor.connection.commit()
+
+    change = {
+        "table": "item_list",
+        "uid": uid,
+        "fields": {
+            "quantity": ["3", 100, "remote"],
+            "title": ["whole milk", 0, "remote"],
+        },
+    }
+    report = apply(cursor, change)
+
+    assert database.get_item(cursor, id_num)[1:3] == ("oat milk", "3")
+    assert (report.applied, report.skipped) == (1, 1)
+
+
+def test_newer_tombstone_deletes_the_local_row(cursor):
+    id_num, uid = add_local_item(cursor)
+    change = {
+        "table": "item_list",
+        "uid": uid,
+        "deleted": True,
+        "version": 100,
+        "device": "remote",
+        "fields": {},
+    }
+
+    assert apply(cursor, change).applied == 1
+    assert database.get_item(cursor, id_num) is None
+    assert cursor.execute(
+        "SELECT deleted FROM sync_rows WHERE uid = ?", (uid,)
+    ).fetchone() == (1,)
+
+
+def test_older_tombstone_is_ignored(cursor):
+    id_num, uid = add_local_item(cursor)
+    change = {
+        "table": "item_list",
+        "uid": uid,
+        "deleted": True,
+        "version": 0,
+        "device": "remote",
+        "fields": {},
+    }
+
+    assert apply(cursor, change).skipped == 1
+    assert database.get_item(cursor, id_num) is not None
+
+
+def test_partial_row_for_an_unknown_uid_is_skipped(cursor):
+    change = remote_item("uid-2", 5)
+    del change["fields"]["title"]
+
+    assert apply(cursor, change).skipped == 1
+    assert database.get_item_list(cursor) == []
+
+
+def test_collect_changes_returns_local_edits_since_the_last_push(cursor):
+    id_num, uid = add_local_item(cursor)
+    device = sync.get_meta(cursor, "device")
+
+    changes = sync.collect_changes(cursor, 0, device)
+    item_changes = [change for change in changes if change["table"] == "item_list"]
+
+    assert [change["uid"] for change in item_changes] == [uid]
+    assert item_changes[0]["fields"]["title"][0] == "milk"
+    assert sync.collect_changes(cursor, sync.get_meta(cursor, "clock"), device) == []
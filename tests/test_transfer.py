@@ -0,0 +1,203 @@
+# Standard library imports
+import json
+import os
+import sqlite3
+
+# Third-party imports
+import pytest
+
+# Local/application-specific imports
+import database
+import transfer
+
+TASK = {
+    "title": "water plants",
+    "first_step": "fill can",
+    "second_step": "",
+    "third_step": "",
+    "task_date": "2026-06-17",
+    "repeat_toggle": True,
+    "interval_index": 1,
+}
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    connection, cursor = database.initialize_db(str(tmp_path / "main.db"))
+    yield cursor
+    database.close_db(connection, cursor)
+
+
+@pytest.fixture
+def other_cursor(tmp_path):
+    connection, cursor = database.initialize_db(str(tmp_path / "other.db"))
+    yield cursor
+    database.close_db(connection, cursor)
+
+
+def write_ndjson(path, records):
+    with open(path, "w", encoding="utf-8") as stream:
+        for record in records:
+            stream.write(json.dumps(record) + "\n")
+
+
+def table_rows(cursor):
+    return {
+        table_name: list(database.iter_table_rows(cursor, table_name))
+        for table_name in database.TABLE_COLUMNS
+    }
+
+
+def seed(cursor, path):
+    write_ndjson(
+        path,
+        [
+            {"table": "current_task_list", **TASK},
+            {"table": "repeat_task_list", **TASK, "title": "laundry"},
+            {
+                "table": "item_list",
+                "title": "milk",
+                "quantity": "2",
+                "item_location": "store",
+                "interval_index": 0,
+            },
+            {"table": "completed_tasks", "title": "laundry", "count": 3},
+            {"table": "item_locations", "location": "store"},
+        ],
+    )
+    transfer.run_import(cursor, str(path), "ndjson")
+
+
+def test_ndjson_round_trip(cursor, other_cursor, tmp_path):
+    seed(cursor, tmp_path / "seed.ndjson")
+
+    export = transfer.run_export(cursor, str(tmp_path / "out.ndjson"), "ndjson")
+    imported = transfer.run_import(other_cursor, str(tmp_path / "out.ndjson"), "ndjson")
+
+    assert export.rows == imported.rows == 5
+    assert table_rows(other_cursor) == table_rows(cursor)
+    assert table_rows(cursor)["current_task_list"][0][0] == "water plants"
+
+
+def test_csv_round_trip(cursor, other_cursor, tmp_path):
+    seed(cursor, tmp_path / "seed.ndjson")
+
+    transfer.run_export(cursor, str(tmp_path / "backup"), "csv")
+    transfer.run_import(other_cursor, str(tmp_path / "backup"), "csv")
+
+    assert table_rows(other_cursor) == table_rows(cursor)
+
+
+def test_stats_counts_are_added_on_import(cursor, tmp_path):
+    seed(cursor, tmp_path / "seed.ndjson")
+    seed(cursor, tmp_path / "seed.ndjson")
+
+    assert table_rows(cursor)["completed_tasks"] == [("laundry", 6)]
+    assert table_rows(cursor)["item_locations"] == [("store",)]
+
+
+def test_ndjson_import_is_limited_to_tables(cursor, tmp_path):
+    seed(cursor, tmp_path / "seed.ndjson")
+    transfer.run_export(cursor, str(tmp_path / "out.ndjson"), "ndjson")
+    connection, other = database.initialize_db(str(tmp_path / "other.db"))
+
+    report = transfer.run_import(
+        other, str(tmp_path / "out.ndjson"), "ndjson", ["item_list"]
+    )
+
+    assert report.rows == 1
+    rows = table_rows(other)
+    assert [row[0] for row in rows["item_list"]] == ["milk"]
+    assert rows["current_task_list"] == rows["completed_tasks"] == []
+    database.close_db(connection, other)
+
+
+def test_bad_ndjson_row_names_its_line_and_keeps_nothing(cursor, tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    write_ndjson(
+        path,
+        [
+            {"table": "current_task_list", **TASK},
+            {"table": "item_locations", "location": "store"},
+            {"table": "current_task_list", **TASK, "title": None},
+        ],
+    )
+
+    with pytest.raises(
+        transfer.TransferError, match="tasks.ndjson, line 3: current_task_list"
+    ):
+        transfer.run_import(cursor, str(path), "ndjson", batch_size=2)
+
+    assert all(not rows for rows in table_rows(cursor).values())
+
+
+@pytest.mark.parametrize(
+    "table_name, fields, message",
+    [
+        ("current_task_list", {"task_date": None}, "task_date is required"),
+        ("repeat_task_list", {"interval_index": 4}, "interval_index 4 is out of range"),
+        ("task_archive", {"completed_date": ""}, "completed_date is required"),
+        ("item_list", {"interval_index": -1}, "interval_index -1 is out of range"),
+    ],
+)
+def test_rows_with_missing_dates_or_bad_intervals_are_rejected(
+    cursor, tmp_path, table_name, fields, message
+):
+    path = tmp_path / "tasks.ndjson"
+    record = {"table": table_name, **TASK, "completed_date": "2026-06-18", **fields}
+    write_ndjson(path, [{"table": "current_task_list", **TASK}, record])
+
+    with pytest.raises(
+        transfer.TransferError, match=f"line 2: {table_name}: {message}"
+    ):
+        transfer.run_import(cursor, str(path), "ndjson")
+
+    assert all(not rows for rows in table_rows(cursor).values())
+
+
+def test_batch_failing_only_as_a_whole_names_its_lines(cursor, tmp_path, monkeypatch):
+    path = tmp_path / "locations.ndjson"
+    write_ndjson(path, [{"table": "item_locations", "location": "store"}] * 3)
+    insert_table_rows = database.insert_table_rows
+
+    def insert_single_rows(cursor, table_name, rows):
+        if len(rows) > 1:
+            raise sqlite3.OperationalError("database is locked")
+        insert_table_rows(cursor, table_name, rows)
+
+    monkeypatch.setattr(database, "insert_table_rows", insert_single_rows)
+    with pytest.raises(
+        transfer.TransferError, match="lines 1-3: item_locations: database is locked"
+    ):
+        transfer.run_import(cursor, str(path), "ndjson")
+
+    assert all(not rows for rows in table_rows(cursor).values())
+
+
+def test_bad_csv_file_undoes_the_whole_directory(cursor, tmp_path):
+    directory = tmp_path / "backup"
+    os.mkdir(directory)
+    (directory / "current_task_list.csv").write_text(
+        ",".join(TASK) + "\nwater plants,,,,2026-06-17,1,1\n", encoding="utf-8"
+    )
+    # A file without a title column leaves every title empty.
+    (directory / "item_list.csv").write_text(
+        "quantity,item_location,interval_index\n2,store,0\n", encoding="utf-8"
+    )
+
+    with pytest.raises(
+        transfer.TransferError, match="item_list.csv, line 2: item_list"
+    ):
+        transfer.run_import(cursor, str(directory), "csv")
+
+    assert all(not rows for rows in table_rows(cursor).values())
+
+
+def test_main_reports_failures_with_exit_status(tmp_path, capsys):
+    path = tmp_path / "tasks.ndjson"
+    write_ndjson(path, [{"table": "unknown"}])
+    db_path = str(tmp_path / "main.db")
+
+    assert transfer.main(["--db", db_path, "import", str(path)]) == 1
+    assert "line 1: unknown table 'unknown'" in capsys.readouterr().err
+    assert transfer.main(["--db", db_path, "import", str(tmp_path / "missing")]) == 1
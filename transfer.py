@@ -0,0 +1,268 @@
+# Standard library imports
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Local/application-specific imports
+import database
+
+
+class TransferError(ValueError):
+    """
+    A row that couldn't be imported, with the file and line it came from.
+    """
+
+
+class TransferReport:
+    """
+    Row count and elapsed time of a single import or export.
+    """
+
+    def __init__(self, action: str) -> None:
+        self.action = action
+        self.rows = 0
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start_time
+        return self
+
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.rows} rows in {self.elapsed:.3f}s ({self.rows_per_second():.0f} rows/sec)"
+
+
+def export_ndjson(cursor, stream, tables=None, batch_size=1000):
+    """
+    Writes every row of the selected tables to the stream as one JSON object per line.
+    """
+
+    report = TransferReport("Exported")
+
+    for table_name in tables or database.TABLE_COLUMNS:
+        columns = database.TABLE_COLUMNS[table_name]
+        for row in database.iter_table_rows(cursor, table_name, batch_size):
+            record = {"table": table_name}
+            record.update(zip(columns, row))
+            stream.write(json.dumps(record) + "\n")
+            report.rows += 1
+
+    return report.finish()
+
+
+def import_ndjson(cursor, stream, tables=None, batch_size=1000, source="input"):
+    """
+    Reads NDJSON rows from the stream into their tables, skipping tables not in 'tables' when given.
+    Rows are buffered per table and written with executemany once a buffer reaches 'batch_size'. The caller owns
+    the transaction.
+    """
+
+    report = TransferReport("Imported")
+    buffers = {}
+
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise TransferError(f"{source}, line {line_number}: {e}") from e
+        table_name = record.get("table")
+        if table_name not in database.TABLE_COLUMNS:
+            raise TransferError(
+                f"{source}, line {line_number}: unknown table '{table_name}'"
+            )
+        if tables and table_name not in tables:
+            continue
+
+        columns = database.TABLE_COLUMNS[table_name]
+        buffer = buffers.setdefault(table_name, [])
+        buffer.append((line_number, tuple(record.get(column) for column in columns)))
+        report.rows += 1
+
+        if len(buffer) >= batch_size:
+            insert_batch(cursor, table_name, buffer, source)
+            buffer.clear()
+
+    for table_name, buffer in buffers.items():
+        if buffer:
+            insert_batch(cursor, table_name, buffer, source)
+
+    return report.finish()
+
+
+def export_csv(cursor, table_name, stream, batch_size=1000):
+    """
+    Writes a single table to the stream as CSV with a header row.
+    """
+
+    report = TransferReport("Exported")
+    writer = csv.writer(stream)
+    writer.writerow(database.TABLE_COLUMNS[table_name])
+
+    for row in database.iter_table_rows(cursor, table_name, batch_size):
+        writer.writerow(row)
+        report.rows += 1
+
+    return report.finish()
+
+
+def import_csv(cursor, table_name, stream, batch_size=1000, source="input"):
+    """
+    Reads a CSV file produced by 'export_csv' into a single table. The caller owns the transaction.
+    """
+
+    report = TransferReport("Imported")
+    columns = database.TABLE_COLUMNS[table_name]
+    reader = csv.DictReader(stream)
+    buffer = []
+
+    for record in reader:
+        buffer.append(
+            (reader.line_num, tuple(record.get(column) for column in columns))
+        )
+        report.rows += 1
+
+        if len(buffer) >= batch_size:
+            insert_batch(cursor, table_name, buffer, source)
+            buffer.clear()
+
+    if buffer:
+        insert_batch(cursor, table_name, buffer, source)
+
+    return report.finish()
+
+
+def insert_batch(cursor, table_name, batch, source):
+    """
+    Inserts buffered (line_number, row) pairs with executemany. A failing batch is undone and retried a row at a
+    time, so the error names the line responsible. If no single row fails, the error names the batch's lines.
+    """
+
+    cursor.execute("SAVEPOINT import_batch")
+    try:
+        database.insert_table_rows(cursor, table_name, [row for _, row in batch])
+    except (sqlite3.Error, ValueError, TypeError) as batch_error:
+        cursor.execute("ROLLBACK TO import_batch")
+        for line_number, row in batch:
+            try:
+                database.insert_table_rows(cursor, table_name, [row])
+            except (sqlite3.Error, ValueError, TypeError) as e:
+                raise TransferError(
+                    f"{source}, line {line_number}: {table_name}: {e}"
+                ) from e
+        raise TransferError(
+            f"{source}, lines {batch[0][0]}-{batch[-1][0]}: {table_name}: {batch_error}"
+        ) from batch_error
+    finally:
+        cursor.execute("RELEASE import_batch")
+
+
+def run_export(cursor, path, file_format, tables=None, batch_size=1000):
+    """
+    Exports to a single NDJSON file or to a directory holding one CSV file per table.
+    """
+
+    if file_format == "ndjson":
+        with open(path, "w", encoding="utf-8") as stream:
+            return export_ndjson(cursor, stream, tables, batch_size)
+
+    os.makedirs(path, exist_ok=True)
+    report = TransferReport("Exported")
+    for table_name in tables or database.TABLE_COLUMNS:
+        csv_path = os.path.join(path, f"{table_name}.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as stream:
+            report.rows += export_csv(cursor, table_name, stream, batch_size).rows
+
+    return report.finish()
+
+
+def run_import(cursor, path, file_format, tables=None, batch_size=1000):
+    """
+    Imports from a single NDJSON file or from a directory of per-table CSV files, all in one transaction. A bad
+    row raises a TransferError naming its file and line, and nothing is imported.
+    """
+
+    cursor.execute("BEGIN")
+    try:
+        if file_format == "ndjson":
+            with open(path, encoding="utf-8") as stream:
+                report = import_ndjson(cursor, stream, tables, batch_size, path)
+        else:
+            report = TransferReport("Imported")
+            for table_name in tables or database.TABLE_COLUMNS:
+                csv_path = os.path.join(path, f"{table_name}.csv")
+                if not os.path.exists(csv_path):
+                    continue
+                with open(csv_path, encoding="utf-8", newline="") as stream:
+                    report.rows += import_csv(
+                        cursor, table_name, stream, batch_size, csv_path
+                    ).rows
+            report.finish()
+        cursor.connection.commit()
+    except BaseException:
+        cursor.connection.rollback()
+        raise
+
+    return report
+
+
+def add_transfer_arguments(parser):
+    """
+    Shared arguments for the import and export commands.
+    """
+
+    parser.add_argument("path", help="NDJSON file, or directory of CSV files")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=tuple(database.TABLE_COLUMNS),
+        help="limit the transfer to these tables",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream tasks, items and stats in or out of the app database."
+    )
+    parser.add_argument("--db", default="main.db", help="path to the app database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_transfer_arguments(subparsers.add_parser("export"))
+    add_transfer_arguments(subparsers.add_parser("import"))
+    args = parser.parse_args(argv)
+
+    connection, cursor = database.initialize_db(args.db)
+    if not connection:
+        return 1
+
+    try:
+        if args.command == "export":
+            report = run_export(
+                cursor, args.path, args.format, args.tables, args.batch_size
+            )
+        else:
+            report = run_import(
+                cursor, args.path, args.format, args.tables, args.batch_size
+            )
+    except (OSError, TransferError) as e:
+        print(f"An error occurred: {e}", file=sys.stderr)
+        return 1
+    finally:
+        database.close_db(connection, cursor)
+
+    print(report, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())